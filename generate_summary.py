@@ -1,45 +1,64 @@
 # generate_summary.py
+"""
+Merge every result set into one combined summary (see mylibri/summary.py).
 
-import csv
-import json
+Sources come from glob patterns and/or a run manifest (a JSON list,
+{"sources": [...]}, or one path per line). The newest record per book ID
+wins, and the combined CSV and JSON are written as the merge runs, so
+result sets larger than memory are fine.
+
+    python generate_summary.py
+    python generate_summary.py --manifest test_reports/run_manifest.json --chunk-rows 50000
+    python generate_summary.py --dashboard docs/data    # also refresh docs/dashboard.html's data
+"""
+
+import argparse
 from pathlib import Path
-from datetime import datetime
 
-FAST_REPORT = Path("test_reports/fast/latest.json")
-SLOW_REPORT = Path("test_reports/slow/latest.json")
+from mylibri.dashboard import DASHBOARD_SHARD_ROWS, DashboardWriter
+from mylibri.summary import CHUNK_ROWS, SummaryWriter, discover_sources, merge_sources
+
+# The lane results plus every sweep snapshot
+DEFAULT_SOURCES = (
+    "test_reports/*/latest.json",
+    "test_reports/book_id_sweep_*.ndjson",
+    "test_reports/book_metadata_*.ndjson",
+)
 OUTPUT_CSV = Path("test_reports/combined_summary.csv")
 OUTPUT_JSON = Path("test_reports/combined_summary.json")
 
-def load_json(file_path):
-    if file_path.exists():
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
 
-def save_combined_report(data):
-    fieldnames = ["id", "title", "author", "url", "timestamp"]
-    OUTPUT_CSV.parent.mkdir(exist_ok=True)
-
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for item in data:
-            writer.writerow(item)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--glob", nargs="*", dest="patterns", help="source file patterns (default: lane results "
+                                                                    "and sweep snapshots in test_reports/)")
+    parser.add_argument("--manifest", help="file listing the sources to merge")
+    parser.add_argument("--csv", type=Path, default=OUTPUT_CSV)
+    parser.add_argument("--json", type=Path, default=OUTPUT_JSON)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="records sorted in memory at a time")
+    parser.add_argument("--dashboard", type=Path, metavar="DIR", help="also write the dashboard's index and shards")
+    parser.add_argument("--shard-rows", type=int, default=DASHBOARD_SHARD_ROWS, help="books per dashboard shard")
+    args = parser.parse_args()
 
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    patterns = args.patterns if args.patterns is not None else ([] if args.manifest else DEFAULT_SOURCES)
+    sources = discover_sources(patterns, args.manifest)
+    print(f"🔎 Merging {len(sources)} result file(s)...")
 
-def main():
-    fast_data = load_json(FAST_REPORT)
-    slow_data = load_json(SLOW_REPORT)
-    combined = fast_data + slow_data
+    stats = {}
+    dashboard = DashboardWriter(args.dashboard, args.shard_rows) if args.dashboard else None
+    with SummaryWriter(args.csv, args.json) as summary:
+        for record in merge_sources(sources, chunk_rows=args.chunk_rows, stats=stats):
+            summary.write(record)
+            if dashboard:
+                dashboard.write(record)
+    if dashboard:
+        dashboard.close()
+        print(f"📊 Dashboard data: {dashboard.count} books in {len(dashboard.shards)} shards under {args.dashboard}")
 
-    now = datetime.now().isoformat()
-    for item in combined:
-        item.setdefault("timestamp", now)
+    print(f"✅ {stats['merged']} records from {stats['records']} read ({stats['records'] - stats['merged']} "
+          f"superseded or skipped, {stats['chunks']} sorted chunk(s)). Combined report saved to:\n"
+          f"→ {args.csv}\n→ {args.json}")
 
-    save_combined_report(combined)
-    print(f"✅ Combined report saved to:\n→ {OUTPUT_CSV}\n→ {OUTPUT_JSON}")
 
 if __name__ == "__main__":
     main()
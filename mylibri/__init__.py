@@ -0,0 +1,2 @@
+# mylibri/__init__.py
+"""Shared helpers for the MyLibri automation suite."""
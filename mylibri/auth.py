@@ -0,0 +1,97 @@
+# mylibri/auth.py
+"""
+Login helpers for the MyLibri web app.
+
+Besides the UI login flow (sync and async), this module manages the saved
+Playwright `storage_state` that lets tests and sweeps start already signed
+in: `tests/conftest.py` logs in once per session, saves the state to
+`STORAGE_STATE_PATH` and re-uses it until it expires.
+
+The account comes from the VALID_USERNAME and VALID_PASSWORD environment
+variables; logging in without them raises `MissingCredentials`.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+
+from mylibri.config import URL, EMAIL, PASSWORD, STORAGE_STATE_MAX_AGE_MIN
+
+logger = logging.getLogger(__name__)
+
+STORAGE_STATE_PATH = Path(".auth/storage_state.json")
+
+
+class MissingCredentials(RuntimeError):
+    pass
+
+
+def require_credentials(email=None, password=None):
+    """`(email, password)`, from the arguments or else the environment; raises `MissingCredentials` if unset."""
+    email, password = email or EMAIL, password or PASSWORD
+    if not email or not password:
+        raise MissingCredentials("Set VALID_USERNAME and VALID_PASSWORD to the test account to run tests that log in")
+    return email, password
+
+
+def login(page, email=None, password=None, base_url=URL):
+    """Log in through the UI with a sync Playwright page (as the configured account unless given one)."""
+    email, password = require_credentials(email, password)
+    page.goto(base_url)
+    page.click("text=Sign In")
+    page.wait_for_url("**/signin", timeout=10000)
+    page.fill("input[type='email']", email)
+    page.fill("input[type='password']", password)
+    page.click("button:has-text('Login')")
+    page.wait_for_url("**/home/**", timeout=20000)
+
+
+async def login_async(page, email=None, password=None, base_url=URL):
+    """Log in through the UI with an async Playwright page (as the configured account unless given one)."""
+    email, password = require_credentials(email, password)
+    await page.goto(base_url)
+    await page.click("text=Sign In")
+    await page.wait_for_url("**/signin", timeout=10000)
+    await page.fill("input[type='email']", email)
+    await page.fill("input[type='password']", password)
+    await page.click("button:has-text('Login')")
+    await page.wait_for_url("**/home/**", timeout=20000)
+
+
+async def logout_async(page, base_url=URL):
+    """Log out through the profile menu with a signed-in async Playwright page."""
+    await page.goto(f"{base_url}/home/dashboard")
+    await page.click("img.profile_pic")
+    await page.click("text=Log Out")
+    await page.wait_for_url(lambda url: "/home/" not in url, timeout=10000)
+
+
+def storage_state_is_fresh(path=STORAGE_STATE_PATH, max_age_min=STORAGE_STATE_MAX_AGE_MIN, now=None):
+    """
+    True if the saved state at `path` can be re-used: it exists, parses,
+    is younger than `max_age_min` minutes and none of its cookies with an
+    expiry date have expired.
+    """
+    path = Path(path)
+    now = time.time() if now is None else now
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        age_min = (now - path.stat().st_mtime) / 60
+    except (OSError, ValueError):
+        return False
+    if age_min > max_age_min:
+        logger.info(f"[auth] Saved state is {age_min:.0f} min old (max {max_age_min}), logging in again")
+        return False
+    for cookie in state.get("cookies", []):
+        expires = cookie.get("expires", -1)
+        # -1 marks a session cookie, which has no expiry date of its own
+        if expires is not None and 0 <= expires <= now:
+            logger.info(f"[auth] Cookie {cookie.get('name')} in saved state has expired, logging in again")
+            return False
+    return True
+
+
+def is_signed_out(page):
+    """True if `page` was bounced to the sign-in page (the saved session was rejected)."""
+    return "/signin" in page.url
@@ -0,0 +1,120 @@
+# mylibri/boundary.py
+"""
+Estimate where the live book ID range ends before a sweep starts.
+
+An exponential probe walks upward from the first ID (1, 2, 4, 8, ... past
+it) until it lands in a dead region, then a binary search narrows the gap
+between the last live ID and that dead region. Catalogues have holes, so
+"dead" is never decided from one ID: each probe that misses also samples a
+few IDs spread over the next `gap` IDs before the region is written off.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAP = 30
+DEFAULT_GAP_SAMPLES = 6
+
+
+class BoundaryEstimate:
+    """The discovered live ID range and how many probes it cost."""
+
+    def __init__(self, start_id, end_id, probes):
+        self.start_id = start_id
+        self.end_id = end_id
+        self.probes = probes
+
+    def ids(self):
+        return range(self.start_id, self.end_id + 1)
+
+    def __repr__(self):
+        return f"BoundaryEstimate({self.start_id}-{self.end_id}, probes={self.probes})"
+
+
+class _RegionProber:
+    """Memoised liveness probes with gap sampling."""
+
+    def __init__(self, probe, gap, samples):
+        self._probe = probe
+        self._gap = gap
+        self._samples = samples
+        self._seen = {}
+
+    @property
+    def probes(self):
+        return len(self._seen)
+
+    async def is_live(self, book_id):
+        if book_id not in self._seen:
+            self._seen[book_id] = bool(await self._probe(book_id))
+        return self._seen[book_id]
+
+    async def live_at_or_after(self, book_id):
+        """Return a live ID in [book_id, book_id + gap], or None if the sampled region is dead."""
+        if await self.is_live(book_id):
+            return book_id
+        step = max(1, self._gap // self._samples)
+        for candidate in range(book_id + step, book_id + self._gap + 1, step):
+            if await self.is_live(candidate):
+                return candidate
+        return None
+
+
+async def discover_upper_bound(probe, start_id=1, gap=DEFAULT_GAP, samples=DEFAULT_GAP_SAMPLES, limit=10_000_000):
+    """
+    Estimate the highest live book ID at or above `start_id`.
+
+    `probe(book_id)` is an async callable returning True for a live book.
+    Returns a `BoundaryEstimate`; `end_id` is `start_id - 1` when nothing
+    live was found near the start.
+    """
+    prober = _RegionProber(probe, gap, samples)
+
+    low = await prober.live_at_or_after(start_id)
+    if low is None:
+        logger.warning(f"Boundary discovery: no live IDs within {gap} of {start_id}.")
+        return BoundaryEstimate(start_id, start_id - 1, prober.probes)
+
+    while True:
+        # Exponential phase: double the step until a probe lands in a dead region
+        step = 1
+        high = None
+        while low + step <= limit:
+            live = await prober.live_at_or_after(low + step)
+            if live is None:
+                high = low + step
+                break
+            low = live
+            step *= 2
+        if high is None:
+            logger.warning(f"Boundary discovery: still live at {low}; stopping at limit {limit}.")
+            return BoundaryEstimate(start_id, low, prober.probes)
+
+        # Binary phase: `low` is live, `high` starts a dead region
+        while high - low > 1:
+            mid = (low + high) // 2
+            live = await prober.live_at_or_after(mid)
+            if live is None:
+                high = mid
+            elif live < high:
+                low = live
+            else:
+                # A gap sample found books past the "dead" region; walk upward again from there
+                low = live
+                break
+        else:
+            break
+
+    estimate = BoundaryEstimate(start_id, low, prober.probes)
+    logger.info(f"Boundary discovery: live IDs {estimate.start_id}-{estimate.end_id} found with {estimate.probes} probes.")
+    return estimate
+
+
+def page_probe(page, check):
+    """Adapt a sweep check (see mylibri.sweep) into a boolean boundary probe on one page."""
+
+    async def probe(book_id):
+        return (await check(page, book_id))["status"] == "OK"
+
+    return probe
@@ -0,0 +1,82 @@
+# mylibri/browser_pool.py
+"""
+A small pool of long-lived browsers that hands out isolated contexts.
+
+`tests/conftest.py` keeps one pool per pytest process (so one per
+pytest-xdist worker). Browsers start lazily on first use and are shared
+for the whole session. Each test gets its own context, round-robin
+across the pool, and the context is closed when the test ends. A
+browser that has crashed or disconnected is relaunched the next time
+its slot comes up.
+"""
+
+import logging
+
+from mylibri.profiles import apply_profile
+
+logger = logging.getLogger(__name__)
+
+# Used when Playwright's device registry has no entry for the requested name
+DEFAULT_MOBILE_DEVICE = {
+    "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version='13.1.1' Mobile/15E148 Safari/604.1",
+    "viewport": {"width": 375, "height": 667},
+    "is_mobile": True,
+    "has_touch": True,
+    "device_scale_factor": 2,
+}
+
+
+class BrowserPool:
+    """`size` browsers of one `browser_type`, launched with `launch_options`."""
+
+    def __init__(self, browser_type, size=1, devices=None, **launch_options):
+        self.browser_type = browser_type
+        self.size = max(1, size)
+        self.devices = devices or {}
+        self.launch_options = launch_options
+        self._browsers = [None] * self.size
+        self._next = 0
+        self.launches = 0
+        self.contexts_created = 0
+
+    def browser(self, slot=None):
+        """The browser in `slot` (default: the next one round-robin), launching it if needed."""
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % self.size
+        current = self._browsers[slot]
+        if current is None or not current.is_connected():
+            if current is not None:
+                logger.warning(f"[pool] Browser {slot} disconnected, relaunching")
+            current = self.browser_type.launch(**self.launch_options)
+            self._browsers[slot] = current
+            self.launches += 1
+            logger.info(f"[pool] Launched {self.browser_type.name} browser {slot + 1}/{self.size}")
+        return current
+
+    def device_options(self, device):
+        """Context options for a named device, e.g. "iPhone 13"."""
+        if device in self.devices:
+            return dict(self.devices[device])
+        logger.warning(f"[pool] Device '{device}' not found in Playwright's built-in devices. Using default mobile settings.")
+        return dict(DEFAULT_MOBILE_DEVICE)
+
+    def new_context(self, device=None, profile=None, **options):
+        """
+        A new context on the next browser; `device` emulation is applied before
+        `options`, and `profile` (e.g. "lean") routes its requests.
+        """
+        if device:
+            options = {**self.device_options(device), **options}
+        self.contexts_created += 1
+        context = self.browser().new_context(**options)
+        if profile:
+            apply_profile(context, profile)
+        return context
+
+    def close(self):
+        for slot, browser in enumerate(self._browsers):
+            if browser is not None and browser.is_connected():
+                browser.close()
+            self._browsers[slot] = None
+        logger.info(f"[pool] Closed after {self.launches} launch(es) and {self.contexts_created} context(s)")
@@ -0,0 +1,93 @@
+# mylibri/checkpoint.py
+"""
+Append-only JSONL checkpoints for long sweeps.
+
+Every finished ID is written as one JSON line the moment it is known, so
+a crash or timeout loses at most the IDs that were in flight. On restart
+the checkpoint is read back and already-classified IDs are skipped;
+reports are built from the checkpoint rather than from memory.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = Path("test_reports/checkpoints")
+
+
+class SweepCheckpoint:
+    """One sweep's results on disk, keyed by book ID (the last line for an ID wins)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    @classmethod
+    def for_sweep(cls, name, start_id, end_id, directory=CHECKPOINT_DIR):
+        return cls(Path(directory) / f"{name}_{start_id}_{end_id}.jsonl")
+
+    def load(self):
+        """Return `{id: result}` for every line written so far, ignoring a torn final line."""
+        results = {}
+        if not self.path.exists():
+            return results
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable checkpoint line {line_no} in {self.path}")
+                    continue
+                results[result["id"]] = result
+        return results
+
+    def completed_ids(self):
+        """IDs that need no re-check; an ID whose check errored (see mylibri/retry.py) is checked again."""
+        return {book_id for book_id, result in self.load().items() if result.get("status") != "Error"}
+
+    def results(self):
+        """All checkpointed results sorted by book ID."""
+        loaded = self.load()
+        return [loaded[book_id] for book_id in sorted(loaded)]
+
+    def append(self, result):
+        """Write one result and flush it so it survives a crash of this process."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._file.tell() and not self.path.read_bytes().endswith(b"\n"):
+                # A crash mid-write left a torn line; start on a fresh one
+                self._file.write("\n")
+        result.setdefault("timestamp", datetime.now().isoformat())
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def archive(self, timestamp=None):
+        """
+        Move a finished checkpoint aside so the next run starts fresh; returns
+        the new path, or None when nothing was ever written to it.
+        """
+        self.close()
+        if not self.path.exists():
+            return None
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        archived = self.path.with_name(f"{self.path.stem}_{timestamp}{self.path.suffix}")
+        self.path.rename(archived)
+        return archived
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
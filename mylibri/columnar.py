@@ -0,0 +1,135 @@
+# mylibri/columnar.py
+"""
+Optional Parquet export of sweep, metadata and crawl history.
+
+Each finished run in the results warehouse (see mylibri/warehouse.py) is
+written once to a Parquet file under `PARQUET_DIR`, partitioned Hive-style
+by result type and run date:
+
+    test_reports/parquet/result_type=sweep/run_date=2025-06-07/run-12.parquet
+
+Result types are "sweep" (book ID sweeps in the links/broken modes),
+"metadata" (metadata sweeps) and "crawl". Trend analysis then reads only
+the partitions and columns it asks for (`load_results`) instead of
+parsing every JSON report in full.
+
+Needs pyarrow (`pip install pyarrow`); nothing else in the suite does,
+so it is imported only when an export or query runs.
+"""
+
+import logging
+from pathlib import Path
+
+from mylibri.config import PARQUET_DIR
+
+logger = logging.getLogger(__name__)
+
+RESULT_TYPES = ("sweep", "metadata", "crawl")
+# Columns per result type; run_id and book_id are integers, everything else text
+COLUMNS = {
+    "sweep": ("run_id", "book_id", "url", "status", "title", "failure", "error", "checked_at"),
+    "metadata": ("run_id", "book_id", "url", "status", "title", "author", "rating", "pages", "failure", "error",
+                 "checked_at"),
+    "crawl": ("run_id", "phase", "tier", "url", "status", "checked_at"),
+}
+INTEGER_COLUMNS = ("run_id", "book_id")
+# Rows read from SQLite and written per Parquet row group
+BATCH_ROWS = 50_000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def result_type(run):
+    """The result type of a warehouse run, or None for runs that are not exported (genres, timings...)."""
+    if run["kind"] == "crawl":
+        return "crawl"
+    if run["kind"] == "book":
+        return "metadata" if "metadata" in run["name"] else "sweep"
+    return None
+
+
+def partition_path(root, kind, run):
+    return Path(root) / f"result_type={kind}" / f"run_date={run['started_at'][:10]}" / f"run-{run['id']}.parquet"
+
+
+def schema_for(kind):
+    pa = _pyarrow()
+    return pa.schema([(name, pa.int64() if name in INTEGER_COLUMNS else pa.string()) for name in COLUMNS[kind]])
+
+
+def export_run(warehouse, run, root=PARQUET_DIR):
+    """Write one warehouse run to its partition file; returns the number of rows written."""
+    pa = _pyarrow()
+    kind = result_type(run)
+    table = "crawl_results" if kind == "crawl" else "book_results"
+    schema = schema_for(kind)
+    path = partition_path(root, kind, run)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name, so a crash never leaves a file that looks exported
+    partial = path.with_name(path.name + ".partial")
+    cursor = warehouse.db.execute(f"SELECT {', '.join(COLUMNS[kind])} FROM {table} WHERE run_id = ?", (run["id"],))
+    rows = 0
+    with pa.parquet.ParquetWriter(partial, schema, compression="zstd") as writer:
+        while True:
+            batch = cursor.fetchmany(BATCH_ROWS)
+            if not batch:
+                break
+            columns = [[row[i] for row in batch] for i in range(len(schema))]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            rows += len(batch)
+    partial.replace(path)
+    return rows
+
+
+def export_parquet(warehouse, root=PARQUET_DIR, kinds=RESULT_TYPES):
+    """
+    Export every finished sweep, metadata and crawl run that has no Parquet
+    file yet. Returns `{result_type: rows exported}`.
+    """
+    exported = {}
+    runs = warehouse.db.execute("SELECT * FROM runs WHERE finished_at IS NOT NULL ORDER BY started_at")
+    for run in [dict(row) for row in runs]:
+        kind = result_type(run)
+        if kind not in kinds or partition_path(root, kind, run).exists():
+            continue
+        rows = export_run(warehouse, run, root)
+        exported[kind] = exported.get(kind, 0) + rows
+        logger.info(f"[columnar] Run {run['id']} ({run['name']}): {rows} {kind} rows")
+    return exported
+
+
+def load_results(kind, columns=None, since=None, until=None, filter=None, root=PARQUET_DIR):
+    """
+    The exported results of one type as a `pyarrow.Table`, reading only
+    `columns` and the run dates from `since` to `until` (inclusive,
+    "YYYY-MM-DD"). `filter` is an extra `pyarrow.dataset` expression, e.g.
+    `pyarrow.dataset.field("status") != "OK"`.
+    """
+    pa = _pyarrow()
+    ds = pa.dataset
+    partitioning = ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(Path(root) / f"result_type={kind}", format="parquet", partitioning=partitioning)
+    expression = filter
+    for bound in (ds.field("run_date") >= since if since else None, ds.field("run_date") <= until if until else None):
+        if bound is not None:
+            expression = bound if expression is None else expression & bound
+    return dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+
+
+def status_trend(kind="sweep", since=None, until=None, root=PARQUET_DIR):
+    """Result counts per run date and status: `[{"run_date", "status", "count"}]`, oldest first."""
+    table = load_results(kind, columns=["run_date", "status"], since=since, until=until, root=root)
+    counts = table.group_by(["run_date", "status"]).aggregate([("status", "count")])
+    rows = [
+        {"run_date": row["run_date"], "status": row["status"], "count": row["status_count"]}
+        for row in counts.to_pylist()
+    ]
+    return sorted(rows, key=lambda row: (row["run_date"], row["status"]))
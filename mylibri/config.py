@@ -0,0 +1,105 @@
+# mylibri/config.py
+"""Site constants and environment-driven settings shared by the test suite."""
+
+import os
+
+URL = os.getenv("MYLIBRI_URL", "https://mylibribooks.com").rstrip("/")
+BOOK_URL_BASE = f"{URL}/home/books"
+# The test account logs in with VALID_USERNAME / VALID_PASSWORD from the
+# environment; there are no defaults (see mylibri.auth.require_credentials).
+EMAIL = os.getenv("VALID_USERNAME")
+PASSWORD = os.getenv("VALID_PASSWORD")
+# Re-use the saved login (see mylibri/auth.py) for at most this many minutes.
+STORAGE_STATE_MAX_AGE_MIN = float(os.getenv("STORAGE_STATE_MAX_AGE_MIN", "60"))
+
+# Browsers each pytest process (each xdist worker) keeps open for the session.
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+# Set to 0 to let contexts that opt into the "lean" profile load images,
+# fonts and trackers again (see mylibri/profiles.py).
+LEAN_PROFILE = os.getenv("LEAN_PROFILE", "1") == "1"
+
+# --- Rate limiting (see mylibri/ratelimit.py) ---
+# One budget for every navigation and HTTP probe of the whole run (0 = unlimited),
+# split evenly between the processes sharing it: the xdist workers, or under
+# run_suite.py every worker of every lane (see mylibri/ratelimit.py).
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "10"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+# Per path prefix "rate[:burst]", comma-separated, e.g. "/api=20:40,/home/books=4"
+RATE_LIMIT_OVERRIDES = os.getenv("RATE_LIMIT_OVERRIDES", "")
+# Backoff after a 429/503 (doubling per answer in a row, capped), and how
+# often such a request is tried again.
+RATE_LIMIT_BACKOFF_S = float(os.getenv("RATE_LIMIT_BACKOFF_S", "2"))
+RATE_LIMIT_BACKOFF_MAX_S = float(os.getenv("RATE_LIMIT_BACKOFF_MAX_S", "60"))
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "3"))
+
+# --- Book ID sweeps ---
+SWEEP_START_ID = int(os.getenv("SWEEP_START_ID", "1"))
+# Leave SWEEP_MAX_ID unset to discover the end of the live ID range
+# (see mylibri/boundary.py); set it to sweep a fixed range instead.
+SWEEP_MAX_ID = int(os.environ["SWEEP_MAX_ID"]) if os.getenv("SWEEP_MAX_ID") else None
+SWEEP_CONCURRENCY = int(os.getenv("SWEEP_CONCURRENCY", "4"))
+# The sweep test runs once per shard, each on its own slice of the ID range;
+# run_suite.py sets this to the slow lane's worker count.
+SWEEP_SHARDS = int(os.getenv("SWEEP_SHARDS", "1"))
+# "http" asks the book's JSON endpoint first and renders only ambiguous IDs;
+# "page" renders every book page.
+SWEEP_PROBE = os.getenv("SWEEP_PROBE", "http")
+# Sweep modes the sweep test runs, comma-separated (see mylibri/sweep.py:MODES):
+# "links", "broken" (only failed IDs are reported) and "metadata".
+SWEEP_MODES = [mode.strip() for mode in os.getenv("SWEEP_MODES", "broken").split(",") if mode.strip()]
+# Attempts per ID when a check times out, loses the connection or gets a
+# 5xx (see mylibri/retry.py); backoff doubles per attempt, with jitter.
+SWEEP_RETRY_ATTEMPTS = int(os.getenv("SWEEP_RETRY_ATTEMPTS", "3"))
+SWEEP_RETRY_BACKOFF_S = float(os.getenv("SWEEP_RETRY_BACKOFF_S", "1"))
+SWEEP_RETRY_BACKOFF_MAX_S = float(os.getenv("SWEEP_RETRY_BACKOFF_MAX_S", "15"))
+
+# Incremental mode re-checks only broken, new and stale IDs plus a sample
+# of known-good ones (see mylibri/incremental.py).
+SWEEP_INCREMENTAL = os.getenv("SWEEP_INCREMENTAL", "0") == "1"
+SWEEP_MAX_AGE_DAYS = float(os.getenv("SWEEP_MAX_AGE_DAYS", "7"))
+SWEEP_SAMPLE_PCT = float(os.getenv("SWEEP_SAMPLE_PCT", "5"))
+
+# --- Full-site crawls (see mylibri/crawler.py) ---
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "6"))
+# Requests allowed to one host at the same time (pages and HTTP checks together)
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "4"))
+# Upper bound on pages per crawl phase (0 = no limit)
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5000"))
+# Links followed from a seed before pages stop being rendered (0 = no limit)
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "0"))
+# HEAD/GET status checks for links that are not rendered (assets, external sites)
+CRAWL_HTTP_CONCURRENCY = int(os.getenv("CRAWL_HTTP_CONCURRENCY", "16"))
+# A URL whose last check passed less than this many hours ago is not checked
+# again by a crawl with a store (see mylibri/crawl_store.py); 0 re-checks all.
+CRAWL_MAX_AGE_HOURS = float(os.getenv("CRAWL_MAX_AGE_HOURS", "24"))
+# How page URLs are canonicalized before they are queued (see mylibri/links.py).
+# Query parameters matching CRAWL_KEEP_PARAMS ("*" = all) and not matching
+# CRAWL_DROP_PARAMS survive; patterns may end in "*". Trailing slashes are
+# stripped, kept or added; paths are lowercased only when asked.
+CRAWL_KEEP_PARAMS = os.getenv("CRAWL_KEEP_PARAMS", "page")
+CRAWL_DROP_PARAMS = os.getenv("CRAWL_DROP_PARAMS", "utm_*,fbclid,gclid,ref")
+CRAWL_TRAILING_SLASH = os.getenv("CRAWL_TRAILING_SLASH", "strip")
+CRAWL_LOWERCASE_PATHS = os.getenv("CRAWL_LOWERCASE_PATHS", "0") == "1"
+# Pages whose main content hashes the same as an earlier page are not
+# expanded; content shorter than this many characters is never compared.
+CRAWL_CONTENT_MIN_CHARS = int(os.getenv("CRAWL_CONTENT_MIN_CHARS", "200"))
+
+# --- Suite runner lanes (see mylibri/lanes.py) ---
+# pytest-xdist workers per lane, and browsers each of those workers may keep open.
+FAST_LANE_WORKERS = int(os.getenv("FAST_LANE_WORKERS", "4"))
+SLOW_LANE_WORKERS = int(os.getenv("SLOW_LANE_WORKERS", "2"))
+MOBILE_LANE_WORKERS = int(os.getenv("MOBILE_LANE_WORKERS", "2"))
+FAST_LANE_BROWSERS = int(os.getenv("FAST_LANE_BROWSERS", "1"))
+SLOW_LANE_BROWSERS = int(os.getenv("SLOW_LANE_BROWSERS", "1"))
+MOBILE_LANE_BROWSERS = int(os.getenv("MOBILE_LANE_BROWSERS", "1"))
+
+# --- Report files (see mylibri/reports.py) ---
+# Report files are flushed every this many rows, or after this many seconds.
+REPORT_FLUSH_EVERY = int(os.getenv("REPORT_FLUSH_EVERY", "100"))
+REPORT_FLUSH_S = float(os.getenv("REPORT_FLUSH_S", "5"))
+
+# --- Results warehouse (see mylibri/warehouse.py) ---
+# Every run's results also go into this SQLite database.
+RESULTS_DB = os.getenv("RESULTS_DB", "test_reports/results.sqlite")
+# Partitioned Parquet copies of sweep and crawl runs (optional, needs pyarrow; see mylibri/columnar.py)
+PARQUET_DIR = os.getenv("PARQUET_DIR", "test_reports/parquet")
@@ -0,0 +1,205 @@
+# mylibri/crawl_store.py
+"""
+SQLite-backed frontier and visited set for full-site crawls.
+
+Each crawl run records every URL it enqueues (with its phase and tier) and
+marks it done once checked, committing as it goes, so a crawl that is
+stopped or crashes resumes where it left off: the next run sees the
+unfinished run, restores its visited set and re-queues only the URLs
+that were still pending.
+
+Checks outlive runs. The last status of every URL, and the links found on
+every rendered page, are kept, so a later run can skip a URL whose last
+check passed less than `CRAWL_MAX_AGE_HOURS` ago and follow its stored
+links instead of rendering it again. Broken URLs are always re-checked.
+
+A phase that checks URLs again on purpose (the signed-out crawl after a
+real logout, see `mylibri.crawler.run_crawl`) keeps its checks apart as
+revisits, so they neither mark URLs visited nor replace an earlier
+phase's result. Like the frontier, revisits belong to the current run.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from mylibri.checkpoint import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+CRAWL_STORE_PATH = CHECKPOINT_DIR / "crawl_frontier.sqlite"
+# The core-pages crawl (tests/fast/test_full_crawl_broken_links.py) keeps its own frontier
+CORE_CRAWL_STORE_PATH = CHECKPOINT_DIR / "core_crawl_frontier.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    base_url TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    phase TEXT,
+    depth INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    url TEXT PRIMARY KEY,
+    phase TEXT,
+    tier TEXT NOT NULL,
+    status TEXT NOT NULL,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revisits (
+    phase TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    status TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (phase, url)
+);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+);
+"""
+
+
+def status_is_ok(status):
+    return isinstance(status, int) and status < 400
+
+
+class CrawlStore:
+    """One crawl's frontier (the current run) plus the check history of every URL."""
+
+    def __init__(self, path=CRAWL_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Crawls run their event loop on a worker thread (see mylibri/sweep.py:run_in_thread)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(frontier)")}
+        if "depth" not in columns:
+            # Stores written before crawls had depth budgets
+            self.db.execute("ALTER TABLE frontier ADD COLUMN depth INTEGER NOT NULL DEFAULT 0")
+        self.run_id = None
+        self.resumed = False
+
+    def begin(self):
+        """Resume the unfinished run if there is one, otherwise start a new run with an empty frontier."""
+        row = self.db.execute("SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1").fetchone()
+        if row:
+            self.run_id, self.resumed = row[0], True
+            pending = self.db.execute("SELECT COUNT(*) FROM frontier WHERE state = 'queued'").fetchone()[0]
+            logger.info(f"[crawl] Resuming run {self.run_id}: {len(self.visited_urls())} URLs seen, {pending} pending")
+        else:
+            with self.db:
+                self.db.execute("DELETE FROM frontier")
+                self.db.execute("DELETE FROM revisits")
+                self.run_id = self.db.execute(
+                    "INSERT INTO runs (started_at) VALUES (?)", (datetime.now().isoformat(),)
+                ).lastrowid
+            self.resumed = False
+        return self.run_id
+
+    def finish(self):
+        with self.db:
+            self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (datetime.now().isoformat(), self.run_id))
+
+    def visited_urls(self):
+        return {url for (url,) in self.db.execute("SELECT url FROM frontier")}
+
+    def pending(self, phase):
+        """`(url, base_url, tier, depth)` still queued for `phase` when the run stopped."""
+        return self.db.execute(
+            "SELECT url, base_url, tier, depth FROM frontier WHERE state = 'queued' AND phase = ? ORDER BY rowid",
+            (phase,),
+        ).fetchall()
+
+    def enqueue(self, url, base_url, tier, phase, depth=0, state="queued"):
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO frontier (url, base_url, tier, phase, depth, state) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, base_url, tier, phase, depth, state),
+            )
+
+    def is_fresh(self, url, max_age_hours, now=None):
+        """True when `url` last passed its check less than `max_age_hours` ago."""
+        if max_age_hours <= 0:
+            return False
+        row = self.db.execute("SELECT status, checked_at FROM checks WHERE url = ?", (url,)).fetchone()
+        if not row or not row[0].isdigit() or int(row[0]) >= 400:
+            return False
+        now = now or datetime.now()
+        return now - datetime.fromisoformat(row[1]) < timedelta(hours=max_age_hours)
+
+    def outlinks(self, url):
+        """`(target, tier)` for each link found the last time `url` was rendered."""
+        return self.db.execute("SELECT target, tier FROM links WHERE source = ?", (url,)).fetchall()
+
+    def record(self, record, links=()):
+        """Mark a checked URL done, keep its status and (for rendered pages) the links it holds."""
+        url = record["url"]
+        with self.db:
+            self.db.execute("UPDATE frontier SET state = 'done' WHERE url = ?", (url,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO checks (url, phase, tier, status, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (url, record["phase"], record["tier"], str(record["status"]), datetime.now().isoformat()),
+            )
+            if record["tier"] == "render" and status_is_ok(record["status"]):
+                self.db.execute("DELETE FROM links WHERE source = ?", (url,))
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO links (source, target, tier) VALUES (?, ?, ?)",
+                    [(url, target, tier) for target, tier in links],
+                )
+
+    def record_revisit(self, record):
+        """Keep a check made by a phase that re-visits URLs; the frontier and URL history are left alone."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO revisits (phase, url, tier, status, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (record["phase"], record["url"], record["tier"], str(record["status"]), datetime.now().isoformat()),
+            )
+
+    def known_pages(self, phase):
+        """Pages that rendered fine in `phase` of any earlier run, newest check first."""
+        rows = self.db.execute(
+            "SELECT url, status FROM checks WHERE tier = 'render' AND phase = ? ORDER BY checked_at DESC", (phase,)
+        )
+        return [url for url, status in rows if status.isdigit() and int(status) < 400]
+
+    def iter_run_results(self):
+        """
+        `{phase, url, status, tier}` for every URL checked in this run, including
+        before a resume, read off the cursor one row at a time, then the
+        revisits. The frontier is kept until the next run begins, so this
+        also works after `finish`.
+        """
+        checked = self.db.execute(
+            "SELECT c.phase, c.url, c.status, c.tier FROM frontier f JOIN checks c ON c.url = f.url "
+            "WHERE f.state = 'done' ORDER BY f.rowid"
+        )
+        revisited = self.db.execute("SELECT phase, url, status, tier FROM revisits ORDER BY rowid")
+        for rows in (checked, revisited):
+            for phase, url, status, tier in rows:
+                yield {"phase": phase, "url": url, "status": int(status) if status.isdigit() else status,
+                       "tier": tier}
+
+    def run_results(self):
+        return list(self.iter_run_results())
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,387 @@
+# mylibri/crawler.py
+"""
+Concurrent two-tier crawler for the full broken-link checks.
+
+A crawl drives a fixed pool of pages in one browser context. Pages pull
+same-site documents from a shared frontier, render them, record
+`{phase, url, status, tier}` and push newly found links back onto the
+frontier. Links that cannot lead to more pages (external sites, PDFs,
+images and other assets, see mylibri/links.py) never get a page: a pool
+of HTTP workers checks them with HEAD (GET where HEAD is refused)
+through the context's APIRequestContext, which sends the same cookies as
+the pages. A per-host semaphore caps concurrent requests to one host
+across both tiers, and every request waits for a token from the shared
+rate limiter (see mylibri/ratelimit.py).
+
+URLs are de-duplicated as they are enqueued, so the frontier never holds
+the same URL twice, and `max_pages` caps how many pages one crawl renders.
+With a `CrawlStore` the frontier and visited set live in SQLite, so a run
+can be stopped and resumed and fresh URLs are not checked again. The
+frontier's counters (queue size, duplicate hits, pages per second) are
+logged every `PROGRESS_EVERY` URLs and at the end of each phase.
+
+Page links are canonicalized before they are queued (query parameters,
+trailing slash and case, see `mylibri.links.canonicalize`), so variants
+of one URL are rendered once. A rendered page whose main content hashes
+the same as an earlier page's is recorded but its links are not
+followed, which stops SPA routes that all serve the same shell from
+fanning out. Both kinds of skipped render are counted and logged.
+"""
+
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+from mylibri.config import (
+    CRAWL_CONCURRENCY, CRAWL_PER_HOST, CRAWL_MAX_PAGES, CRAWL_HTTP_CONCURRENCY, CRAWL_MAX_AGE_HOURS,
+    CRAWL_CONTENT_MIN_CHARS, CRAWL_MAX_DEPTH,
+)
+from mylibri.links import canonicalize, extract_link_tiers_async, origin_of
+from mylibri.ratelimit import throttled_fetch, throttled_goto
+from mylibri.seeds import discover_seeds
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = 15000
+# Log the crawl counters every this many checked URLs
+PROGRESS_EVERY = 100
+# Servers that refuse or mishandle HEAD answer with these; retry with GET
+HEAD_REFUSED = (403, 405, 501)
+
+
+class Frontier:
+    """
+    Pages waiting to be rendered, links waiting for a status check, and
+    every URL ever enqueued (shared across phases).
+
+    With a `CrawlStore` every enqueued URL is also written to disk, and URLs
+    whose last check is fresher than `max_age_hours` are not queued again:
+    their stored links are followed instead (`fresh_skips` counts them).
+
+    Seeds are depth 0 and a page's links one deeper; pages deeper than
+    `max_depth` (0 = no limit) are not rendered (`depth_skips`). Links
+    checked over HTTP are not limited by depth.
+    """
+
+    def __init__(self, visited=None, max_pages=CRAWL_MAX_PAGES, store=None, phase=None,
+                 max_age_hours=CRAWL_MAX_AGE_HOURS, max_depth=CRAWL_MAX_DEPTH):
+        self.queue = asyncio.Queue()
+        self.http_queue = asyncio.Queue()
+        self.visited = visited if visited is not None else set()
+        self.max_pages = max_pages
+        self.store = store
+        self.phase = phase
+        self.max_age_hours = max_age_hours
+        self.max_depth = max_depth
+        self.enqueued = 0
+        self.dedup_hits = 0
+        self.fresh_skips = 0
+        self.depth_skips = 0
+        self.canonical_merges = 0
+        self.content_duplicates = 0
+        self.content_hashes = {}
+        self.peak_size = 0
+        self.rendered = 0
+        self.checked = 0
+        self.started = time.perf_counter()
+
+    def add(self, url, base_url, tier="render", depth=0):
+        """Queue `url` unless it was seen before; returns whether it was new."""
+        if url in self.visited:
+            self.dedup_hits += 1
+            return False
+        # Fresh URLs are not queued, but the links stored for them are
+        links = [(url, tier, depth)]
+        while links:
+            url, tier, depth = links.pop()
+            if url in self.visited:
+                self.dedup_hits += 1
+                continue
+            if tier == "render":
+                if self.max_depth and depth > self.max_depth:
+                    # Not marked visited: a shorter path may still reach it
+                    self.depth_skips += 1
+                    continue
+                if self.max_pages and self.enqueued >= self.max_pages:
+                    continue
+            self.visited.add(url)
+            if self.store and self.store.is_fresh(url, self.max_age_hours):
+                self.store.enqueue(url, base_url, tier, self.phase, depth, state="fresh")
+                self.fresh_skips += 1
+                links += [(link, link_tier, depth + 1) for link, link_tier in self.store.outlinks(url)]
+                continue
+            if self.store:
+                self.store.enqueue(url, base_url, tier, self.phase, depth)
+            self.put(url, base_url, tier, depth)
+        return True
+
+    def put(self, url, base_url, tier, depth=0):
+        if tier == "render":
+            self.enqueued += 1
+            self.queue.put_nowait((url, base_url, depth))
+        else:
+            self.http_queue.put_nowait(url)
+        self.peak_size = max(self.peak_size, self.size())
+
+    def restore(self):
+        """Re-queue this phase's URLs that were still pending when a stored run stopped (call before seeding)."""
+        for url, base_url, tier, depth in self.store.pending(self.phase):
+            self.put(url, base_url, tier, depth)
+
+    def size(self):
+        return self.queue.qsize() + self.http_queue.qsize()
+
+    def counters(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "frontier_size": self.size(),
+            "peak_size": self.peak_size,
+            "rendered": self.rendered,
+            "checked": self.checked,
+            "dedup_hits": self.dedup_hits,
+            "fresh_skips": self.fresh_skips,
+            "depth_skips": self.depth_skips,
+            "canonical_merges": self.canonical_merges,
+            "content_duplicates": self.content_duplicates,
+            "pages_per_sec": self.rendered / elapsed if elapsed else 0.0,
+        }
+
+    def log_progress(self, phase):
+        c = self.counters()
+        logger.info(f"[crawl] {phase}: {c['rendered']} pages rendered ({c['pages_per_sec']:.1f}/s), "
+                    f"{c['checked']} links checked over HTTP, {c['frontier_size']} queued, "
+                    f"{c['dedup_hits']} duplicate links skipped, {c['fresh_skips']} fresh URLs skipped, "
+                    f"{c['depth_skips']} pages beyond the depth budget, "
+                    f"renders skipped: {c['canonical_merges']} by canonical URLs, "
+                    f"{c['content_duplicates']} duplicate pages not expanded")
+
+
+async def check_status(request, url, timeout=TIMEOUT):
+    """Status code for `url` from a HEAD request, falling back to GET."""
+    try:
+        response = await throttled_fetch(request, "head", url, timeout=timeout)
+        await response.dispose()
+        if response.status not in HEAD_REFUSED:
+            return response.status
+    except Exception as e:
+        logger.debug(f"[crawl] HEAD {url} failed, retrying with GET: {e}")
+    try:
+        response = await throttled_fetch(request, "get", url, timeout=timeout)
+        await response.dispose()
+        return response.status
+    except Exception as e:
+        return f"Error: {e}"
+
+
+async def crawl(context, seeds, phase, visited=None, concurrency=CRAWL_CONCURRENCY,
+                per_host=CRAWL_PER_HOST, max_pages=CRAWL_MAX_PAGES, on_result=None, timeout=TIMEOUT,
+                frontier=None, http_concurrency=CRAWL_HTTP_CONCURRENCY, store=None, rules=None,
+                content_min_chars=CRAWL_CONTENT_MIN_CHARS, max_depth=CRAWL_MAX_DEPTH):
+    """
+    Crawl everything reachable from `seeds`: same-site pages are rendered
+    by `concurrency` pages, every other link gets one of `http_concurrency`
+    HTTP status checks.
+
+    `visited` (a set) is shared with other phases so a URL is only checked
+    once per run. Returns the `{phase, url, status, tier}` records in the
+    order they finished; `on_result(record)` is called as each one arrives.
+    Pass a `Frontier` to read its counters afterwards, and a `CrawlStore`
+    (see mylibri/crawl_store.py) to keep the frontier on disk and pick up
+    URLs left pending by an interrupted run. `rules` overrides the
+    canonicalization rules from mylibri/config.py.
+    """
+    frontier = frontier or Frontier(visited, max_pages=max_pages, store=store, phase=phase, max_depth=max_depth)
+    if frontier.store:
+        frontier.restore()
+    for seed in seeds:
+        base_url = origin_of(seed)
+        frontier.add(canonicalize(seed, rules), base_url)
+    host_limits = {}
+    results = []
+
+    def host_limit(url):
+        return host_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(per_host))
+
+    def finish(record, links=()):
+        results.append(record)
+        if record["tier"] == "render":
+            frontier.rendered += 1
+        else:
+            frontier.checked += 1
+        if frontier.store:
+            frontier.store.record(record, links)
+        if on_result:
+            on_result(record)
+        if len(results) % PROGRESS_EVERY == 0:
+            frontier.log_progress(phase)
+
+    async def visit(page, url, base_url, depth):
+        async with host_limit(url):
+            try:
+                response = await throttled_goto(page, url, wait_until="domcontentloaded", timeout=timeout)
+                status = response.status if response else "No response"
+                pages, resources, (content_hash, content_length) = await extract_link_tiers_async(
+                    page, base_url, rules)
+            except Exception as e:
+                logger.info(f"[crawl] ❌ Error visiting {url}: {e}")
+                return {"phase": phase, "url": url, "status": f"Error: {e}", "tier": "render"}, []
+        record = {"phase": phase, "url": url, "status": status, "tier": "render"}
+        if content_length >= content_min_chars:
+            first = frontier.content_hashes.setdefault(content_hash, url)
+            if first != url:
+                frontier.content_duplicates += 1
+                logger.info(f"[crawl] {url} renders the same content as {first}, not following its links")
+                return record, []
+        for link, raws in pages.items():
+            queued = frontier.add(link, base_url, depth=depth + 1)
+            variants = sum(1 for raw in raws if raw != link)
+            # Every variant beyond the one URL that gets rendered is a render saved
+            frontier.canonical_merges += variants - (1 if queued and link not in raws else 0)
+        for link in resources:
+            frontier.add(link, base_url, tier="http")
+        return record, [(link, "render") for link in pages] + [(link, "http") for link in resources]
+
+    def settle(url, tier, outcome):
+        """
+        Record one URL's `(record, links)`, or an error record when its check
+        raised `outcome`; a failure never ends the worker.
+        """
+        if isinstance(outcome, Exception):
+            logger.warning(f"[crawl] ❌ {tier} check of {url} failed: {outcome}")
+            outcome = {"phase": phase, "url": url, "status": f"Error: {outcome}", "tier": tier}, []
+        try:
+            finish(*outcome)
+        except Exception as e:
+            # The store or the on_result callback failed on this record; carry on with the next URL
+            logger.warning(f"[crawl] Could not record {url}: {e}")
+
+    async def worker(worker_id):
+        page = await context.new_page()
+        try:
+            while True:
+                url, base_url, depth = await frontier.queue.get()
+                try:
+                    try:
+                        outcome = await visit(page, url, base_url, depth)
+                    except Exception as e:
+                        outcome = e
+                    settle(url, "render", outcome)
+                finally:
+                    frontier.queue.task_done()
+        finally:
+            await page.close()
+
+    async def http_worker(worker_id):
+        while True:
+            url = await frontier.http_queue.get()
+            try:
+                try:
+                    async with host_limit(url):
+                        status = await check_status(context.request, url, timeout=timeout)
+                    outcome = ({"phase": phase, "url": url, "status": status, "tier": "http"}, ())
+                except Exception as e:
+                    outcome = e
+                settle(url, "http", outcome)
+            finally:
+                frontier.http_queue.task_done()
+
+    async def drained(queue):
+        # Wait for the queue, unless a worker dies: then nothing may be left to drain it
+        joined = asyncio.ensure_future(queue.join())
+        done, _ = await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+        if joined in done:
+            return
+        joined.cancel()
+        dead = next(task for task in done if task is not joined)
+        raise dead.exception() or RuntimeError("crawl worker stopped early")
+
+    workers = [asyncio.create_task(worker(n)) for n in range(max(1, concurrency))]
+    workers += [asyncio.create_task(http_worker(n)) for n in range(max(1, http_concurrency))]
+    try:
+        # Only rendered pages enqueue links, so once they are done the HTTP queue can only drain
+        await drained(frontier.queue)
+        await drained(frontier.http_queue)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    frontier.log_progress(phase)
+    return results
+
+
+async def run_crawl(phases, concurrency=CRAWL_CONCURRENCY, per_host=CRAWL_PER_HOST,
+                    max_pages=CRAWL_MAX_PAGES, headless=True, on_result=None, store=None, profile=None,
+                    max_depth=CRAWL_MAX_DEPTH):
+    """
+    Launch Chromium and crawl each `(phase, seeds, storage_state)` in turn,
+    each phase in its own context (signed in when `storage_state` is given)
+    routed through context `profile` (see mylibri/profiles.py). The visited
+    set is shared, so later phases skip URLs already checked.
+
+    A phase may carry a fourth item, a dict overriding `max_pages` and
+    `max_depth` for that phase and naming extra seed sources under
+    `"seed_from"` (any of "sitemap", "routes", "previous"; see mylibri/seeds.py).
+    With `"logout": True` the phase logs in and out through the UI in its
+    own throwaway context (the saved session is never logged out) and
+    crawls signed out from there. Seeing pages again after the logout is
+    the point, so that phase has its own visited set and its checks are
+    kept as revisits in the `store`; on a resume it runs again in full.
+
+    With a `store` an interrupted run is resumed, and the returned records
+    cover the whole run, including URLs checked before the interruption.
+    """
+    from playwright.async_api import async_playwright
+    from mylibri.auth import login_async, logout_async
+    from mylibri.profiles import apply_profile_async
+
+    visited = set()
+    if store:
+        store.begin()
+        visited = store.visited_urls()
+    results = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            for phase, seeds, storage_state, *extra in phases:
+                options = extra[0] if extra else {}
+                logout = options.get("logout", False)
+                context = await browser.new_context(storage_state=None if logout else storage_state)
+                await apply_profile_async(context, profile)
+                try:
+                    phase_visited, phase_store, phase_on_result = visited, store, on_result
+                    if logout:
+                        page = await context.new_page()
+                        await login_async(page)
+                        await logout_async(page)
+                        await page.close()
+                        logger.info(f"[crawl] {phase}: logged out, crawling signed out")
+
+                        def phase_on_result(record):
+                            if store:
+                                store.record_revisit(record)
+                            if on_result:
+                                on_result(record)
+
+                        phase_visited, phase_store = set(), None
+                    seeds = list(seeds)
+                    if options.get("seed_from"):
+                        seeds += await discover_seeds(context, seeds, phase, options["seed_from"], store=store)
+                    results += await crawl(
+                        context, seeds, phase,
+                        visited=phase_visited,
+                        concurrency=concurrency,
+                        per_host=per_host,
+                        max_pages=options.get("max_pages", max_pages),
+                        max_depth=options.get("max_depth", max_depth),
+                        on_result=phase_on_result,
+                        store=phase_store,
+                    )
+                finally:
+                    await context.close()
+        finally:
+            await browser.close()
+    if store:
+        results = store.run_results()
+        store.finish()
+    return results
@@ -0,0 +1,108 @@
+# mylibri/dashboard.py
+"""
+Data files for `docs/dashboard.html`.
+
+The dashboard reads a small `index.json` and then the book shards it
+lists, `books-<generation>-0000.json`, `-0001.json`, ... of
+`DASHBOARD_SHARD_ROWS` books each. The first shard is enough to draw the
+first screen, and the rest load in the background for search. Rows are
+arrays in the order of `index["fields"]` rather than objects, which keeps
+the shards small.
+
+`DashboardWriter` takes records one at a time, in book ID order (as
+`mylibri.summary.merge_sources` yields them), so it never holds more than
+one shard. Each write uses new shard names (the generation is the write
+time), and the index is written last, replacing the old one in a single
+rename; only then are the previous generation's shards removed. A failed
+write leaves the old index and shards untouched, and browsers never serve
+a cached shard from an older generation.
+
+    python generate_summary.py --dashboard docs/data
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from mylibri.incremental import normalize_result
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_DIR = Path("docs/data")
+DASHBOARD_FIELDS = ("id", "title", "author", "status", "url")
+DASHBOARD_SHARD_ROWS = 500
+SHARD_GLOB = "books-*.json"
+
+
+def _write_json(path, data):
+    """Write `data` to `path` via a temporary file, so readers see the old file or the new one, never half."""
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(partial, path)
+
+
+class DashboardWriter:
+    def __init__(self, out_dir=DASHBOARD_DIR, shard_rows=DASHBOARD_SHARD_ROWS, fields=DASHBOARD_FIELDS):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_rows = max(1, shard_rows)
+        self.fields = list(fields)
+        self.shards = []
+        self.statuses = Counter()
+        self.skipped = 0
+        self.latest = ""
+        self.generation = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        self._rows = []
+
+    def write(self, record):
+        """Add one book; records without a numeric book ID (crawled URLs) are skipped."""
+        try:
+            book = normalize_result(record, datetime.now())
+        except (KeyError, TypeError, ValueError):
+            self.skipped += 1
+            return
+        self.statuses[book["status"]] += 1
+        self.latest = max(self.latest, str(book["timestamp"]))
+        self._rows.append([book.get(field) for field in self.fields])
+        if len(self._rows) >= self.shard_rows:
+            self._flush_shard()
+
+    def _flush_shard(self):
+        name = f"books-{self.generation}-{len(self.shards):04d}.json"
+        _write_json(self.out_dir / name, self._rows)
+        self.shards.append({"file": name, "count": len(self._rows),
+                            "first_id": self._rows[0][0], "last_id": self._rows[-1][0]})
+        self._rows = []
+
+    @property
+    def count(self):
+        return sum(shard["count"] for shard in self.shards) + len(self._rows)
+
+    def close(self):
+        if self._rows:
+            self._flush_shard()
+        _write_json(self.out_dir / "index.json", {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "latest_check": self.latest or None,
+            "total": self.count,
+            "fields": self.fields,
+            "statuses": dict(self.statuses),
+            "shards": self.shards,
+        })
+        listed = {shard["file"] for shard in self.shards}
+        for stale in self.out_dir.glob(SHARD_GLOB):
+            if stale.name not in listed:
+                stale.unlink()
+        logger.info(f"[dashboard] {self.count} books in {len(self.shards)} shards under {self.out_dir}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A failed merge leaves the previous dashboard data in place
+        if exc_type is None:
+            self.close()
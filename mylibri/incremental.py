@@ -0,0 +1,140 @@
+# mylibri/incremental.py
+"""
+Incremental re-validation on top of earlier sweep results.
+
+The latest previous result set in `test_reports/` is loaded as a snapshot
+keyed by book ID. A new run only re-checks IDs that were broken, are new
+to the snapshot, or were last checked longer ago than a configurable age,
+plus a random sample of known-good IDs; everything else is carried over,
+so the merged output is still a full snapshot of the catalogue.
+"""
+
+import json
+import logging
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from mylibri.checkpoint import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = Path("test_reports")
+SNAPSHOT_PATTERNS = (
+    "book_id_sweep_*.json", "book_metadata_*.json", "book_id_sweep_*.ndjson", "book_metadata_*.ndjson",
+)
+FILE_TIMESTAMP = re.compile(r"(\d{8}_\d{6})")
+
+
+def file_timestamp(path):
+    """The run time encoded in a report file name, falling back to its mtime."""
+    match = FILE_TIMESTAMP.findall(Path(path).stem)
+    if match:
+        return datetime.strptime(match[-1], "%Y%m%d_%H%M%S")
+    return datetime.fromtimestamp(Path(path).stat().st_mtime)
+
+
+def find_result_sets(report_dir=REPORT_DIR, patterns=SNAPSHOT_PATTERNS, checkpoint_dir=CHECKPOINT_DIR,
+                     checkpoint_pattern="*.jsonl"):
+    """All previous result files, oldest first: JSON reports plus archived sweep checkpoints."""
+    paths = [p for pattern in patterns for p in Path(report_dir).glob(pattern)]
+    # Archived checkpoints carry a run timestamp; live ones (still being written) do not
+    paths += [p for p in Path(checkpoint_dir).glob(checkpoint_pattern) if FILE_TIMESTAMP.search(p.stem)]
+    return sorted(paths, key=file_timestamp)
+
+
+def normalize_result(record, checked_at):
+    """Give older report rows (which only list id/url/title) the fields a snapshot needs."""
+    record = dict(record)
+    record["id"] = int(record["id"])
+    if "status" not in record:
+        comment = record.get("comment")
+        if comment is not None:
+            record["status"] = "OK" if comment == "Valid" else "Broken"
+        else:
+            record["status"] = "OK" if record.get("title") not in (None, "", "N/A") else "Broken"
+    record.setdefault("timestamp", checked_at.isoformat())
+    return record
+
+
+def load_result_set(path):
+    """Read one JSON, or JSONL/NDJSON (one object per line), result file into `{id: result}`."""
+    path = Path(path)
+    checked_at = file_timestamp(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = json.load(f)
+    snapshot = {}
+    for row in rows:
+        if isinstance(row, dict) and "id" in row:
+            result = normalize_result(row, checked_at)
+            snapshot[result["id"]] = result
+    return snapshot
+
+
+def load_latest_snapshot(report_dir=REPORT_DIR, patterns=SNAPSHOT_PATTERNS, checkpoint_dir=CHECKPOINT_DIR,
+                         id_range=None, checkpoint_pattern="*.jsonl"):
+    """
+    Return `(snapshot, path)` for the newest readable result set, or `({}, None)`.
+
+    With `id_range=(first, last)` only result sets holding at least one ID in
+    that range count, and the snapshot is trimmed to it, so a sharded sweep
+    picks up the newest previous results for its own slice. `patterns` and
+    `checkpoint_pattern` narrow the search to one kind of sweep.
+    """
+    for path in reversed(find_result_sets(report_dir, patterns, checkpoint_dir, checkpoint_pattern)):
+        try:
+            snapshot = load_result_set(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable result set {path}: {e}")
+            continue
+        if id_range:
+            snapshot = {k: v for k, v in snapshot.items() if id_range[0] <= k <= id_range[1]}
+        if snapshot:
+            logger.info(f"Loaded {len(snapshot)} previous results from {path}")
+            return snapshot, path
+    return {}, None
+
+
+def plan_revalidation(previous, candidate_ids, max_age=timedelta(days=7), sample_pct=5.0, now=None, rng=random):
+    """
+    Decide which of `candidate_ids` need checking this run.
+
+    Returns `(ids_to_check, counts)` where `counts` breaks the plan down into
+    broken / new / stale / sampled / reused IDs.
+    """
+    now = now or datetime.now()
+    counts = {"broken": 0, "new": 0, "stale": 0, "sampled": 0, "reused": 0}
+    to_check = set()
+    known_good = []
+    for book_id in candidate_ids:
+        result = previous.get(book_id)
+        if result is None:
+            counts["new"] += 1
+            to_check.add(book_id)
+        elif result["status"] != "OK":
+            counts["broken"] += 1
+            to_check.add(book_id)
+        elif now - datetime.fromisoformat(result["timestamp"]) > max_age:
+            counts["stale"] += 1
+            to_check.add(book_id)
+        else:
+            known_good.append(book_id)
+
+    sample_size = min(len(known_good), round(len(known_good) * sample_pct / 100))
+    sampled = rng.sample(known_good, sample_size)
+    counts["sampled"] = len(sampled)
+    counts["reused"] = len(known_good) - len(sampled)
+    to_check.update(sampled)
+    return to_check, counts
+
+
+def merge_snapshot(previous, fresh):
+    """Overlay fresh results on the previous snapshot; returns a list sorted by book ID."""
+    merged = dict(previous)
+    for result in fresh:
+        merged[result["id"]] = result
+    return [merged[book_id] for book_id in sorted(merged)]
@@ -0,0 +1,149 @@
+# mylibri/lanes.py
+"""
+Suite lanes for `run_suite.py`.
+
+The suite is split by marker into three lanes that run side by side as
+separate pytest processes: `fast` (everything not marked slow or mobile),
+`slow` and `mobile`. Each lane has its own worker count (pytest-xdist
+`-n`) and browser budget (BROWSER_POOL_SIZE per worker), writes its own
+JUnit XML and HTML report, and the runner merges the JUnit files into one
+combined summary afterwards.
+"""
+
+import html
+import json
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from mylibri.config import (
+    FAST_LANE_WORKERS, SLOW_LANE_WORKERS, MOBILE_LANE_WORKERS,
+    FAST_LANE_BROWSERS, SLOW_LANE_BROWSERS, MOBILE_LANE_BROWSERS,
+)
+
+LANE_DIR = Path("test_reports/lanes")
+
+LANES = {
+    "fast": {"marker": "not slow and not mobile", "workers": FAST_LANE_WORKERS, "browsers": FAST_LANE_BROWSERS},
+    "slow": {"marker": "slow", "workers": SLOW_LANE_WORKERS, "browsers": SLOW_LANE_BROWSERS},
+    "mobile": {"marker": "mobile", "workers": MOBILE_LANE_WORKERS, "browsers": MOBILE_LANE_BROWSERS},
+}
+
+
+def lane_paths(name, lane_dir=LANE_DIR):
+    lane_dir = Path(lane_dir)
+    return {"junit": lane_dir / f"{name}.xml", "html": lane_dir / f"{name}.html"}
+
+
+def build_command(name, lane, extra_args=(), lane_dir=LANE_DIR):
+    """The pytest command line for one lane."""
+    paths = lane_paths(name, lane_dir)
+    command = [
+        "pytest",
+        "-m", lane["marker"],
+        f"--junitxml={paths['junit']}",
+        f"--html={paths['html']}",
+        "--self-contained-html",
+    ]
+    if lane["workers"] > 1:
+        command += ["-n", str(lane["workers"])]
+    return command + list(extra_args)
+
+
+def build_env(name, lane, base_env=None, processes=None):
+    """
+    Environment for one lane: its browser budget and, for the slow lane, one
+    sweep shard per worker so xdist spreads the ID range across them.
+    `processes` is the number of worker processes across all lanes running
+    at once; each gets that share of the rate budget (see mylibri/ratelimit.py).
+    """
+    env = dict(os.environ if base_env is None else base_env)
+    env["BROWSER_POOL_SIZE"] = str(lane["browsers"])
+    if processes and "RATE_LIMIT_PROCESSES" not in env:
+        env["RATE_LIMIT_PROCESSES"] = str(processes)
+    if name == "slow" and "SWEEP_SHARDS" not in env:
+        env["SWEEP_SHARDS"] = str(max(1, lane["workers"]))
+    # Line-buffer the workers' output so the runner can stream it live
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def parse_junit(path):
+    """Summarise one JUnit XML file: counts, duration and failed test cases."""
+    root = ET.parse(path).getroot()
+    suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+    summary = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0, "failed": []}
+    for suite in suites:
+        for key in ("tests", "failures", "errors", "skipped"):
+            summary[key] += int(suite.get(key, 0))
+        summary["time"] += float(suite.get("time", 0))
+        for case in suite.iter("testcase"):
+            problem = case.find("failure")
+            if problem is None:
+                problem = case.find("error")
+            if problem is not None:
+                summary["failed"].append({
+                    "test": f"{case.get('classname')}::{case.get('name')}",
+                    "kind": problem.tag,
+                    "message": problem.get("message", ""),
+                })
+    summary["passed"] = summary["tests"] - summary["failures"] - summary["errors"] - summary["skipped"]
+    return summary
+
+
+def merge_lane_results(lane_results):
+    """
+    Combine `{lane: {"returncode", "junit", "html"}}` into one summary.
+
+    A lane whose JUnit file is missing (e.g. pytest crashed) is recorded as an
+    error rather than silently dropped.
+    """
+    combined = {"lanes": {}, "totals": {"tests": 0, "passed": 0, "failures": 0, "errors": 0, "skipped": 0}}
+    for name, result in lane_results.items():
+        junit = Path(result["junit"])
+        if junit.exists():
+            summary = parse_junit(junit)
+        else:
+            summary = {"tests": 0, "passed": 0, "failures": 0, "errors": 1, "skipped": 0, "time": 0.0,
+                       "failed": [{"test": name, "kind": "error", "message": f"no JUnit report at {junit}"}]}
+        summary["returncode"] = result["returncode"]
+        summary["html"] = str(result["html"])
+        combined["lanes"][name] = summary
+        for key in combined["totals"]:
+            combined["totals"][key] += summary[key]
+    return combined
+
+
+def write_combined_report(combined, html_path, json_path):
+    """Write the merged summary as JSON and as an HTML page linking to each lane's report."""
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(combined, f, indent=2)
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write("<html><head><title>Full Test Report</title>")
+        f.write("<style>")
+        f.write("body { font-family: sans-serif; line-height: 1.6; padding: 20px; }")
+        f.write("table { border-collapse: collapse; margin-top: 20px; }")
+        f.write("th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }")
+        f.write("th { background-color: #4CAF50; color: white; }")
+        f.write(".failed { color: #d9534f; }")
+        f.write("</style></head><body>")
+        f.write("<h1>📦 Full Test Report</h1>")
+        totals = combined["totals"]
+        f.write(f"<p>{totals['tests']} tests: {totals['passed']} passed, {totals['failures']} failed, "
+                f"{totals['errors']} errors, {totals['skipped']} skipped.</p>")
+        f.write("<table><tr><th>Lane</th><th>Tests</th><th>Passed</th><th>Failed</th><th>Errors</th>"
+                "<th>Skipped</th><th>Time (s)</th><th>Report</th></tr>")
+        for name, lane in combined["lanes"].items():
+            report_link = os.path.relpath(lane["html"], Path(html_path).parent)
+            f.write(f"<tr><td>{name}</td><td>{lane['tests']}</td><td>{lane['passed']}</td>"
+                    f"<td>{lane['failures']}</td><td>{lane['errors']}</td><td>{lane['skipped']}</td>"
+                    f"<td>{lane['time']:.1f}</td><td><a href='{report_link}'>{name}.html</a></td></tr>")
+        f.write("</table>")
+        failed = [(name, case) for name, lane in combined["lanes"].items() for case in lane["failed"]]
+        if failed:
+            f.write("<h2 class='failed'>❌ Failures</h2><ul>")
+            for name, case in failed:
+                f.write(f"<li class='failed'>[{name}] {html.escape(case['test'])}: {html.escape(case['message'])}</li>")
+            f.write("</ul>")
+        f.write("</body></html>")
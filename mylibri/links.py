@@ -0,0 +1,183 @@
+# mylibri/links.py
+"""
+Link extraction for the crawler (see mylibri/crawler.py).
+
+`extract_link_tiers_async` collects every link on a page in a single
+in-page evaluation (the old loop cost a CDP round-trip per anchor,
+`anchors.nth(i).get_attribute("href")`) and splits them for the two-tier
+crawl: same-site documents that must be rendered to find more links, and
+everything else (external links, PDFs, images and other assets) that only
+needs an HTTP status check. `link_tier` is the same rule in Python. In
+the same evaluation it hashes the page's main content, so the crawler can
+tell when two URLs render the same thing.
+
+`normalize_link` reduces an href to its same-site path, for seeds and
+other links that did not come from a page.
+
+Page links come back as raw URLs and are canonicalized in Python by
+`canonicalize`, following the CRAWL_KEEP_PARAMS / CRAWL_DROP_PARAMS /
+CRAWL_TRAILING_SLASH / CRAWL_LOWERCASE_PATHS rules in mylibri/config.py.
+"""
+
+from fnmatch import fnmatchcase
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlparse
+
+from mylibri.config import CRAWL_DROP_PARAMS, CRAWL_KEEP_PARAMS, CRAWL_LOWERCASE_PATHS, CRAWL_TRAILING_SLASH
+
+# Paths with these extensions are files, not pages worth rendering
+ASSET_EXTENSIONS = (
+    ".pdf", ".epub", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+    ".css", ".js", ".json", ".xml", ".txt", ".mp3", ".mp4", ".woff", ".woff2", ".ttf",
+)
+
+# Where the main content of a page is looked for, most specific first
+CONTENT_SELECTORS = ("main", "[role=main]", "#root", "body")
+
+
+def _patterns(value):
+    return tuple(p.strip() for p in value.split(",") if p.strip())
+
+
+DEFAULT_RULES = {
+    "keep_params": _patterns(CRAWL_KEEP_PARAMS),
+    "drop_params": _patterns(CRAWL_DROP_PARAMS),
+    "trailing_slash": CRAWL_TRAILING_SLASH,
+    "lowercase_path": CRAWL_LOWERCASE_PATHS,
+}
+
+EXTRACT_LINK_TIERS_JS = """
+([baseUrl, assetExtensions, contentSelectors]) => {
+  const origin = new URL(baseUrl).origin;
+  const pages = new Set();
+  const resources = new Set();
+  const targets = [
+    ...[...document.querySelectorAll("a[href]")].map(a => a.getAttribute("href")),
+    ...[...document.querySelectorAll("img[src]")].map(img => img.getAttribute("src")),
+  ];
+  for (const target of targets) {
+    if (!target) continue;
+    let url;
+    try {
+      url = new URL(target, document.baseURI);
+    } catch (e) {
+      continue;
+    }
+    if (url.protocol !== "http:" && url.protocol !== "https:") continue;
+    const path = url.pathname.toLowerCase();
+    url.hash = "";
+    if (url.origin === origin && !assetExtensions.some(ext => path.endsWith(ext))) {
+      pages.add(url.href);
+    } else {
+      resources.add(url.href);
+    }
+  }
+  // cyrb53 over the whitespace-collapsed text of the main content
+  const root = contentSelectors.map(s => document.querySelector(s)).find(Boolean);
+  const text = root ? (root.innerText || "").replace(/\\s+/g, " ").trim() : "";
+  let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  const contentHash = (h2 >>> 0).toString(16).padStart(8, "0") + (h1 >>> 0).toString(16).padStart(8, "0");
+  return {pages: [...pages], resources: [...resources], contentHash, contentLength: text.length};
+}
+"""
+
+
+def origin_of(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def normalize_link(href, current_url, base_url):
+    """
+    Resolve `href` against `current_url` and drop the query and fragment.
+    Returns None for links that leave `base_url`'s site.
+    """
+    if not href:
+        return None
+    absolute = urljoin(current_url, href)
+    if origin_of(absolute) != base_url:
+        return None
+    return urljoin(base_url, urlparse(absolute).path or "/")
+
+
+def _param_matches(name, patterns):
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def canonicalize(url, rules=None):
+    """
+    The canonical form of page `url`: no fragment, only the query parameters
+    the rules keep (sorted), the trailing-slash rule applied and, if asked,
+    a lowercased path. Scheme and host are always lowercased.
+    """
+    rules = rules or DEFAULT_RULES
+    parts = urlparse(urldefrag(url)[0])
+    path = parts.path or "/"
+    if rules["lowercase_path"]:
+        path = path.lower()
+    if path != "/":
+        if rules["trailing_slash"] == "strip":
+            path = path.rstrip("/") or "/"
+        elif rules["trailing_slash"] == "add" and not path.endswith("/"):
+            path += "/"
+    keep, drop = rules["keep_params"], rules["drop_params"]
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if ("*" in keep or _param_matches(name, keep)) and not _param_matches(name, drop)
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}{query}"
+
+
+def link_tier(url, base_url):
+    """
+    "render" for a same-site page that may hold more links, "http" for anything
+    a status check is enough for, None for links that cannot be checked
+    (mailto:, javascript:, ...).
+    """
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    if origin_of(url) == base_url and not parts.path.lower().endswith(ASSET_EXTENSIONS):
+        return "render"
+    return "http"
+
+
+def split_link_tiers(targets, current_url, base_url):
+    """Python version of EXTRACT_LINK_TIERS_JS: raw `(pages, resources)` for hrefs/srcs."""
+    pages, resources = {}, {}
+    for target in targets:
+        if not target:
+            continue
+        absolute = urldefrag(urljoin(current_url, target))[0]
+        tier = link_tier(absolute, base_url)
+        if tier == "render":
+            pages[absolute] = None
+        elif tier == "http":
+            resources[absolute] = None
+    return list(pages), list(resources)
+
+
+def canonical_pages(raw_pages, rules=None):
+    """`{canonical: [raw URLs]}` for page links, in document order."""
+    pages = {}
+    for raw in raw_pages:
+        pages.setdefault(canonicalize(raw, rules), []).append(raw)
+    return pages
+
+
+async def extract_link_tiers_async(page, base_url, rules=None):
+    """
+    `(pages, resources, content)` on an async Playwright page, from one
+    in-page evaluation: `pages` maps canonical page URLs to the raw links
+    they came from, `content` is `(hash, length)` of the main content text.
+    """
+    found = await page.evaluate(EXTRACT_LINK_TIERS_JS, [base_url, list(ASSET_EXTENSIONS), list(CONTENT_SELECTORS)])
+    content = (found["contentHash"], found["contentLength"])
+    return canonical_pages(found["pages"], rules), found["resources"], content
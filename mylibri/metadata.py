@@ -0,0 +1,268 @@
+# mylibri/metadata.py
+"""
+Book metadata read from the JSON the book page fetches.
+
+The book page is a SPA that renders title, author, rating and page count
+from one JSON response. `BookMetadataReader` listens to a page's
+responses while it opens a book, picks out that one and reads all four
+fields from it, which costs one round-trip (the response body) instead of
+a locator count and text per field. The endpoint is learned from the
+first book whose JSON carries a title (see `mylibri.probe.template_from_url`);
+from then on only that URL is accepted, and a 404/410 from it means the
+book is gone. One reader serves every page of a sweep, so the endpoint
+is learned once.
+
+When no book JSON turns up (the endpoint changed, or its answer does not
+say), the rendered page is read with a single `evaluate` instead. Once
+the page has drawn the book title its data has arrived, so the JSON is
+only waited for `JSON_GRACE_MS` longer before the page is read; a book
+whose page makes no such call does not cost the whole timeout.
+
+`metadata_check` wraps the reader as a sweep check (see mylibri/sweep.py)
+for the "metadata" sweep mode.
+"""
+
+import asyncio
+import logging
+import time
+
+from mylibri.config import BOOK_URL_BASE
+from mylibri.probe import BROKEN_STATUSES, BookApi, find_title, is_empty_payload, template_from_url
+from mylibri.ratelimit import throttled_goto
+from mylibri.retry import classify_exception, raise_for_status
+from mylibri.sweep import TITLE_SELECTOR, broken_result
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("title", "author", "rating", "pages")
+MISSING = "N/A"
+# How long the book JSON is still waited for once the page shows the title
+JSON_GRACE_MS = 500
+
+AUTHOR_KEYS = ("author", "author_name", "authorName", "authors", "writer")
+RATING_KEYS = ("rating", "average_rating", "averageRating", "avg_rating")
+PAGES_KEYS = ("pages", "no_of_pages", "noOfPages", "page_count", "pageCount", "number_of_pages", "numberOfPages")
+# Keys holding the display name when a field is an object, e.g. {"author": {"name": ...}}
+NAME_KEYS = ("name", "full_name", "fullName", "display_name")
+
+BOOK_METADATA_JS = """
+() => {
+  const root = document.querySelector("div.book-details");
+  if (!root) return null;
+  const text = el => el ? el.textContent.trim() : null;
+  const rating = [...root.querySelectorAll("p")].find(p => p.textContent.includes("Rating"));
+  return {
+    title: text(root.querySelector("h1.book-name")),
+    author: text(root.querySelector("p.author-name")),
+    rating: text(rating),
+    pages: text(root.querySelector("p.no-of-page-text")),
+  };
+}
+"""
+
+
+def _display(value):
+    """A JSON value as report text: strings and numbers as-is, objects by their name, lists by their first item."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, dict):
+        for key in NAME_KEYS:
+            name = _display(value.get(key))
+            if name:
+                return name
+        return None
+    if isinstance(value, list) and value:
+        return _display(value[0])
+    return None
+
+
+def find_value(payload, keys, depth=3):
+    """The first displayable value under one of `keys` in a JSON payload, searching a few levels deep."""
+    if depth < 0:
+        return None
+    if isinstance(payload, dict):
+        for key in keys:
+            value = _display(payload.get(key))
+            if value:
+                return value
+        children = payload.values()
+    elif isinstance(payload, list):
+        children = payload[:1]
+    else:
+        return None
+    for child in children:
+        value = find_value(child, keys, depth - 1)
+        if value:
+            return value
+    return None
+
+
+def metadata_from_payload(payload):
+    """`{title, author, rating, pages}` from a book JSON payload ("N/A" where absent), or None without a title."""
+    title = find_title(payload)
+    if not title:
+        return None
+    return {
+        "title": title,
+        "author": find_value(payload, AUTHOR_KEYS) or MISSING,
+        "rating": find_value(payload, RATING_KEYS) or MISSING,
+        "pages": find_value(payload, PAGES_KEYS) or MISSING,
+    }
+
+
+def missing_metadata(source):
+    return {**{field: MISSING for field in FIELDS}, "source": source}
+
+
+class BookMetadataReader:
+    """
+    Opens book pages and reads their metadata. Every result has each field
+    of `FIELDS` ("N/A" when not found) plus "source": "json" or "dom".
+    """
+
+    def __init__(self, api=None):
+        self.api = api
+        self.from_json = 0
+        self.from_dom = 0
+
+    def is_book_response(self, response, book_id):
+        if self.api:
+            return response.url == self.api.url_for(book_id)
+        return (response.request.resource_type in ("xhr", "fetch")
+                and template_from_url(response.url, book_id) is not None)
+
+    async def _next_book_response(self, page, book_id, responses, tried, timeout):
+        def is_candidate(response):
+            return response not in tried and self.is_book_response(response, book_id)
+
+        for response in responses:
+            if is_candidate(response):
+                return response
+        if timeout <= 0:
+            return None
+        try:
+            return await page.wait_for_event("response", predicate=is_candidate, timeout=timeout)
+        except Exception:
+            return None
+
+    @staticmethod
+    async def _title_shown(page, timeout):
+        """When the page showed the book title (a `time.monotonic()` value), or None if it did not."""
+        try:
+            await page.wait_for_selector(TITLE_SELECTOR, timeout=timeout)
+        except Exception:
+            return None
+        return time.monotonic()
+
+    async def _from_json(self, page, book_id, responses, timeout):
+        """Metadata from the book's JSON, `missing_metadata` if it says there is no book, None if it cannot tell."""
+        # Until the endpoint is known, other calls keyed by the book ID (reviews, progress...) may come first
+        deadline = time.monotonic() + timeout / 1000
+        shown = asyncio.ensure_future(self._title_shown(page, timeout))
+        tried = []
+        try:
+            while True:
+                if shown.done() and shown.result() is not None:
+                    deadline = min(deadline, shown.result() + JSON_GRACE_MS / 1000)
+                waiting = asyncio.ensure_future(self._next_book_response(
+                    page, book_id, responses, tried, (deadline - time.monotonic()) * 1000
+                ))
+                await asyncio.wait({waiting} if shown.done() else {waiting, shown},
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if not waiting.done():
+                    # The title wait ended first; wait again, only for the grace period if it appeared
+                    waiting.cancel()
+                    continue
+                response = waiting.result()
+                if response is None:
+                    return None
+                metadata = await self._read_response(response, book_id, tried)
+                if metadata is not None or self.api:
+                    return metadata
+        finally:
+            shown.cancel()
+
+    async def _read_response(self, response, book_id, tried):
+        tried.append(response)
+        payload = None
+        if response.status == 200:
+            try:
+                payload = await response.json()
+            except Exception:
+                pass
+        return self._verdict(response, book_id, payload)
+
+    def _verdict(self, response, book_id, payload):
+        """What one candidate response says; `payload` is the parsed body of a 200 answer."""
+        if response.status in BROKEN_STATUSES:
+            # Only trusted once the endpoint is known: before that it may be some other ID-keyed call
+            return missing_metadata("json") if self.api else None
+        if payload is None:
+            return None
+        metadata = metadata_from_payload(payload)
+        if metadata:
+            if not self.api:
+                self.api = BookApi(template_from_url(response.url, book_id))
+                logger.info(f"[metadata] Book data comes from {self.api.template}")
+            return {**metadata, "source": "json"}
+        if self.api and is_empty_payload(payload):
+            return missing_metadata("json")
+        return None
+
+    async def _from_dom(self, page, timeout):
+        try:
+            await page.wait_for_selector(TITLE_SELECTOR, timeout=timeout)
+            found = await page.evaluate(BOOK_METADATA_JS) or {}
+        except Exception:
+            found = {}
+        return {**{field: found.get(field) or MISSING for field in FIELDS}, "source": "dom"}
+
+    async def read(self, page, book_id, book_url, timeout=8000):
+        """Open `book_url` on `page` and read its metadata. Navigation failures raise."""
+        responses = []
+
+        def on_response(response):
+            if response.request.resource_type in ("xhr", "fetch"):
+                responses.append(response)
+
+        page.on("response", on_response)
+        try:
+            raise_for_status(await throttled_goto(page, book_url, timeout=timeout), book_url)
+            metadata = await self._from_json(page, book_id, responses, timeout)
+        finally:
+            page.remove_listener("response", on_response)
+        if metadata is None:
+            self.from_dom += 1
+            return await self._from_dom(page, timeout)
+        self.from_json += 1
+        return metadata
+
+    def summary(self):
+        return f"{self.from_json} books read from the book JSON, {self.from_dom} from the page"
+
+
+def metadata_check(reader=None, book_url_base=BOOK_URL_BASE, timeout=8000):
+    """
+    A sweep check that records each book's metadata. A book without a title
+    is Broken ("missing_element"); the reader is on `check.reader`.
+    """
+    reader = reader or BookMetadataReader()
+
+    async def check(page, book_id):
+        book_url = f"{book_url_base}/{book_id}"
+        try:
+            metadata = await reader.read(page, book_id, book_url, timeout=timeout)
+        except Exception as e:
+            result = broken_result(book_id, book_url, classify_exception(e), f"Failed to load page: {e}")
+            return {**result, **missing_metadata("")}
+        if metadata["title"] == MISSING:
+            result = broken_result(book_id, book_url, "missing_element", "No valid book metadata found")
+            return {**result, **metadata}
+        return {"id": book_id, "url": book_url, "status": "OK", **metadata, "error": "", "failure": ""}
+
+    check.reader = reader
+    return check
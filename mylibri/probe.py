@@ -0,0 +1,177 @@
+# mylibri/probe.py
+"""
+HTTP-first book page probing.
+
+The book page is a SPA that fetches its data from a JSON endpoint. We
+capture that endpoint once by rendering a known book with Playwright, then
+ask it directly for every other ID through the context's pooled
+APIRequestContext, which reuses the logged-in cookies and keep-alive
+connections. Only IDs whose API answer is ambiguous get a full page render.
+"""
+
+import json
+import logging
+import re
+
+from mylibri.config import BOOK_URL_BASE
+from mylibri.ratelimit import throttled_fetch, throttled_goto
+from mylibri.sweep import TITLE_SELECTOR, check_book_page
+
+logger = logging.getLogger(__name__)
+
+TITLE_KEYS = ("title", "book_name", "bookName", "name")
+FORWARDED_HEADERS = ("authorization", "accept", "x-requested-with")
+BROKEN_STATUSES = (404, 410)
+
+
+class BookApi:
+    """A discovered book endpoint: a URL template with an `{id}` slot plus request headers."""
+
+    def __init__(self, template, headers=None):
+        self.template = template
+        self.headers = headers or {}
+
+    def url_for(self, book_id):
+        return self.template.replace("{id}", str(book_id))
+
+    def __repr__(self):
+        return f"BookApi({self.template!r})"
+
+
+def find_title(payload, depth=3):
+    """Return the first non-empty title-like string in a JSON payload, searching a few levels deep."""
+    if depth < 0:
+        return None
+    if isinstance(payload, dict):
+        for key in TITLE_KEYS:
+            value = payload.get(key)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+        children = payload.values()
+    elif isinstance(payload, list):
+        children = payload[:1]
+    else:
+        return None
+    for child in children:
+        title = find_title(child, depth - 1)
+        if title:
+            return title
+    return None
+
+
+def is_empty_payload(payload):
+    """True for answers that plainly say "no such book": null, {}, [] or {"data": null}."""
+    if payload in (None, {}, []):
+        return True
+    return isinstance(payload, dict) and set(payload) <= {"data", "message", "status", "success"} \
+        and payload.get("data") in (None, {}, [])
+
+
+def template_from_url(url, book_id):
+    """Turn a captured API URL into a template by replacing the book ID path segment or query value."""
+    pattern = re.compile(rf"(?<=[/=]){book_id}(?=$|[/?&#])")
+    template, count = pattern.subn("{id}", url, count=1)
+    return template if count else None
+
+
+async def discover_book_api(context, sample_ids, book_url_base=BOOK_URL_BASE, timeout=15000):
+    """
+    Render a few known book pages and return the JSON endpoint that carried the title.
+
+    Returns a `BookApi`, or None if no candidate response could be matched.
+    """
+    page = await context.new_page()
+    try:
+        for book_id in sample_ids:
+            captured = []
+            on_response = captured.append
+            page.on("response", on_response)
+            try:
+                await throttled_goto(page, f"{book_url_base}/{book_id}", timeout=timeout)
+                title = (await page.locator(TITLE_SELECTOR).first.text_content(timeout=timeout)).strip()
+            except Exception as e:
+                logger.info(f"API discovery: book {book_id} did not render ({e}); trying next sample.")
+                continue
+            finally:
+                page.remove_listener("response", on_response)
+
+            for response in captured:
+                if response.request.resource_type not in ("xhr", "fetch"):
+                    continue
+                if "json" not in (response.headers.get("content-type") or ""):
+                    continue
+                template = template_from_url(response.url, book_id)
+                if not template:
+                    continue
+                try:
+                    payload = await response.json()
+                except Exception:
+                    continue
+                if find_title(payload) == title:
+                    headers = await response.request.all_headers()
+                    forwarded = {k: v for k, v in headers.items() if k.lower() in FORWARDED_HEADERS}
+                    api = BookApi(template, forwarded)
+                    logger.info(f"API discovery: book data comes from {api.template}")
+                    return api
+        logger.warning("API discovery: no JSON endpoint carried the book title; using page renders only.")
+        return None
+    finally:
+        await page.close()
+
+
+async def probe_book_api(request, api, book_id, timeout=8000):
+    """
+    Ask the book endpoint about one ID.
+
+    Returns `("OK", title, "")`, `("Broken", reason, failure)` (see
+    mylibri/retry.py), or None when the answer is ambiguous (auth errors,
+    5xx, non-JSON, no recognisable title) and the page has to be rendered
+    to decide.
+    """
+    url = api.url_for(book_id)
+    try:
+        response = await throttled_fetch(request, "get", url, headers=api.headers, timeout=timeout,
+                                         fail_on_status_code=False)
+    except Exception as e:
+        logger.debug(f"API probe for {book_id} failed: {e}")
+        return None
+    try:
+        if response.status in BROKEN_STATUSES:
+            return "Broken", f"Book API returned HTTP {response.status}", "http_4xx"
+        if response.status != 200:
+            return None
+        try:
+            payload = json.loads(await response.text())
+        except ValueError:
+            return None
+        title = find_title(payload)
+        if title:
+            return "OK", title, ""
+        if is_empty_payload(payload):
+            return "Broken", "Book API returned no book data", "missing_element"
+        return None
+    finally:
+        await response.dispose()
+
+
+def http_first_check(api, fallback=check_book_page, book_url_base=BOOK_URL_BASE):
+    """Wrap a page check so it only renders IDs the book API cannot classify."""
+
+    async def check(page, book_id):
+        verdict = await probe_book_api(page.context.request, api, book_id)
+        if verdict is None:
+            result = await fallback(page, book_id)
+            result["probe"] = "render"
+            return result
+        status, detail, failure = verdict
+        return {
+            "id": book_id,
+            "url": f"{book_url_base}/{book_id}",
+            "status": status,
+            "title": detail if status == "OK" else "",
+            "error": "" if status == "OK" else detail,
+            "failure": failure,
+            "probe": "http",
+        }
+
+    return check
@@ -0,0 +1,106 @@
+# mylibri/profiles.py
+"""
+Named context profiles that decide which requests a browser context makes.
+
+Crawls, ID sweeps and the genre/discover scrapers only read the DOM and
+status codes, so the "lean" profile aborts images, media, fonts and
+requests to known third-party trackers before they leave the browser.
+Image `src` attributes are still in the DOM; only the downloads are
+skipped. The "default" profile lets everything through.
+
+Tests opt in with `@pytest.mark.lean` (see `tests/conftest.py`), engines
+with `profile="lean"`. `LEAN_PROFILE=0` turns "lean" back into "default"
+for a run, e.g. to compare the two; `scripts/bench_profiles.py` reports
+bytes transferred and load time under each profile.
+"""
+
+import logging
+from urllib.parse import urlparse
+
+from mylibri.config import LEAN_PROFILE
+
+logger = logging.getLogger(__name__)
+
+TRACKER_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "mixpanel.com",
+)
+
+PROFILES = {
+    "default": {"block_types": (), "block_hosts": ()},
+    "lean": {"block_types": ("image", "media", "font"), "block_hosts": TRACKER_HOSTS},
+}
+
+
+def profile_rules(name):
+    """The blocking rules for profile `name` (None means "default")."""
+    name = name or "default"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown context profile '{name}' (known: {', '.join(PROFILES)})")
+    if name == "lean" and not LEAN_PROFILE:
+        return PROFILES["default"]
+    return PROFILES[name]
+
+
+def should_block(rules, resource_type, url):
+    if resource_type in rules["block_types"]:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == blocked or host.endswith(f".{blocked}") for blocked in rules["block_hosts"])
+
+
+def _is_noop(rules):
+    return not rules["block_types"] and not rules["block_hosts"]
+
+
+def apply_profile(context, name):
+    """
+    Route a sync Playwright context through profile `name`. Returns a
+    `{"blocked": n, "allowed": n}` counter that the route handler keeps up to date.
+    """
+    rules = profile_rules(name)
+    stats = {"blocked": 0, "allowed": 0}
+    if _is_noop(rules):
+        return stats
+
+    def handle(route):
+        request = route.request
+        if should_block(rules, request.resource_type, request.url):
+            stats["blocked"] += 1
+            route.abort("blockedbyclient")
+        else:
+            stats["allowed"] += 1
+            route.continue_()
+
+    context.route("**/*", handle)
+    logger.info(f"[profile] Context routed through the '{name}' profile")
+    return stats
+
+
+async def apply_profile_async(context, name):
+    """`apply_profile` for an async Playwright context."""
+    rules = profile_rules(name)
+    stats = {"blocked": 0, "allowed": 0}
+    if _is_noop(rules):
+        return stats
+
+    async def handle(route):
+        request = route.request
+        if should_block(rules, request.resource_type, request.url):
+            stats["blocked"] += 1
+            await route.abort("blockedbyclient")
+        else:
+            stats["allowed"] += 1
+            await route.continue_()
+
+    await context.route("**/*", handle)
+    logger.info(f"[profile] Context routed through the '{name}' profile")
+    return stats
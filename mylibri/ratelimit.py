@@ -0,0 +1,221 @@
+# mylibri/ratelimit.py
+"""
+Process-wide token-bucket rate limiting for everything that hits the site.
+
+`LIMITER` holds one bucket per configured path prefix plus a default
+bucket: `RATE_LIMIT_RPS` requests per second with bursts of up to
+`RATE_LIMIT_BURST`, and `RATE_LIMIT_OVERRIDES` (e.g. "/api=20:40,/home/books=4")
+for prefixes that need a different pace. Buckets hand out reservations
+under a lock, so sync tests and async engines running on other threads
+share the same budget.
+
+The configured rates are for the whole run. When several processes run
+at once (pytest-xdist workers, or the lanes of `run_suite.py`) each one
+gets an equal share, see `rate_share`, so together they stay within it.
+Under xdist every worker sends its counters back to the controller,
+which merges them (`RateLimiter.merge`) for the end-of-run summary.
+
+Navigations and HTTP probes go through `throttled_goto` (async),
+`throttled_goto_sync` (sync pages) and `throttled_fetch` (APIRequestContext).
+A 429 or 503 answer pauses the bucket it came from, for the Retry-After
+the server asked for or an exponential backoff, and the request is tried
+again up to `RATE_LIMIT_RETRIES` times.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from mylibri.config import (
+    RATE_LIMIT_BACKOFF_MAX_S, RATE_LIMIT_BACKOFF_S, RATE_LIMIT_BURST, RATE_LIMIT_OVERRIDES, RATE_LIMIT_RETRIES,
+    RATE_LIMIT_RPS,
+)
+
+logger = logging.getLogger(__name__)
+
+THROTTLED_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; `rate <= 0` means unlimited."""
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic() if now is None else now
+        self.paused_until = 0.0
+        self.throttled_in_a_row = 0
+
+    def reserve(self, now):
+        """Take one token and return how many seconds the caller must wait before using it."""
+        pause = max(0.0, self.paused_until - now)
+        if self.rate <= 0:
+            return pause
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Tokens may go negative: each waiting caller holds its own later slot
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, pause)
+
+
+def parse_overrides(value):
+    """`{"/prefix": (rate, burst)}` from "/api=20:40,/home/books=4" (burst defaults to the rate)."""
+    overrides = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        prefix, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        overrides[prefix.strip()] = (float(rate), float(burst or rate))
+    return overrides
+
+
+def retry_after_seconds(headers):
+    value = (headers or {}).get("retry-after", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        return None
+
+
+def rate_share(env=None):
+    """
+    How many processes share the rate budget: RATE_LIMIT_PROCESSES (set by
+    run_suite.py for all its lanes), else this run's xdist worker count.
+    """
+    env = os.environ if env is None else env
+    for name in ("RATE_LIMIT_PROCESSES", "PYTEST_XDIST_WORKER_COUNT"):
+        try:
+            return max(1, int(env.get(name, "")))
+        except ValueError:
+            continue
+    return 1
+
+
+class RateLimiter:
+    """
+    Buckets for one process. With `share` processes running at once, each
+    bucket gets 1/`share` of its configured rate and burst.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST, overrides=None,
+                 backoff_s=RATE_LIMIT_BACKOFF_S, backoff_max_s=RATE_LIMIT_BACKOFF_MAX_S, clock=time.monotonic,
+                 share=1):
+        self.clock = clock
+        self.share = max(1, share)
+        self.default = TokenBucket(rate / self.share, burst / self.share, clock())
+        # Longest prefix first, so "/home/books" wins over "/home"
+        self.buckets = sorted(
+            ((prefix, TokenBucket(r / self.share, b / self.share, clock()))
+             for prefix, (r, b) in (overrides or {}).items()),
+            key=lambda item: -len(item[0]),
+        )
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.waited_s = 0.0
+        self.throttled = 0
+
+    def bucket_for(self, url):
+        path = urlparse(url).path or "/"
+        for prefix, bucket in self.buckets:
+            if path.startswith(prefix):
+                return bucket
+        return self.default
+
+    def reserve(self, url):
+        with self.lock:
+            wait = self.bucket_for(url).reserve(self.clock())
+            self.requests += 1
+            self.waited_s += wait
+            return wait
+
+    async def acquire(self, url):
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url, page=None):
+        wait = self.reserve(url)
+        if wait > 0:
+            if page is not None:
+                # Keeps Playwright's sync event loop running while we wait
+                page.wait_for_timeout(wait * 1000)
+            else:
+                time.sleep(wait)
+
+    def observe(self, url, status, headers=None):
+        """Feed back a response status; returns True (and pauses the bucket) if it was throttled."""
+        with self.lock:
+            bucket = self.bucket_for(url)
+            if status not in THROTTLED_STATUSES:
+                bucket.throttled_in_a_row = 0
+                return False
+            bucket.throttled_in_a_row += 1
+            self.throttled += 1
+            delay = retry_after_seconds(headers)
+            if delay is None:
+                delay = self.backoff_s * 2 ** (bucket.throttled_in_a_row - 1)
+                delay *= random.uniform(0.8, 1.2)
+            delay = min(delay, self.backoff_max_s)
+            bucket.paused_until = max(bucket.paused_until, self.clock() + delay)
+        logger.warning(f"[ratelimit] {status} from {url}, pausing its bucket for {delay:.1f}s")
+        return True
+
+    def counters(self):
+        """This process's counters, as sent from an xdist worker to the controller."""
+        return {"requests": self.requests, "waited_s": self.waited_s, "throttled": self.throttled}
+
+    def merge(self, counters):
+        """Add another process's `counters()` to this one's."""
+        with self.lock:
+            self.requests += counters.get("requests", 0)
+            self.waited_s += counters.get("waited_s", 0.0)
+            self.throttled += counters.get("throttled", 0)
+
+    def summary(self):
+        return (f"{self.requests} requests, {self.waited_s:.1f}s spent waiting for tokens, "
+                f"{self.throttled} throttled answers")
+
+
+LIMITER = RateLimiter(overrides=parse_overrides(RATE_LIMIT_OVERRIDES), share=rate_share())
+
+
+async def throttled_goto(page, url, limiter=LIMITER, retries=RATE_LIMIT_RETRIES, **goto_options):
+    """`page.goto(url, ...)` through the rate limiter, retrying 429/503 answers after backing off."""
+    for attempt in range(retries + 1):
+        await limiter.acquire(url)
+        response = await page.goto(url, **goto_options)
+        if response is None or not limiter.observe(url, response.status, response.headers) or attempt == retries:
+            return response
+
+
+def throttled_goto_sync(page, url, limiter=LIMITER, retries=RATE_LIMIT_RETRIES, **goto_options):
+    """`throttled_goto` for a sync Playwright page."""
+    for attempt in range(retries + 1):
+        limiter.acquire_sync(url, page)
+        response = page.goto(url, **goto_options)
+        if response is None or not limiter.observe(url, response.status, response.headers) or attempt == retries:
+            return response
+
+
+async def throttled_fetch(request, method, url, limiter=LIMITER, retries=RATE_LIMIT_RETRIES, **options):
+    """
+    `request.head/get/...(url, ...)` on an APIRequestContext through the rate
+    limiter, retrying 429/503 answers after backing off.
+    """
+    send = getattr(request, method.lower())
+    for attempt in range(retries + 1):
+        await limiter.acquire(url)
+        response = await send(url, **options)
+        if not limiter.observe(url, response.status, response.headers) or attempt == retries:
+            return response
+        await response.dispose()
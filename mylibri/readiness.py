@@ -0,0 +1,159 @@
+# mylibri/readiness.py
+"""
+Event-driven readiness waits that replace fixed `page.wait_for_timeout` sleeps.
+
+Each helper waits for something observable instead of a fixed delay: a
+selector reaching a state, an XHR/fetch response, or the network going
+quiet (capped so it is never slower than the sleep it replaces). Every
+call records the sleep it replaced and the time it actually took in
+`LEDGER`, which `tests/conftest.py` prints per suite at the end of a run
+(under xdist, after merging in every worker's totals).
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_MS = 500
+POLL_MS = 50
+
+
+class ReadinessLedger:
+    """Wall time spent in readiness waits versus the fixed sleeps they replaced, per suite."""
+
+    def __init__(self):
+        self.current_test = None
+        self.totals = {}
+
+    def record(self, kind, replaces_ms, actual_ms):
+        suite = suite_for(self.current_test)
+        entry = self.totals.setdefault(suite, {"waits": 0, "replaced_ms": 0.0, "actual_ms": 0.0})
+        entry["waits"] += 1
+        entry["replaced_ms"] += replaces_ms
+        entry["actual_ms"] += actual_ms
+        logger.debug(f"[readiness] {kind}: {actual_ms:.0f} ms instead of {replaces_ms} ms ({self.current_test})")
+
+    def merge(self, totals):
+        """Add another process's `totals` (e.g. an xdist worker's) to this ledger."""
+        for suite, other in totals.items():
+            entry = self.totals.setdefault(suite, {"waits": 0, "replaced_ms": 0.0, "actual_ms": 0.0})
+            for key in entry:
+                entry[key] += other.get(key, 0)
+
+    def summary_lines(self):
+        lines = []
+        for suite, entry in sorted(self.totals.items()):
+            saved_s = (entry["replaced_ms"] - entry["actual_ms"]) / 1000
+            lines.append(
+                f"{suite}: {entry['waits']} waits, {entry['actual_ms'] / 1000:.1f}s spent "
+                f"vs {entry['replaced_ms'] / 1000:.1f}s of fixed sleeps ({saved_s:+.1f}s saved)"
+            )
+        return lines
+
+
+LEDGER = ReadinessLedger()
+
+
+def suite_for(nodeid):
+    """Map a test node ID such as "tests/fast/test_x.py::test_y" to its suite ("fast")."""
+    if not nodeid:
+        return "other"
+    parts = nodeid.replace("\\", "/").split("/")
+    return parts[1] if len(parts) > 2 and parts[0] == "tests" else "other"
+
+
+@contextmanager
+def _timed(kind, replaces_ms):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        LEDGER.record(kind, replaces_ms, (time.perf_counter() - start) * 1000)
+
+
+def wait_for_selector(page, selector, replaces_ms=0, state="visible", timeout=None, required=True):
+    """
+    Wait until `selector` (a selector string or a Locator) reaches `state`.
+
+    A required wait raises Playwright's TimeoutError after `timeout` ms
+    (default 10 s). An optional one (`required=False`) gives up after
+    `timeout` ms (default: the sleep it replaces) and returns False, for
+    pages where the element may legitimately never appear.
+    """
+    locator = page.locator(selector) if isinstance(selector, str) else selector
+    if timeout is None:
+        timeout = 10000 if required else max(replaces_ms, POLL_MS)
+    with _timed("selector", replaces_ms):
+        try:
+            locator.first.wait_for(state=state, timeout=timeout)
+        except Exception:
+            if required:
+                raise
+            return False
+    return True
+
+
+@contextmanager
+def wait_for_xhr(page, url_part, replaces_ms=0, timeout=15000):
+    """
+    Wait for the XHR/fetch response triggered inside the `with` block.
+
+        with wait_for_xhr(page, "/api/", replaces_ms=3000):
+            page.click("button:has-text('Login')")
+    """
+    def is_match(response):
+        return url_part in response.url and response.request.resource_type in ("xhr", "fetch")
+
+    with _timed("xhr", replaces_ms):
+        with page.expect_response(is_match, timeout=timeout) as response_info:
+            yield response_info
+
+
+class _NetworkTracker:
+    """Counts in-flight requests on a page and remembers when the last one started or ended."""
+
+    def __init__(self, page):
+        self.in_flight = 0
+        self.last_activity = time.perf_counter()
+        page.on("request", self._started)
+        page.on("requestfinished", self._ended)
+        page.on("requestfailed", self._ended)
+
+    def _started(self, request):
+        self.in_flight += 1
+        self.last_activity = time.perf_counter()
+
+    def _ended(self, request):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.last_activity = time.perf_counter()
+
+
+def track_network(page):
+    """Attach (once) the in-flight request counter used by `wait_for_network_quiet`."""
+    tracker = getattr(page, "_mylibri_network_tracker", None)
+    if tracker is None:
+        tracker = _NetworkTracker(page)
+        page._mylibri_network_tracker = tracker
+    return tracker
+
+
+def wait_for_network_quiet(page, replaces_ms, idle_ms=DEFAULT_IDLE_MS, cap_ms=None):
+    """
+    Wait until no request has started or finished for `idle_ms`, for at most
+    `cap_ms` (default: the sleep being replaced, so this is never slower).
+    Returns True if the network went quiet before the cap.
+    """
+    cap_ms = replaces_ms if cap_ms is None else cap_ms
+    tracker = track_network(page)
+    with _timed("network", replaces_ms):
+        deadline = time.perf_counter() + cap_ms / 1000
+        while time.perf_counter() < deadline:
+            quiet_for_ms = (time.perf_counter() - tracker.last_activity) * 1000
+            if tracker.in_flight == 0 and quiet_for_ms >= idle_ms:
+                return True
+            # wait_for_timeout (unlike time.sleep) keeps Playwright's event loop running
+            page.wait_for_timeout(POLL_MS)
+        logger.debug(f"[readiness] network still busy after {cap_ms} ms cap")
+        return False
@@ -0,0 +1,157 @@
+# mylibri/reports.py
+"""
+Streaming report files for test results.
+
+A `ReportWriter` writes each result the moment it is known: a CSV row,
+an NDJSON line (one JSON object per line) and an HTML table row. Nothing
+is kept in memory, so a report over every book ID or every crawled URL
+costs no more than a report over ten. Files are flushed every
+`REPORT_FLUSH_EVERY` rows or `REPORT_FLUSH_S` seconds, so a report can be
+followed while the test runs and survives a crash up to the last flush.
+
+Used as a context manager the writer always closes its files; if the
+block raised, the HTML page says the report is incomplete and why.
+
+    with ReportWriter(report_dir / f"genre_book_counts_{timestamp}", ["genre", "count"],
+                      title="📊 Genre Book Count") as report:
+        for genre in genres:
+            report.write({"genre": genre, "count": count_books(genre)})
+    report.print_paths()
+"""
+
+import csv
+import json
+import logging
+import time
+from html import escape
+from pathlib import Path
+
+from mylibri.config import REPORT_FLUSH_EVERY, REPORT_FLUSH_S
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("csv", "ndjson", "html")
+
+REPORT_CSS = (
+    "body { font-family: sans-serif; line-height: 1.6; padding: 20px; }"
+    "h1 { color: #4CAF50; }"
+    "table { width: 100%; border-collapse: collapse; margin-top: 20px; }"
+    "th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }"
+    "th { background-color: #4CAF50; color: white; }"
+    "tr.failed td { background-color: #f2dede; }"
+    ".incomplete { color: #d9534f; font-weight: bold; }"
+)
+
+
+def cell_text(value):
+    """A value as CSV/HTML text; lists are joined."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(cell_text(item) for item in value)
+    return str(value)
+
+
+def is_failed_status(row):
+    """True for rows whose "status" is neither "OK" nor an HTTP status below 400."""
+    status = row.get("status")
+    if isinstance(status, int):
+        return status >= 400
+    return status not in (None, "", "OK")
+
+
+class ReportWriter:
+    """
+    One report at `base_path` plus a suffix per format in `formats`. Rows are
+    dicts; only `fields` are written to CSV and HTML, NDJSON keeps every key.
+    Rows for which `failed(row)` is true are highlighted in the HTML table.
+    """
+
+    def __init__(self, base_path, fields, title="", formats=REPORT_FORMATS, failed=None,
+                 flush_every=REPORT_FLUSH_EVERY, flush_s=REPORT_FLUSH_S):
+        unknown = set(formats) - set(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report format(s) {', '.join(sorted(unknown))}; expected {REPORT_FORMATS}")
+        base_path = Path(base_path)
+        base_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fields = list(fields)
+        self.title = title or base_path.name
+        self.failed = failed
+        self.flush_every = max(1, flush_every)
+        self.flush_s = flush_s
+        self.paths = {kind: base_path.with_name(f"{base_path.name}.{kind}") for kind in formats}
+        self.files = {kind: open(path, "w", newline="" if kind == "csv" else None, encoding="utf-8")
+                      for kind, path in self.paths.items()}
+        self.count = 0
+        self.failures = 0
+        self.note = ""
+        self._csv = None
+        self._last_flush = time.monotonic()
+        if "csv" in self.files:
+            self._csv = csv.writer(self.files["csv"])
+            self._csv.writerow(self.fields)
+        if "html" in self.files:
+            self.files["html"].write(
+                f"<html><head><meta charset='utf-8'><title>{escape(self.title)}</title>"
+                f"<style>{REPORT_CSS}</style></head><body><h1>{escape(self.title)}</h1>"
+                "<table><tr>" + "".join(f"<th>{escape(field)}</th>" for field in self.fields) + "</tr>\n"
+            )
+
+    def _html_cell(self, field, value):
+        text = escape(cell_text(value))
+        if field in ("url", "image") and text.startswith("http"):
+            return f"<td><a href='{text}' target='_blank'>{text}</a></td>"
+        return f"<td>{text}</td>"
+
+    def write(self, row):
+        self.count += 1
+        failed = bool(self.failed and self.failed(row))
+        self.failures += failed
+        if self._csv:
+            self._csv.writerow([cell_text(row.get(field)) for field in self.fields])
+        if "ndjson" in self.files:
+            self.files["ndjson"].write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        if "html" in self.files:
+            cells = "".join(self._html_cell(field, row.get(field)) for field in self.fields)
+            self.files["html"].write(("<tr class='failed'>" if failed else "<tr>") + cells + "</tr>\n")
+        if self.count % self.flush_every == 0 or time.monotonic() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def write_all(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        for f in self.files.values():
+            f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self, error=None):
+        if not self.files:
+            return
+        if "html" in self.files:
+            html = self.files["html"]
+            html.write("</table>")
+            summary = f"{self.count} rows"
+            if self.failed:
+                summary += f", {self.failures} failed"
+            html.write(f"<p>{escape(self.note + ' ' if self.note else '')}{summary}.</p>")
+            if error is not None:
+                html.write(f"<p class='incomplete'>⚠️ Report incomplete: the run stopped with "
+                           f"{escape(type(error).__name__)}: {escape(str(error))}</p>")
+            html.write("</body></html>\n")
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        if error is not None:
+            logger.warning(f"[reports] {self.title}: closed after {self.count} rows because of {error!r}")
+
+    def print_paths(self):
+        for kind, path in self.paths.items():
+            print(f" - {kind.upper()}: {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(exc)
@@ -0,0 +1,161 @@
+# mylibri/retry.py
+"""
+Failure classification and retries for book sweeps.
+
+Every failed check is classified as one of `FAILURE_KINDS`:
+
+- "timeout": navigation ran out of time
+- "network": the request got no answer (DNS, reset, aborted, crashed page)
+- "http_5xx" / "http_4xx": the server answered with an error status
+- "js_error": the page threw while rendering and the expected element never appeared
+- "missing_element": the page loaded but the expected element is not there
+- "error": anything else
+
+Only `TRANSIENT_FAILURES` (timeouts, network errors and 5xx answers) are
+tried again, after a jittered exponential backoff, up to
+`SWEEP_RETRY_ATTEMPTS` attempts in all. Each result records its
+"attempts" and "failure" kind. A check that still fails transiently on
+its last attempt is reported as "Error" rather than "Broken": it says
+nothing about the book, so it neither counts toward nor resets the
+consecutive-failure stop, and a resumed sweep checks it again.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+
+from mylibri.config import SWEEP_RETRY_ATTEMPTS, SWEEP_RETRY_BACKOFF_MAX_S, SWEEP_RETRY_BACKOFF_S
+
+logger = logging.getLogger(__name__)
+
+FAILURE_KINDS = ("timeout", "network", "http_5xx", "http_4xx", "js_error", "missing_element", "error")
+TRANSIENT_FAILURES = frozenset({"timeout", "network", "http_5xx"})
+
+# Playwright error messages for requests that never got an answer
+NETWORK_MARKERS = ("net::ERR_", "NS_ERROR_", "Connection refused", "Connection reset", "Target closed",
+                   "has been closed", "Navigation failed because page crashed")
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status, url=""):
+        super().__init__(f"HTTP {status} from {url}" if url else f"HTTP {status}")
+        self.status = status
+
+
+def raise_for_status(response, url=""):
+    """Raise `HTTPStatusError` for a navigation response with a 4xx/5xx status."""
+    if response is not None and response.status >= 400:
+        raise HTTPStatusError(response.status, url or response.url)
+    return response
+
+
+def classify_status(status):
+    return "http_5xx" if status >= 500 else "http_4xx"
+
+
+def classify_exception(error):
+    """The failure kind of an exception raised while loading or reading a page."""
+    if isinstance(error, HTTPStatusError):
+        return classify_status(error.status)
+    # Playwright's TimeoutError (sync and async) is not a subclass of the builtin one
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)) or type(error).__name__ == "TimeoutError":
+        return "timeout"
+    message = str(error)
+    if isinstance(error, ConnectionError) or any(marker in message for marker in NETWORK_MARKERS):
+        return "network"
+    return "error"
+
+
+class RetryPolicy:
+    """
+    How often a check is tried and how long to wait in between. Keeps
+    counts of retries, recoveries and final failure kinds for the summary.
+    """
+
+    def __init__(self, attempts=SWEEP_RETRY_ATTEMPTS, backoff_s=SWEEP_RETRY_BACKOFF_S,
+                 backoff_max_s=SWEEP_RETRY_BACKOFF_MAX_S, transient=TRANSIENT_FAILURES, rng=random):
+        self.attempts = max(1, attempts)
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.transient = transient
+        self.rng = rng
+        self.retries = 0
+        self.recovered = 0
+        self.failures = Counter()
+
+    def should_retry(self, failure, attempt):
+        return failure in self.transient and attempt < self.attempts
+
+    def delay(self, attempt):
+        """Seconds to wait after failed attempt number `attempt` ("full jitter" exponential backoff)."""
+        return self.rng.uniform(0, min(self.backoff_max_s, self.backoff_s * 2 ** (attempt - 1)))
+
+    def finish(self, result, attempts):
+        """Record `attempts` on a check result and turn an unresolved transient failure into "Error"."""
+        failure = result.get("failure", "")
+        result["attempts"] = attempts
+        if result["status"] == "OK":
+            self.recovered += attempts > 1
+        else:
+            self.failures[failure or "error"] += 1
+            if failure in self.transient:
+                result["status"] = "Error"
+        return result
+
+    def summary(self):
+        kinds = ", ".join(f"{kind} {count}" for kind, count in self.failures.most_common()) or "none"
+        return f"{self.retries} retries, {self.recovered} IDs recovered on retry; failures: {kinds}"
+
+
+def with_retries(check, policy=None):
+    """
+    Wrap a sweep check (see mylibri.sweep) so transient failures are tried
+    again. The check must put the failure kind in result["failure"];
+    results without one are never retried.
+    """
+    policy = policy or RetryPolicy()
+
+    async def check_with_retries(page, book_id):
+        attempt = 1
+        result = await check(page, book_id)
+        while result["status"] != "OK" and policy.should_retry(result.get("failure", ""), attempt):
+            delay = policy.delay(attempt)
+            logger.info(f"[retry] ID {book_id}: {result['failure']} on attempt {attempt}, retrying in {delay:.1f}s")
+            policy.retries += 1
+            await asyncio.sleep(delay)
+            attempt += 1
+            result = await check(page, book_id)
+        return policy.finish(result, attempt)
+
+    check_with_retries.policy = policy
+    return check_with_retries
+
+
+def call_with_retries_sync(fn, policy=None, wait=time.sleep):
+    """
+    Call `fn()` until it returns, or raises a failure that is not transient
+    or on its last attempt. Returns `(value, error, failure, attempts)`;
+    `error` and `failure` are None when `fn` succeeded. `wait(seconds)`
+    sleeps between attempts (pass a page's `wait_for_timeout` wrapper to
+    keep a sync Playwright page responsive).
+    """
+    policy = policy or RetryPolicy()
+    attempt = 1
+    while True:
+        try:
+            value = fn()
+        except Exception as e:
+            failure = classify_exception(e)
+            if not policy.should_retry(failure, attempt):
+                policy.failures[failure] += 1
+                return None, e, failure, attempt
+            delay = policy.delay(attempt)
+            logger.info(f"[retry] {failure} on attempt {attempt}, retrying in {delay:.1f}s: {e}")
+        else:
+            policy.recovered += attempt > 1
+            return value, None, None, attempt
+        policy.retries += 1
+        wait(delay)
+        attempt += 1
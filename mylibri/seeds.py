@@ -0,0 +1,168 @@
+# mylibri/seeds.py
+"""
+Extra crawl seeds, so deep pages are reached in fewer hops.
+
+Three sources, each optional per phase:
+
+- "sitemap": `/sitemap.xml` plus any `Sitemap:` lines in `/robots.txt`,
+  following sitemap indexes.
+- "routes": the SPA's client-side route table. A Vue router exposes it
+  at runtime; otherwise the same-site JS bundles the first seed loads are
+  scanned for path literals. Parameterized routes (`/books/:id`) are
+  skipped, since they cannot be visited as written.
+- "previous": pages that rendered fine in the same phase of an earlier
+  crawl (see `CrawlStore.known_pages`).
+
+Every seed is canonicalized and kept only if it is a same-site page.
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+
+from mylibri.links import canonicalize, link_tier, origin_of
+from mylibri.ratelimit import throttled_fetch, throttled_goto
+
+logger = logging.getLogger(__name__)
+
+SEED_SOURCES = ("sitemap", "routes", "previous")
+# Sitemap files fetched per origin, counting nested indexes
+MAX_SITEMAPS = 20
+TIMEOUT = 15000
+# Path literals under these prefixes are endpoints or files, not pages
+IGNORED_ROUTE_PREFIXES = ("/api", "/static", "/assets")
+# Visiting these would end the phase's signed-in session
+SIGN_OUT_ROUTE = re.compile(r"log-?out|sign-?out", re.IGNORECASE)
+
+# Quoted absolute paths such as "/home/discover" in minified JS
+ROUTE_LITERAL = re.compile(r"""["'`](/[a-zA-Z][\w-]*(?:/[\w:*-]+)*/?)["'`]""")
+
+RUNTIME_ROUTES_JS = """
+() => {
+  const paths = [];
+  for (const el of document.querySelectorAll("*")) {
+    const app = el.__vue_app__;
+    const router = app && app.config.globalProperties.$router;
+    if (router) {
+      for (const route of router.getRoutes()) paths.push(route.path);
+      break;
+    }
+  }
+  const scripts = [...document.querySelectorAll("script[src]")].map(s => s.src);
+  const loaded = performance.getEntriesByType("resource")
+    .filter(e => e.initiatorType === "script").map(e => e.name);
+  return {paths, scripts: [...new Set([...scripts, ...loaded])]};
+}
+"""
+
+
+def parse_sitemap(xml_text):
+    """`(page_urls, nested_sitemap_urls)` from a sitemap or sitemap index."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError as e:
+        logger.warning(f"[seeds] Unreadable sitemap: {e}")
+        return [], []
+    # Element names carry the sitemap namespace; compare on the local part
+    locs = [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+    if root.tag.rsplit("}", 1)[-1] == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+def sitemaps_in_robots(robots_text):
+    return [line.split(":", 1)[1].strip() for line in robots_text.splitlines()
+            if line.lower().startswith("sitemap:")]
+
+
+def route_paths(js_text):
+    """Visitable route paths that appear as string literals in a JS bundle."""
+    paths = []
+    for path in ROUTE_LITERAL.findall(js_text):
+        if ":" in path or "*" in path or path.startswith(IGNORED_ROUTE_PREFIXES) or SIGN_OUT_ROUTE.search(path):
+            continue
+        paths.append(path)
+    return list(dict.fromkeys(paths))
+
+
+def same_site_pages(urls, base_url, rules=None):
+    """Canonical, de-duplicated seeds from `urls` that are pages on `base_url`'s site."""
+    pages = {}
+    for url in urls:
+        if link_tier(url, base_url) == "render":
+            pages.setdefault(canonicalize(url, rules), None)
+    return list(pages)
+
+
+async def _get_text(request, url):
+    try:
+        response = await throttled_fetch(request, "get", url, timeout=TIMEOUT)
+        text = await response.text() if response.ok else None
+        await response.dispose()
+        return text
+    except Exception as e:
+        logger.info(f"[seeds] Could not fetch {url}: {e}")
+        return None
+
+
+async def sitemap_urls(request, base_url, max_sitemaps=MAX_SITEMAPS):
+    """Page URLs listed in the site's sitemaps (found via robots.txt and /sitemap.xml)."""
+    robots = await _get_text(request, f"{base_url}/robots.txt") or ""
+    to_fetch = list(dict.fromkeys(sitemaps_in_robots(robots) + [f"{base_url}/sitemap.xml"]))
+    fetched, pages = set(), []
+    while to_fetch and len(fetched) < max_sitemaps:
+        url = to_fetch.pop(0)
+        if url in fetched:
+            continue
+        fetched.add(url)
+        text = await _get_text(request, url)
+        if not text:
+            continue
+        found, nested = parse_sitemap(text)
+        pages += found
+        to_fetch += nested
+    return pages
+
+
+async def route_table_urls(context, seed, base_url):
+    """Pages named by the SPA's route table, read while `seed` is loaded."""
+    page = await context.new_page()
+    try:
+        await throttled_goto(page, seed, wait_until="load", timeout=TIMEOUT)
+        found = await page.evaluate(RUNTIME_ROUTES_JS)
+    except Exception as e:
+        logger.info(f"[seeds] Could not read routes from {seed}: {e}")
+        return []
+    finally:
+        await page.close()
+    paths = [p for p in found["paths"] if ":" not in p and "*" not in p and not SIGN_OUT_ROUTE.search(p)]
+    if not paths:
+        for script in found["scripts"]:
+            if origin_of(script) == base_url:
+                paths += route_paths(await _get_text(context.request, script) or "")
+    return [f"{base_url}{path}" for path in dict.fromkeys(paths)]
+
+
+async def discover_seeds(context, seeds, phase, sources=SEED_SOURCES, store=None, rules=None):
+    """
+    Seeds from `sources` for a crawl that starts at `seeds`, excluding the
+    seeds themselves. `context` is the phase's context, so routes and
+    sitemaps are read with the phase's login.
+    """
+    base_url = origin_of(seeds[0])
+    found = {}
+    if "sitemap" in sources:
+        found["sitemap"] = await sitemap_urls(context.request, base_url)
+    if "routes" in sources:
+        found["routes"] = await route_table_urls(context, seeds[0], base_url)
+    if "previous" in sources and store:
+        found["previous"] = store.known_pages(phase)
+
+    known = set(same_site_pages(seeds, base_url, rules))
+    extra = []
+    for source, urls in found.items():
+        pages = [url for url in same_site_pages(urls, base_url, rules) if url not in known]
+        known.update(pages)
+        extra += pages
+        logger.info(f"[seeds] {phase}: {len(pages)} new seeds from {source}")
+    return extra
@@ -0,0 +1,121 @@
+# mylibri/stub_server.py
+"""
+Local stand-in for mylibribooks.com used by benchmarks.
+
+Serves just enough of the site for the sweep engine: a home page with a
+"Sign In" link, a sign-in form, a dashboard and `/home/books/<id>` SPA
+pages that fetch `/api/books/<id>` and either render a book title or stay
+an empty shell when the API answers 404. With `site_pages` it also serves
+a linked graph of `/pages/<n>` documents for crawler benchmarks, where
+every tenth page links to a page that does not exist. Each page also
+links a PDF under `/files/` and shows a cover image, which the crawler
+checks over HTTP; HEAD is answered for every path.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOOK_PATH = re.compile(r"^/home/books/(\d+)/?$")
+BOOK_API_PATH = re.compile(r"^/api/books/(\d+)/?$")
+SITE_PAGE_PATH = re.compile(r"^/pages/(\d+)/?$")
+ASSET_PATH = re.compile(r"^/(files|img)/[\w.-]+\.(pdf|png)$")
+
+HOME_PAGE = "<html><body><a href='/signin'>Sign In</a></body></html>"
+SIGNIN_PAGE = """<html><body>
+<input type='email' placeholder='Email address'>
+<input type='password' placeholder='Password'>
+<button class='btn-login-button' onclick="document.cookie='session=stub; path=/'; location.href='/home/dashboard'">Login</button>
+</body></html>"""
+DASHBOARD_PAGE = "<html><body><img class='profile_pic'><h1>Dashboard</h1></body></html>"
+BOOK_PAGE = """<html><body><div id='root'></div><script>
+fetch('/api/books/{id}').then(r => r.ok ? r.json() : null).then(res => {{
+  if (!res) return;
+  document.getElementById('root').innerHTML =
+    "<div class='book-details'><h1 class='book-name'>" + res.data.title + "</h1>" +
+    "<p class='author-name'>" + res.data.author + "</p></div>";
+}});
+</script></body></html>"""
+
+
+def site_page(number, total):
+    """A `/pages/<n>` document linking to a few other pages of a `total`-page site."""
+    targets = [(number + 1) % total, (number * 7 + 3) % total, (number * 13 + 5) % total]
+    links = [f"<a href='/pages/{t}'>Page {t}</a>" for t in targets]
+    links.append(f"<a href='/pages/{targets[0]}?ref={number}#top'>Same page, other query</a>")
+    links.append("<a href='https://example.org/elsewhere'>External</a>")
+    links.append(f"<a href='/files/page-{number}.pdf'>Download</a><img src='/img/cover.png'>")
+    if number % 10 == 0:
+        links.append(f"<a href='/pages/missing-{number}'>Broken</a>")
+    return f"<html><body><h1>Page {number}</h1>{''.join(links)}</body></html>"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body=True):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        path = self.path.split("?")[0]
+        content_type = "text/html; charset=utf-8"
+        book_match = BOOK_PATH.match(path)
+        api_match = BOOK_API_PATH.match(path)
+        site_match = SITE_PAGE_PATH.match(path)
+        if book_match:
+            body = BOOK_PAGE.format(id=int(book_match.group(1)))
+        elif api_match:
+            book_id = int(api_match.group(1))
+            if book_id not in self.server.live_ids:
+                self.send_error(404)
+                return
+            content_type = "application/json"
+            body = json.dumps({"data": {"id": book_id, "title": f"Stub Book {book_id}", "author": f"Author {book_id}"}})
+        elif site_match and int(site_match.group(1)) < self.server.site_pages:
+            body = site_page(int(site_match.group(1)), self.server.site_pages)
+        elif self.server.site_pages and ASSET_PATH.match(path):
+            content_type = "application/pdf" if path.endswith(".pdf") else "image/png"
+            body = "stub asset"
+        elif path in ("/", ""):
+            body = HOME_PAGE
+            if self.server.site_pages:
+                body = body.replace("</body>", "<a href='/pages/0'>Pages</a></body>")
+        elif path == "/signin":
+            body = SIGNIN_PAGE
+        elif path.startswith("/home"):
+            body = DASHBOARD_PAGE
+        else:
+            self.send_error(404)
+            return
+
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(live_ids=(), latency=0.0, host="127.0.0.1", port=0, site_pages=0):
+    """
+    Start the stub site on a background thread.
+
+    `live_ids` is the set of book IDs that render a title; `latency` is a
+    per-request delay in seconds; `site_pages` is the size of the
+    `/pages/<n>` link graph. Returns `(server, base_url)`; call
+    `server.shutdown()` when done.
+    """
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    server.live_ids = set(live_ids)
+    server.latency = latency
+    server.site_pages = site_pages
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
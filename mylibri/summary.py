@@ -0,0 +1,249 @@
+# mylibri/summary.py
+"""
+Streaming merge of result files into one combined summary.
+
+Sources are found by glob or listed in a run manifest, and may be JSON
+arrays, NDJSON/JSONL or CSV; none is ever loaded whole. Records are
+keyed by book ID (by URL when they have none) and the newest one per key
+wins: newest by the record's "timestamp", then by the source's run time
+(see `mylibri.incremental.file_timestamp`), then by the order of sources.
+
+Merging is an external sort. Records are read in chunks of `chunk_rows`,
+each chunk is sorted and, once there is more than one, spilled to a
+temporary NDJSON file; the chunks are then merged with `heapq.merge` and
+only the winner of each key is kept. Memory stays at one chunk however
+large the sources are. The combined CSV and JSON are written as the
+merge produces them.
+"""
+
+import csv
+import glob
+import heapq
+import itertools
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from mylibri.incremental import file_timestamp
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ("id", "url", "status", "title", "author", "rating", "pages", "failure", "error", "timestamp",
+                  "source")
+CHUNK_ROWS = 200_000
+# Sorted chunks merged at once; more are merged in passes to stay under the open-file limit
+MAX_OPEN_RUNS = 128
+READ_SIZE = 1 << 16
+
+
+def iter_json_array(f, read_size=READ_SIZE):
+    """The items of a JSON array, decoded one at a time from a file of any size."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def skip(chars):
+        nonlocal pos
+        while pos < len(buffer) and buffer[pos] in chars:
+            pos += 1
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    fill()
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("not a JSON array")
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("JSON array is not closed")
+            fill()
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item runs past the buffer; read on unless the file is done
+            if eof:
+                raise
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+def iter_records(path):
+    """The records in one JSON, NDJSON/JSONL or CSV result file, read lazily."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="" if path.suffix == ".csv" else None) as f:
+        if path.suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.suffix == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for item in iter_json_array(f):
+                if isinstance(item, dict):
+                    yield item
+
+
+def read_manifest(path):
+    """
+    Source paths from a run manifest: a JSON list, a JSON object with a
+    "sources" list, or one path per line. Relative paths are taken from
+    the manifest's directory.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    try:
+        listed = json.loads(text)
+    except ValueError:
+        listed = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    if isinstance(listed, dict):
+        listed = listed.get("sources", [])
+    return [path.parent / item if not Path(item).is_absolute() else Path(item) for item in listed]
+
+
+def discover_sources(patterns=(), manifest=None):
+    """Existing source files from `patterns` and `manifest`, de-duplicated, oldest run first."""
+    found = {}
+    for pattern in patterns:
+        for name in sorted(glob.glob(str(pattern), recursive=True)):
+            found.setdefault(os.path.abspath(name), Path(name))
+    for path in read_manifest(manifest) if manifest else ():
+        if path.exists():
+            found.setdefault(os.path.abspath(path), path)
+        else:
+            logger.warning(f"[summary] Manifest lists a missing source: {path}")
+    return sorted(found.values(), key=file_timestamp)
+
+
+def record_key(record):
+    """The sort key a record is merged on: its book ID, or its URL when it has none."""
+    book_id = str(record.get("id", "")).strip()
+    if book_id.isdigit():
+        return [0, int(book_id), ""]
+    if record.get("url"):
+        return [1, 0, record["url"]]
+    return None
+
+
+class _Chunks:
+    """Sorted chunks of `[key, timestamp, sequence, record]` entries, spilled to disk past the first."""
+
+    def __init__(self, tmp_dir):
+        self.tmp_dir = tmp_dir
+        self.paths = []
+        self.memory = []
+
+    def add(self, batch):
+        batch.sort(key=lambda entry: entry[:3])
+        if not self.paths and not self.memory:
+            # Everything may fit in one chunk; only spill once a second one arrives
+            self.memory = batch
+            return
+        if self.memory:
+            self.paths.append(self._spill(self.memory))
+            self.memory = []
+        self.paths.append(self._spill(batch))
+
+    def _spill(self, entries):
+        fd, name = tempfile.mkstemp(suffix=".ndjson", dir=self.tmp_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return name
+
+    @staticmethod
+    def _read(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def merged(self, max_open=None):
+        max_open = max_open or MAX_OPEN_RUNS
+        if not self.paths:
+            return iter(self.memory)
+        while len(self.paths) > max_open:
+            group, self.paths = self.paths[:max_open], self.paths[max_open:]
+            self.paths.append(self._spill(heapq.merge(*map(self._read, group), key=lambda entry: entry[:3])))
+            for path in group:
+                os.remove(path)
+        return heapq.merge(*map(self._read, self.paths), key=lambda entry: entry[:3])
+
+
+def merge_sources(sources, chunk_rows=CHUNK_ROWS, tmp_dir=None, stats=None):
+    """
+    Yield the newest record per book ID (or URL) across `sources`, in key
+    order. Each record gets a "timestamp" (its source's run time if it had
+    none) and the "source" file it came from. `stats`, if given, is filled
+    with counts of sources, records read, records kept and records skipped.
+    """
+    stats = stats if stats is not None else {}
+    stats.update({"sources": 0, "records": 0, "merged": 0, "skipped": 0, "chunks": 0})
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="summary_") as scratch:
+        chunks = _Chunks(scratch)
+        batch, sequence = [], 0
+        for source in sources:
+            stats["sources"] += 1
+            checked_at = file_timestamp(source).isoformat()
+            for record in iter_records(source):
+                stats["records"] += 1
+                key = record_key(record)
+                if key is None:
+                    stats["skipped"] += 1
+                    continue
+                record = {**record, "timestamp": record.get("timestamp") or checked_at, "source": str(source)}
+                batch.append([key, record["timestamp"], sequence, record])
+                sequence += 1
+                if len(batch) >= chunk_rows:
+                    chunks.add(batch)
+                    batch = []
+        if batch or not sequence:
+            chunks.add(batch)
+        stats["chunks"] = max(1, len(chunks.paths))
+        for _, entries in itertools.groupby(chunks.merged(), key=lambda entry: entry[0]):
+            for entry in entries:
+                newest = entry
+            stats["merged"] += 1
+            yield newest[3]
+
+
+class SummaryWriter:
+    """The combined CSV (`SUMMARY_FIELDS`) and JSON array (every key), written one record at a time."""
+
+    def __init__(self, csv_path, json_path, fields=SUMMARY_FIELDS):
+        self.paths = {"csv": Path(csv_path), "json": Path(json_path)}
+        for path in self.paths.values():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._csv_file = open(self.paths["csv"], "w", newline="", encoding="utf-8")
+        self._json_file = open(self.paths["json"], "w", encoding="utf-8")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=list(fields), extrasaction="ignore")
+        self._csv.writeheader()
+        self._json_file.write("[")
+        self.count = 0
+
+    def write(self, record):
+        self._csv.writerow(record)
+        self._json_file.write(("," if self.count else "") + "\n  " + json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        self._json_file.write("\n]\n" if self.count else "]\n")
+        self._csv_file.close()
+        self._json_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
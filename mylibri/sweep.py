@@ -0,0 +1,285 @@
+# mylibri/sweep.py
+"""
+Concurrent book ID sweep engine.
+
+A sweep drives several pages of one logged-in browser context. Each page
+pulls the next book ID from a shared work queue, runs a per-ID check and
+hands the result back; results are returned sorted by book ID no matter
+which page finished first.
+
+The per-ID check and the report built from the results depend on the
+sweep mode (see `MODES`): "links" reports every ID with its title,
+"broken" only the IDs that failed, and "metadata" reads title, author,
+rating and page count for every ID (see mylibri/metadata.py).
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from mylibri.auth import login_async
+from mylibri.config import BOOK_URL_BASE, SWEEP_CONCURRENCY, SWEEP_PROBE
+from mylibri.ratelimit import throttled_goto
+from mylibri.retry import RetryPolicy, classify_exception, raise_for_status, with_retries
+
+logger = logging.getLogger(__name__)
+
+TITLE_SELECTOR = "div.book-details h1.book-name"
+
+LINK_FIELDS = ["id", "url", "status", "title", "error", "failure", "attempts"]
+METADATA_FIELDS = ["id", "url", "status", "title", "author", "rating", "pages", "source", "error", "failure",
+                   "attempts"]
+# Report columns, report/snapshot/checkpoint file name prefixes, and whether the report keeps only failed IDs.
+# Every mode has its own prefixes, so modes run side by side never write the same file; the
+# "links" snapshot still starts with "book_id_sweep" so the "broken" mode's incremental runs can use it.
+MODES = {
+    "links": {"fields": LINK_FIELDS, "report": "book_links", "snapshot": "book_id_sweep_links",
+              "checkpoint": "book_links_sweep", "broken_only": False},
+    "broken": {"fields": LINK_FIELDS, "report": "broken_links", "snapshot": "book_id_sweep",
+               "checkpoint": "book_id_sweep", "broken_only": True},
+    "metadata": {"fields": METADATA_FIELDS, "report": "metadata_validation", "snapshot": "book_metadata",
+                 "checkpoint": "book_metadata_sweep", "broken_only": False},
+}
+
+
+def broken_result(book_id, book_url, failure, error):
+    return {"id": book_id, "url": book_url, "status": "Broken", "title": "", "error": error, "failure": failure}
+
+
+async def check_book_page(page, book_id, book_url_base=BOOK_URL_BASE, timeout=8000):
+    """
+    Open one book page and report whether its title rendered. A failure is
+    classified (see mylibri/retry.py) by the step that failed: loading the
+    page, or finding the title once it loaded.
+    """
+    book_url = f"{book_url_base}/{book_id}"
+    js_errors = []
+    page.on("pageerror", js_errors.append)
+    try:
+        try:
+            raise_for_status(await throttled_goto(page, book_url, timeout=timeout), book_url)
+        except Exception as e:
+            return broken_result(book_id, book_url, classify_exception(e), f"Failed to load page: {e}")
+        try:
+            title = await page.locator(TITLE_SELECTOR).first.text_content(timeout=timeout)
+        except Exception as e:
+            failure = classify_exception(e)
+            if failure != "timeout":
+                return broken_result(book_id, book_url, failure, f"Failed to find title: {e}")
+            if js_errors:
+                return broken_result(book_id, book_url, "js_error", f"Title never rendered; page error: {js_errors[0]}")
+            return broken_result(book_id, book_url, "missing_element", f"Title not found: {e}")
+        return {"id": book_id, "url": book_url, "status": "OK", "title": title.strip(), "error": "", "failure": ""}
+    finally:
+        page.remove_listener("pageerror", js_errors.append)
+
+
+def mode_rules(name):
+    if name not in MODES:
+        raise ValueError(f"Unknown sweep mode '{name}'; expected one of {', '.join(MODES)}")
+    return MODES[name]
+
+
+def mode_session_options(name, book_url_base=BOOK_URL_BASE):
+    """
+    The `check` (and, where it matters, `probe`) to pass to `run_sweep` /
+    `run_bounded_sweep` for sweep mode `name`. Metadata needs the page the
+    book JSON is fetched by, so that mode always renders.
+    """
+    mode_rules(name)
+    if name == "metadata":
+        from mylibri.metadata import metadata_check
+        return {"check": metadata_check(book_url_base=book_url_base), "probe": "page"}
+    return {"check": partial(check_book_page, book_url_base=book_url_base)}
+
+
+def report_rows(name, results):
+    """The results a mode's report keeps, trimmed to its columns."""
+    rules = mode_rules(name)
+    return [
+        {field: result.get(field, "") for field in rules["fields"]}
+        for result in results if not rules["broken_only"] or result["status"] != "OK"
+    ]
+
+
+class _ConsecutiveFailures:
+    """
+    Counts trailing failures over the contiguous, ID-ordered prefix of
+    finished IDs. IDs added with `broken=None` (checks that errored, see
+    mylibri/retry.py) neither count nor reset the run.
+    """
+
+    def __init__(self, ids):
+        self._ids = ids
+        self._done = {}
+        self._next = 0
+        self.count = 0
+
+    def add(self, book_id, broken):
+        self._done[book_id] = broken
+        while self._next < len(self._ids) and self._ids[self._next] in self._done:
+            broken = self._done.pop(self._ids[self._next])
+            if broken is not None:
+                self.count = self.count + 1 if broken else 0
+            self._next += 1
+        return self.count
+
+
+async def sweep(context, book_ids, check=check_book_page, concurrency=SWEEP_CONCURRENCY,
+                stop_after_consecutive_fails=None, on_result=None):
+    """
+    Check every ID in `book_ids` using up to `concurrency` pages of `context`.
+
+    `check(page, book_id)` must return a result dict with at least "id" and
+    "status". `on_result`, if given, is called with each result as soon as it
+    is available. When `stop_after_consecutive_fails` is set, no new IDs are
+    handed out once that many IDs in a row (in ID order) came back Broken;
+    IDs that came back "Error" are skipped over when counting.
+    """
+    ids = sorted(set(book_ids))
+    queue = asyncio.Queue()
+    for book_id in ids:
+        queue.put_nowait(book_id)
+
+    results = {}
+    stop = asyncio.Event()
+    failures = _ConsecutiveFailures(ids)
+
+    async def worker(worker_id):
+        page = await context.new_page()
+        try:
+            while not stop.is_set():
+                try:
+                    book_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await check(page, book_id)
+                results[book_id] = result
+                if on_result:
+                    on_result(result)
+                in_a_row = failures.add(book_id, None if result["status"] == "Error" else result["status"] != "OK")
+                if stop_after_consecutive_fails and in_a_row >= stop_after_consecutive_fails:
+                    logger.info(f"Stopping after {in_a_row} consecutive broken IDs (last: {book_id}).")
+                    stop.set()
+        finally:
+            await page.close()
+
+    workers = max(1, min(concurrency, len(ids)))
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    return [results[book_id] for book_id in sorted(results)]
+
+
+@asynccontextmanager
+async def sweep_session(sample_ids, check=check_book_page, headless=True, login=login_async,
+                        default_timeout=15000, probe=SWEEP_PROBE, book_url_base=BOOK_URL_BASE,
+                        storage_state=None, profile=None, retry_policy=None):
+    """
+    Launch Chromium, log in once and yield `(context, check)` for sweeping.
+    The yielded check retries transient failures under `retry_policy`
+    (default: a new `RetryPolicy`; its counters are on `check.policy`).
+
+    Pass `storage_state` (a path saved by `tests/conftest.py`) to start the
+    context already signed in and skip the UI login, and `profile="lean"`
+    to skip images, fonts and trackers (see mylibri/profiles.py).
+
+    With `probe="http"` the book JSON endpoint is discovered from the first
+    of `sample_ids` that render, and the yielded check only falls back to
+    `check` for IDs the endpoint cannot classify on its own.
+    """
+    from playwright.async_api import async_playwright
+    from mylibri.probe import discover_book_api, http_first_check
+    from mylibri.profiles import apply_profile_async
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        context = await browser.new_context(storage_state=storage_state)
+        context.set_default_timeout(default_timeout)
+        await apply_profile_async(context, profile)
+        try:
+            if login and not storage_state:
+                page = await context.new_page()
+                await login(page)
+                await page.close()
+            if probe == "http":
+                api = await discover_book_api(context, list(sample_ids)[:5], book_url_base=book_url_base)
+                if api:
+                    check = http_first_check(api, fallback=check, book_url_base=book_url_base)
+            yield context, with_retries(check, retry_policy or RetryPolicy())
+        finally:
+            await context.close()
+            await browser.close()
+
+
+async def run_sweep(book_ids, check=check_book_page, concurrency=SWEEP_CONCURRENCY,
+                    stop_after_consecutive_fails=None, on_result=None, **session_options):
+    """Open a sweep session and check every ID in `book_ids`."""
+    book_ids = sorted(set(book_ids))
+    if not book_ids:
+        return []
+    async with sweep_session(book_ids, check=check, **session_options) as (context, session_check):
+        return await sweep(
+            context,
+            book_ids,
+            check=session_check,
+            concurrency=concurrency,
+            stop_after_consecutive_fails=stop_after_consecutive_fails,
+            on_result=on_result,
+        )
+
+
+async def run_bounded_sweep(start_id, check=check_book_page, concurrency=SWEEP_CONCURRENCY,
+                            skip_ids=(), select=None, on_result=None, shard=None, **session_options):
+    """
+    Discover the live ID range above `start_id`, then sweep exactly that range.
+
+    With `shard=(index, count)` only that shard's slice of the discovered
+    range is swept (see `shard_range`). IDs in `skip_ids` (e.g. already
+    checkpointed) are not re-checked, and `select(ids)`, if given, narrows
+    the remaining IDs to those worth checking (see mylibri.incremental).
+    Returns `(results, estimate)` where `estimate` is a
+    `mylibri.boundary.BoundaryEstimate`.
+    """
+    from mylibri.boundary import discover_upper_bound, page_probe
+
+    sample_ids = range(start_id, start_id + 5)
+    async with sweep_session(sample_ids, check=check, **session_options) as (context, session_check):
+        page = await context.new_page()
+        try:
+            estimate = await discover_upper_bound(page_probe(page, session_check), start_id=start_id)
+        finally:
+            await page.close()
+        first_id, last_id = estimate.start_id, estimate.end_id
+        if shard:
+            first_id, last_id = shard_range(first_id, last_id, *shard)
+        book_ids = [book_id for book_id in range(first_id, last_id + 1) if book_id not in skip_ids]
+        if select:
+            book_ids = sorted(select(book_ids))
+        results = await sweep(context, book_ids, check=session_check, concurrency=concurrency, on_result=on_result)
+        return results, estimate
+
+
+def shard_range(first_id, last_id, index, count):
+    """
+    The contiguous `(first, last)` slice of `first_id..last_id` owned by shard
+    `index` of `count`. Slices differ in size by at most one ID; a shard with
+    nothing to do gets an empty range (`first > last`).
+    """
+    total = max(0, last_id - first_id + 1)
+    size, extra = divmod(total, count)
+    start = first_id + index * size + min(index, extra)
+    end = start + size + (1 if index < extra else 0) - 1
+    return start, end
+
+
+def run_in_thread(coro):
+    """
+    Run `coro` with `asyncio.run` on a worker thread and return its result.
+
+    pytest-playwright's sync fixtures keep an event loop running on the main
+    thread for the whole session, so calling `asyncio.run` from a test that
+    shares a session with them fails; a fresh thread gets its own loop.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -0,0 +1,379 @@
+# mylibri/warehouse.py
+"""
+One SQLite database for the results of every run.
+
+`test_reports/` keeps a timestamped CSV/JSON/HTML file per run, which is
+fine for reading one run and useless for questions across runs. The
+warehouse (`RESULTS_DB`, test_reports/results.sqlite by default) keeps
+them all in a few indexed tables:
+
+- runs: one row per run (kind, name, start time, row count, duration)
+- book_results: one row per book ID checked, indexed on ID, URL and time
+- crawl_results: one row per crawled URL, indexed on URL and time
+- genre_counts, discover_items: what the genre and discover tests found
+- timings: how long each test took, per pytest session
+
+Tests write through `ResultsWarehouse.run(...)`, a context that inserts
+rows as they come and commits once the run is over. `backfill` imports
+the report files of earlier runs (book_id_sweep_*, book_metadata_*,
+genre_book_counts_*, discover_*, full_broken_links_*). Every run records
+the report file it came from, so a file is only imported once, and a run
+that was written live is not imported again from its own report.
+
+    with ResultsWarehouse() as warehouse:
+        warehouse.last_broken(1234)
+"""
+
+import csv
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from mylibri.config import RESULTS_DB
+from mylibri.incremental import FILE_TIMESTAMP, REPORT_DIR, file_timestamp, normalize_result
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    source TEXT UNIQUE,
+    rows INTEGER NOT NULL DEFAULT 0,
+    duration_s REAL
+);
+CREATE TABLE IF NOT EXISTS book_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    book_id INTEGER NOT NULL,
+    url TEXT,
+    status TEXT NOT NULL,
+    title TEXT,
+    author TEXT,
+    rating TEXT,
+    pages TEXT,
+    failure TEXT,
+    error TEXT,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crawl_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    phase TEXT,
+    tier TEXT,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS genre_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    genre TEXT NOT NULL,
+    url TEXT,
+    count INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS discover_items (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    section TEXT,
+    title TEXT,
+    image TEXT
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration_s REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (kind, started_at);
+CREATE INDEX IF NOT EXISTS book_results_id ON book_results (book_id, checked_at);
+CREATE INDEX IF NOT EXISTS book_results_url ON book_results (url);
+CREATE INDEX IF NOT EXISTS crawl_results_url ON crawl_results (url, checked_at);
+CREATE INDEX IF NOT EXISTS genre_counts_genre ON genre_counts (genre);
+CREATE INDEX IF NOT EXISTS timings_test ON timings (test);
+"""
+
+# Report file name prefix -> kind of run, for `backfill`. Longest prefix first.
+REPORT_KINDS = {
+    "book_id_sweep": "book",
+    "book_metadata": "book",
+    "genre_book_counts": "genre",
+    "full_broken_links": "crawl",
+    "discover": "discover",
+}
+# When a run left several files, the first of these that exists is imported
+IMPORT_SUFFIXES = (".ndjson", ".jsonl", ".json", ".csv")
+# Book statuses that do not mean the book is broken: "OK" (it rendered) and
+# "Error" (the check itself kept failing, so it says nothing; see mylibri/retry.py)
+NON_BROKEN_STATUSES = ("OK", "Error")
+
+
+def source_key(path):
+    """The name a report file is recorded under: its file name without the format suffix."""
+    path = Path(path)
+    return path.stem if path.suffix in IMPORT_SUFFIXES + (".html",) else path.name
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return str(value)
+
+
+def book_row(record, checked_at):
+    result = normalize_result(record, checked_at)
+    return (
+        result["id"], result.get("url"), result["status"], _text(result.get("title")),
+        _text(result.get("author")), _text(result.get("rating")), _text(result.get("pages")),
+        result.get("failure") or None, result.get("error") or None, result["timestamp"],
+    )
+
+
+def crawl_row(record, checked_at):
+    return (
+        record.get("phase"), record.get("tier"), record["url"], str(record["status"]),
+        record.get("timestamp") or checked_at.isoformat(),
+    )
+
+
+def genre_row(record):
+    count = record.get("count", record.get("book_count"))
+    return (
+        record["genre"], record.get("url"), int(count) if str(count).isdigit() else None,
+        record.get("error") or None,
+    )
+
+
+def discover_rows(record):
+    """One row per book: "books" lists (discover_books) are split, covers and titles kept as they are."""
+    section = record.get("section") or record.get("category")
+    books = record.get("books")
+    if isinstance(books, list):
+        return [(section, _text(title), None) for title in books]
+    return [(section, record.get("title"), record.get("image"))]
+
+
+class WarehouseRun:
+    """Rows of one run, inserted as they are added; see `ResultsWarehouse.run`."""
+
+    INSERTS = {
+        "book": "INSERT INTO book_results (run_id, book_id, url, status, title, author, rating, pages, failure, "
+                "error, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        "crawl": "INSERT INTO crawl_results (run_id, phase, tier, url, status, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+        "genre": "INSERT INTO genre_counts (run_id, genre, url, count, error) VALUES (?, ?, ?, ?, ?)",
+        "discover": "INSERT INTO discover_items (run_id, section, title, image) VALUES (?, ?, ?, ?)",
+        "timings": "INSERT INTO timings (run_id, test, outcome, duration_s) VALUES (?, ?, ?, ?)",
+    }
+
+    def __init__(self, warehouse, run_id, kind, started_at):
+        self.warehouse = warehouse
+        self.run_id = run_id
+        self.kind = kind
+        self.started_at = started_at
+        self.count = 0
+        self._started = time.perf_counter()
+
+    def rows_for(self, record):
+        if self.kind == "book":
+            return [book_row(record, self.started_at)]
+        if self.kind == "crawl":
+            return [crawl_row(record, self.started_at)]
+        if self.kind == "genre":
+            return [genre_row(record)]
+        if self.kind == "discover":
+            return discover_rows(record)
+        return [(record["test"], record["outcome"], record["duration_s"])]
+
+    def _insert(self, record):
+        rows = [(self.run_id, *row) for row in self.rows_for(record)]
+        self.warehouse.db.executemany(self.INSERTS[self.kind], rows)
+        self.count += len(rows)
+
+    def add(self, record):
+        """Add one result and commit it, so a slow run never holds the database lock other workers need."""
+        self._insert(record)
+        self.warehouse.db.commit()
+
+    def add_all(self, records):
+        """Add a batch of results in one transaction."""
+        for record in records:
+            self._insert(record)
+        self.warehouse.db.commit()
+
+    def finish(self, complete=True):
+        """Commit the run. An incomplete run keeps its rows but no finished_at."""
+        if complete:
+            self.warehouse.db.execute(
+                "UPDATE runs SET finished_at = ?, rows = ?, duration_s = COALESCE(duration_s, ?) WHERE id = ?",
+                (datetime.now().isoformat(), self.count, time.perf_counter() - self._started, self.run_id),
+            )
+        else:
+            self.warehouse.db.execute("UPDATE runs SET rows = ? WHERE id = ?", (self.count, self.run_id))
+        self.warehouse.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(complete=exc_type is None)
+
+
+class ResultsWarehouse:
+    def __init__(self, path=RESULTS_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Sweep shards on other xdist workers write to the same file
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def run(self, kind, name, started_at=None, source=None, duration_s=None):
+        """
+        Start a run of `kind` ("book", "crawl", "genre", "discover" or
+        "timings") and return its `WarehouseRun`. `source` is the report
+        file holding the same rows, so `backfill` will not import it again.
+        """
+        if kind not in WarehouseRun.INSERTS:
+            raise ValueError(f"Unknown run kind {kind!r}; expected one of {', '.join(WarehouseRun.INSERTS)}")
+        started_at = started_at or datetime.now()
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (kind, name, started_at, source, duration_s) VALUES (?, ?, ?, ?, ?)",
+                (kind, name, started_at.isoformat(), source_key(source) if source else None, duration_s),
+            ).lastrowid
+        return WarehouseRun(self, run_id, kind, started_at)
+
+    def discard(self, run_id):
+        """Remove a run and everything recorded under it."""
+        with self.db:
+            for table in ("book_results", "crawl_results", "genre_counts", "discover_items", "timings"):
+                self.db.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self.db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def imported(self, source):
+        return self.db.execute("SELECT 1 FROM runs WHERE source = ?", (source_key(source),)).fetchone() is not None
+
+    def last_broken(self, book_id):
+        """The latest check that found `book_id` broken, as a dict, or None if it never broke."""
+        row = self.db.execute(
+            f"SELECT run_id, url, status, failure, error, checked_at FROM book_results "
+            f"WHERE book_id = ? AND status NOT IN ({', '.join('?' * len(NON_BROKEN_STATUSES))}) "
+            f"ORDER BY checked_at DESC LIMIT 1",
+            (book_id, *NON_BROKEN_STATUSES),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def book_history(self, book_id):
+        """Every check of `book_id`, oldest first."""
+        rows = self.db.execute(
+            "SELECT run_id, status, title, failure, checked_at FROM book_results WHERE book_id = ? ORDER BY checked_at",
+            (book_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def url_history(self, url):
+        """Every crawl or book check of `url`, oldest first."""
+        rows = self.db.execute(
+            "SELECT run_id, status, checked_at FROM crawl_results WHERE url = ? "
+            "UNION ALL SELECT run_id, status, checked_at FROM book_results WHERE url = ? ORDER BY checked_at",
+            (url, url),
+        )
+        return [dict(row) for row in rows]
+
+    def runs(self, kind=None, limit=20):
+        """The latest runs, newest first."""
+        query, args = "SELECT * FROM runs", ()
+        if kind:
+            query, args = query + " WHERE kind = ?", (kind,)
+        rows = self.db.execute(query + " ORDER BY started_at DESC LIMIT ?", (*args, limit))
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def report_kind(path):
+    """`(kind, name)` for a report file `backfill` knows, e.g. ("genre", "genre_book_counts"), else None."""
+    stem = Path(path).stem
+    match = FILE_TIMESTAMP.search(stem)
+    if not match:
+        return None
+    name = stem[:match.start()].rstrip("_")
+    for prefix, kind in REPORT_KINDS.items():
+        if name.startswith(prefix):
+            return kind, name
+    return None
+
+
+def read_report_rows(path):
+    """The rows of a JSON, JSONL/NDJSON or CSV report file."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="" if path.suffix == ".csv" else None) as f:
+        if path.suffix in (".jsonl", ".ndjson"):
+            return [json.loads(line) for line in f if line.strip()]
+        if path.suffix == ".csv":
+            return list(csv.DictReader(f))
+        rows = json.load(f)
+    return rows if isinstance(rows, list) else []
+
+
+def find_report_files(report_dir=REPORT_DIR):
+    """One file per earlier run in `report_dir`, in its preferred format, oldest run first."""
+    chosen = {}
+    for path in Path(report_dir).iterdir():
+        if path.suffix not in IMPORT_SUFFIXES or not report_kind(path):
+            continue
+        current = chosen.get(path.stem)
+        if current is None or IMPORT_SUFFIXES.index(path.suffix) < IMPORT_SUFFIXES.index(current.suffix):
+            chosen[path.stem] = path
+    return sorted(chosen.values(), key=file_timestamp)
+
+
+def import_report(warehouse, path):
+    """Import one report file as a run; returns the number of rows, or None if it was already imported."""
+    if warehouse.imported(path):
+        return None
+    kind, name = report_kind(path)
+    rows = read_report_rows(path)
+    # Old CSV reports wrote a header for an empty result; skip rows that cannot be keyed
+    if kind == "book":
+        rows = [row for row in rows if str(row.get("id", "")).strip().isdigit()]
+    run = warehouse.run(kind, name, started_at=file_timestamp(path), source=path)
+    try:
+        run.add_all(rows)
+    except Exception:
+        # A file that cannot be read in full is not recorded at all, so a fixed copy can be imported later
+        warehouse.db.rollback()
+        warehouse.discard(run.run_id)
+        raise
+    run.finish()
+    return run.count
+
+
+def backfill(warehouse, report_dir=REPORT_DIR):
+    """Import every report file in `report_dir` not imported yet; returns `{kind: rows imported}`."""
+    imported = {}
+    for path in find_report_files(report_dir):
+        try:
+            count = import_report(warehouse, path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"[warehouse] Skipping unreadable report {path}: {e}")
+            continue
+        if count is not None:
+            kind = report_kind(path)[0]
+            imported[kind] = imported.get(kind, 0) + count
+            logger.info(f"[warehouse] Imported {count} rows from {path}")
+    return imported
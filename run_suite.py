@@ -1,22 +1,87 @@
+import argparse
 import subprocess
+import sys
+import threading
+import time
 import webbrowser
 from pathlib import Path
 
-# Define report path
+from mylibri.lanes import LANES, LANE_DIR, build_command, build_env, lane_paths, merge_lane_results, write_combined_report
+
+# Define report paths
 report_path = Path("test_reports/full_report.html")
-report_path.parent.mkdir(exist_ok=True)
-
-print("📦 Running full test suite with HTML report...")
-result = subprocess.run([
-    "pytest",
-    "tests/",
-    f"--html={report_path}",
-    "--self-contained-html"
-])
-
-# Open the report in default browser if tests ran
-if report_path.exists():
-    print(f"✅ Opening report: {report_path}")
-    webbrowser.open(report_path.resolve().as_uri())
-else:
-    print("❌ Report was not generated.")
+summary_path = Path("test_reports/full_report.json")
+
+
+def stream_output(name, process, width):
+    """Print a lane's output line by line, prefixed with the lane name."""
+    prefix = f"[{name:<{width}}]"
+    for line in process.stdout:
+        print(f"{prefix} {line.rstrip()}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fast, slow and mobile lanes side by side.")
+    parser.add_argument("--lanes", default=",".join(LANES), help="comma-separated lanes to run (default: all)")
+    parser.add_argument("--no-open", action="store_true", help="don't open the combined report when done")
+    parser.add_argument("pytest_args", nargs="*", help="extra arguments passed to every lane (after --)")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.lanes.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in LANES]
+    if unknown:
+        parser.error(f"unknown lane(s): {', '.join(unknown)}")
+
+    LANE_DIR.mkdir(parents=True, exist_ok=True)
+    width = max(len(name) for name in selected)
+
+    print(f"📦 Running {len(selected)} lane(s) in parallel: {', '.join(selected)}")
+    running = {}
+    started = time.perf_counter()
+    # Every worker of every lane hits the site at once; they split one rate budget
+    processes = sum(max(1, LANES[name]["workers"]) for name in selected)
+    for name in selected:
+        lane = LANES[name]
+        command = build_command(name, lane, args.pytest_args)
+        print(f"🚀 [{name}] {lane['workers']} worker(s) x {lane['browsers']} browser(s): {' '.join(command)}")
+        process = subprocess.Popen(
+            command,
+            env=build_env(name, lane, processes=processes),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        reader = threading.Thread(target=stream_output, args=(name, process, width), daemon=True)
+        reader.start()
+        running[name] = (process, reader)
+
+    lane_results = {}
+    for name, (process, reader) in running.items():
+        returncode = process.wait()
+        reader.join()
+        status = "✅" if returncode == 0 else "❌"
+        print(f"{status} [{name}] finished with exit code {returncode}")
+        lane_results[name] = {"returncode": returncode, **lane_paths(name)}
+
+    combined = merge_lane_results(lane_results)
+    write_combined_report(combined, report_path, summary_path)
+    totals = combined["totals"]
+    print(f"\n⏱️ All lanes done in {time.perf_counter() - started:.1f}s: {totals['tests']} tests, "
+          f"{totals['passed']} passed, {totals['failures']} failed, {totals['errors']} errors, {totals['skipped']} skipped")
+
+    # Open the report in default browser if tests ran
+    if report_path.exists():
+        print(f"✅ Combined report: {report_path}")
+        if not args.no_open:
+            webbrowser.open(report_path.resolve().as_uri())
+    else:
+        print("❌ Report was not generated.")
+
+    # pytest exits 5 when a lane selects no tests; that is not a failure
+    return 0 if all(r["returncode"] in (0, 5) for r in lane_results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
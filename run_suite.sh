@@ -1,6 +1,8 @@
 #!/bin/bash
 
-echo "📦 Running full test suite..."
-pytest tests/ --html=test_reports/full_report.html --self-contained-html
+echo "📦 Running full test suite (fast, slow and mobile lanes in parallel)..."
+python run_suite.py --no-open "$@"
+status=$?
 
 echo "✅ Report generated: test_reports/full_report.html"
+exit $status
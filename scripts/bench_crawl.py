@@ -0,0 +1,107 @@
+# scripts/bench_crawl.py
+"""
+Benchmark the concurrent crawler against a local stub site.
+
+Compares the old one-page BFS (goto, then one get_attribute round-trip
+per anchor) with `mylibri.crawler.crawl` at several concurrency levels on
+a generated site of `--pages` linked pages. The crawler renders only the
+pages; PDFs, images and external links go to its HTTP tier (the "http
+checks" column), which the legacy crawl never looked at.
+
+    python scripts/bench_crawl.py --pages 300 --latency 0.02 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+from collections import deque
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mylibri.crawler import Frontier, crawl
+from mylibri.links import normalize_link
+from mylibri.stub_server import start_stub_server
+
+
+async def legacy_crawl(context, start_url, base_url):
+    """The BFS the original sync crawl in test_full_crawl_broken_links.py ran, on one page."""
+    page = await context.new_page()
+    to_visit, visited, results = deque([start_url]), set(), []
+    peak = 1
+    while to_visit:
+        url = to_visit.popleft()
+        if url in visited:
+            continue
+        visited.add(url)
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded")
+            results.append({"url": url, "status": response.status if response else "No response"})
+            anchors = page.locator("a")
+            for i in range(await anchors.count()):
+                link = normalize_link(await anchors.nth(i).get_attribute("href"), url, base_url)
+                if link and link not in visited:
+                    to_visit.append(link)
+            peak = max(peak, len(to_visit))
+        except Exception as e:
+            results.append({"url": url, "status": f"Error: {e}"})
+    await page.close()
+    return results, peak
+
+
+async def timed_crawls(base_url, concurrency_levels, skip_legacy):
+    from playwright.async_api import async_playwright
+
+    rows = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            if not skip_legacy:
+                context = await browser.new_context()
+                start = time.perf_counter()
+                results, peak = await legacy_crawl(context, base_url + "/", base_url)
+                rows.append(("legacy (1 page, per-anchor)", time.perf_counter() - start, results, peak))
+                await context.close()
+            for n in concurrency_levels:
+                context = await browser.new_context()
+                frontier = Frontier()
+                start = time.perf_counter()
+                results = await crawl(context, [base_url + "/"], "bench", concurrency=n, per_host=n, frontier=frontier)
+                rows.append((f"crawler ({n} page{'s' if n > 1 else ''})", time.perf_counter() - start, results,
+                             frontier.peak_size))
+                await context.close()
+        finally:
+            await browser.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="pages in the generated site")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server delay per request (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the one-page baseline")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(site_pages=args.pages, latency=args.latency)
+    print(f"📦 Stub site at {base_url} ({args.pages} pages, {args.latency}s latency)")
+    try:
+        rows = asyncio.run(timed_crawls(base_url, args.concurrency, args.skip_legacy))
+    finally:
+        server.shutdown()
+
+    baseline = rows[0][1]
+    print(f"\n{'mode':<30}{'seconds':>10}{'pages/s':>10}{'speedup':>10}{'errors':>8}{'http checks':>13}{'queue peak':>12}")
+    for label, elapsed, results, peak in rows:
+        pages = [r for r in results if r.get("tier", "render") == "render"]
+        errors = sum(1 for r in results if not isinstance(r["status"], int) or r["status"] >= 400)
+        print(f"{label:<30}{elapsed:>10.2f}{len(pages) / elapsed:>10.1f}{baseline / elapsed:>9.1f}x{errors:>8}"
+              f"{len(results) - len(pages):>13}{peak:>12}")
+    # ru_maxrss is KiB on Linux
+    print(f"\nPeak RSS of this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
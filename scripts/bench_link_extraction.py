@@ -0,0 +1,92 @@
+# scripts/bench_link_extraction.py
+"""
+Micro-benchmark: link extraction on a page with many anchors.
+
+Compares the old loop (`anchors.count()` then one `get_attribute("href")`
+round-trip per anchor, normalized in Python) with the single in-page
+evaluation the crawler uses, `mylibri.links.extract_link_tiers_async`.
+
+    python scripts/bench_link_extraction.py --anchors 500 --repeat 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from playwright.async_api import async_playwright
+
+from mylibri.links import extract_link_tiers_async, normalize_link
+
+BASE_URL = "https://mylibribooks.com"
+
+
+def build_page(anchors):
+    """Same-site links with duplicates, query strings and fragments, plus some external ones."""
+    links = []
+    for i in range(anchors):
+        if i % 10 == 0:
+            href = f"https://example.org/out/{i}"
+        elif i % 5 == 0:
+            href = f"/home/books/{i // 5}?ref=list#top"
+        else:
+            href = f"/home/books/{i % 200}"
+        links.append(f"<a href='{href}'>Link {i}</a>")
+    return f"<html><body>{''.join(links)}</body></html>"
+
+
+async def per_anchor(page, current_url):
+    anchors = page.locator("a")
+    links = []
+    for i in range(await anchors.count()):
+        link = normalize_link(await anchors.nth(i).get_attribute("href"), current_url, BASE_URL)
+        if link and link not in links:
+            links.append(link)
+    return links
+
+
+async def single_evaluate(page, current_url):
+    pages, _, _ = await extract_link_tiers_async(page, BASE_URL)
+    # Same reduction as the old loop, so the two lists can be compared
+    return list(dict.fromkeys(normalize_link(url, current_url, BASE_URL) for url in pages))
+
+
+async def timed(label, extract, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        links = await extract()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28}{elapsed * 1000:>10.1f} ms{len(links):>10} links")
+    return elapsed, links
+
+
+async def bench(anchors, repeat):
+    current_url = f"{BASE_URL}/home/discover"
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        # Serve the page from the site's origin so same-origin filtering applies as on the real site
+        await page.route(current_url, lambda route: route.fulfill(body=build_page(anchors), content_type="text/html"))
+        await page.goto(current_url)
+
+        print(f"📄 {anchors} anchors, mean of {repeat} runs\n")
+        slow, old_links = await timed("per-anchor get_attribute", lambda: per_anchor(page, current_url), repeat)
+        fast, new_links = await timed("single evaluate", lambda: single_evaluate(page, current_url), repeat)
+        await browser.close()
+
+    print(f"\n⚡ {slow / fast:.0f}x faster, same links: {sorted(old_links) == sorted(new_links)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--anchors", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(bench(args.anchors, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# scripts/bench_parquet.py
+"""
+Benchmark loading sweep history from the JSON reports vs the Parquet export.
+
+Writes `--runs` synthetic sweep snapshots of `--ids` book IDs each, one run
+per day, as pretty-printed JSON (the format the sweeps used to write).
+They are imported into a scratch results warehouse and exported to
+Parquet (see mylibri/columnar.py). Then three loads are timed: every JSON
+file in full, the `book_id`/`status` columns from Parquet, and the same
+columns for the last week of runs only. With `--report-dir` the existing
+report files are used instead of synthetic ones.
+
+    python scripts/bench_parquet.py --runs 60 --ids 5000
+    python scripts/bench_parquet.py --report-dir test_reports
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mylibri.columnar import export_parquet, load_results
+from mylibri.warehouse import ResultsWarehouse, backfill, find_report_files, read_report_rows
+
+FAILURES = ("timeout", "http_4xx", "missing_element")
+
+
+def write_synthetic_runs(report_dir, runs, ids, broken_pct, rng):
+    first_day = datetime(2025, 6, 1, 2, 0, 0)
+    for day in range(runs):
+        started = first_day + timedelta(days=day)
+        results = []
+        for book_id in range(1, ids + 1):
+            broken = rng.random() * 100 < broken_pct
+            results.append({
+                "id": book_id,
+                "url": f"https://mylibribooks.com/home/books/{book_id}",
+                "status": "Broken" if broken else "OK",
+                "title": "" if broken else f"Book {book_id}",
+                "error": "No title found" if broken else "",
+                "failure": rng.choice(FAILURES) if broken else "",
+                "attempts": 1,
+                "timestamp": started.isoformat(),
+            })
+        path = Path(report_dir) / f"book_id_sweep_{started.strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def timed(label, load):
+    start = time.perf_counter()
+    rows = load()
+    took = time.perf_counter() - start
+    print(f"{label:<40} {rows:>10} rows  {took:8.3f}s")
+    return took
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=60, help="synthetic sweep runs, one per day")
+    parser.add_argument("--ids", type=int, default=5000, help="book IDs per synthetic run")
+    parser.add_argument("--broken-pct", type=float, default=2.0, help="share of broken IDs per run")
+    parser.add_argument("--report-dir", help="benchmark these report files instead of synthetic ones")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch = Path(scratch)
+        report_dir = Path(args.report_dir) if args.report_dir else scratch / "reports"
+        if not args.report_dir:
+            report_dir.mkdir()
+            print(f"Writing {args.runs} runs x {args.ids} IDs of JSON...")
+            write_synthetic_runs(report_dir, args.runs, args.ids, args.broken_pct, random.Random(7))
+        start = time.perf_counter()
+        with ResultsWarehouse(scratch / "results.sqlite") as warehouse:
+            backfill(warehouse, report_dir)
+            exported = export_parquet(warehouse, root=scratch / "parquet")
+            # The same runs on both sides: unreadable reports are skipped by the import
+            json_files = [path for path in find_report_files(report_dir)
+                          if path.name.startswith("book_id_sweep") and warehouse.imported(path)]
+        json_mb = sum(path.stat().st_size for path in json_files) / 1e6
+        parquet_files = list((scratch / "parquet" / "result_type=sweep").rglob("*.parquet"))
+        parquet_mb = sum(path.stat().st_size for path in parquet_files) / 1e6
+        print(f"Imported and exported {sum(exported.values())} rows in {time.perf_counter() - start:.2f}s")
+        print(f"JSON: {len(json_files)} files, {json_mb:.1f} MB; "
+              f"Parquet: {len(parquet_files)} files, {parquet_mb:.1f} MB\n")
+
+        last_week = None
+        if parquet_files:
+            dates = sorted(path.parent.name.split("=", 1)[1] for path in parquet_files)
+            last_week = (datetime.fromisoformat(dates[-1]) - timedelta(days=6)).date().isoformat()
+
+        json_s = timed("JSON, every file in full", lambda: sum(len(read_report_rows(path)) for path in json_files))
+        parquet_s = timed("Parquet, book_id + status", lambda: load_results(
+            "sweep", columns=["book_id", "status"], root=scratch / "parquet").num_rows)
+        timed(f"Parquet, same columns since {last_week}", lambda: load_results(
+            "sweep", columns=["book_id", "status"], since=last_week, root=scratch / "parquet").num_rows)
+        # Parquet has a fixed cost per query, so on a handful of small files JSON can still win
+        print(f"\nParquet column load: {json_s / parquet_s:.1f}x the speed of parsing the JSON files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/bench_profiles.py
+"""
+Bytes transferred and page-load time with and without the "lean" profile.
+
+Loads each URL in a fresh context per profile (so nothing comes from the
+cache), sums request and response sizes of every finished request and
+times `goto(..., wait_until="load")`. Pass a saved login to measure pages
+behind the sign-in.
+
+    python scripts/bench_profiles.py --storage-state .auth/storage_state.json --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mylibri.config import URL
+from mylibri.profiles import apply_profile_async
+
+DEFAULT_URLS = [URL, f"{URL}/home/discover", f"{URL}/home/genre", f"{URL}/home/books/1"]
+PROFILES = ("default", "lean")
+
+
+async def measure(browser, url, profile, storage_state):
+    context = await browser.new_context(storage_state=storage_state)
+    stats = await apply_profile_async(context, profile)
+    finished = []
+    context.on("requestfinished", finished.append)
+    page = await context.new_page()
+    try:
+        start = time.perf_counter()
+        await page.goto(url, wait_until="load", timeout=60000)
+        load_ms = (time.perf_counter() - start) * 1000
+        sizes = await asyncio.gather(*(request.sizes() for request in finished), return_exceptions=True)
+        transferred = sum(
+            s["requestHeadersSize"] + s["requestBodySize"] + s["responseHeadersSize"] + s["responseBodySize"]
+            for s in sizes if isinstance(s, dict)
+        )
+        return {"requests": len(finished), "blocked": stats["blocked"], "bytes": transferred, "load_ms": load_ms}
+    finally:
+        await context.close()
+
+
+async def run(urls, repeat, storage_state, headless):
+    from playwright.async_api import async_playwright
+
+    rows = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            for url in urls:
+                for profile in PROFILES:
+                    runs = [await measure(browser, url, profile, storage_state) for _ in range(repeat)]
+                    rows.append((url, profile, {key: sum(r[key] for r in runs) / repeat for key in runs[0]}))
+        finally:
+            await browser.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--storage-state", help="saved login (see mylibri/auth.py)")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.urls, args.repeat, args.storage_state, not args.headed))
+
+    print(f"\n{'url':<45}{'profile':>9}{'requests':>10}{'blocked':>9}{'KiB':>10}{'load ms':>10}")
+    totals = {profile: {"bytes": 0.0, "load_ms": 0.0} for profile in PROFILES}
+    for url, profile, m in rows:
+        totals[profile]["bytes"] += m["bytes"]
+        totals[profile]["load_ms"] += m["load_ms"]
+        print(f"{url[-45:]:<45}{profile:>9}{m['requests']:>10.0f}{m['blocked']:>9.0f}"
+              f"{m['bytes'] / 1024:>10.0f}{m['load_ms']:>10.0f}")
+
+    full, lean = totals["default"], totals["lean"]
+    if full["bytes"] and full["load_ms"]:
+        print(f"\n📉 lean transfers {100 * (1 - lean['bytes'] / full['bytes']):.0f}% fewer bytes and loads "
+              f"{100 * (1 - lean['load_ms'] / full['load_ms']):.0f}% faster (mean of {args.repeat} runs per page)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# scripts/bench_sweep.py
+"""
+Benchmark the concurrent sweep engine against a local stub server.
+
+Compares the old one-page loop (goto + fixed 500 ms wait per ID) with the
+shared engine at several concurrency levels, rendering every page and
+with the HTTP-first probe.
+
+    python scripts/bench_sweep.py --ids 300 --latency 0.05 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mylibri.auth import login_async
+from mylibri.stub_server import start_stub_server
+from mylibri.sweep import TITLE_SELECTOR, check_book_page, run_sweep
+
+
+async def legacy_check(page, book_id, book_url_base):
+    """The per-ID steps of the old part1/part2 sweep files."""
+    book_url = f"{book_url_base}/{book_id}"
+    try:
+        await page.goto(book_url, timeout=8000)
+        await page.wait_for_timeout(500)
+        await page.locator(TITLE_SELECTOR).first.text_content(timeout=2000)
+        return {"id": book_id, "url": book_url, "status": "OK"}
+    except Exception as e:
+        return {"id": book_id, "url": book_url, "status": "Broken", "error": str(e)}
+
+
+def timed_sweep(base_url, ids, check, concurrency, probe="page"):
+    book_url_base = f"{base_url}/home/books"
+    start = time.perf_counter()
+    results = asyncio.run(run_sweep(
+        ids,
+        check=partial(check, book_url_base=book_url_base),
+        concurrency=concurrency,
+        login=partial(login_async, base_url=base_url),
+        probe=probe,
+        book_url_base=book_url_base,
+    ))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=300, help="number of book IDs to sweep")
+    parser.add_argument("--broken-every", type=int, default=10, help="every Nth ID serves no title")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub server delay per request (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the slow fixed-sleep baseline")
+    args = parser.parse_args()
+
+    ids = range(1, args.ids + 1)
+    live_ids = {i for i in ids if i % args.broken_every}
+    server, base_url = start_stub_server(live_ids, latency=args.latency)
+    print(f"📦 Stub server at {base_url} ({len(live_ids)}/{args.ids} live IDs, {args.latency}s latency)")
+
+    try:
+        rows = []
+        if not args.skip_legacy:
+            elapsed, results = timed_sweep(base_url, ids, legacy_check, 1)
+            rows.append(("legacy (1 page, 500 ms sleep)", elapsed, results))
+        for n in args.concurrency:
+            elapsed, results = timed_sweep(base_url, ids, check_book_page, n)
+            rows.append((f"engine ({n} page{'s' if n > 1 else ''})", elapsed, results))
+        for n in args.concurrency:
+            elapsed, results = timed_sweep(base_url, ids, check_book_page, n, probe="http")
+            rows.append((f"engine http-first ({n})", elapsed, results))
+    finally:
+        server.shutdown()
+
+    baseline = rows[0][1]
+    print(f"\n{'mode':<32}{'seconds':>10}{'ids/s':>10}{'speedup':>10}{'broken':>8}")
+    for label, elapsed, results in rows:
+        broken = sum(1 for r in results if r["status"] != "OK")
+        print(f"{label:<32}{elapsed:>10.2f}{len(results) / elapsed:>10.1f}{baseline / elapsed:>9.1f}x{broken:>8}")
+
+
+if __name__ == "__main__":
+    main()
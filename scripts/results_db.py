@@ -0,0 +1,69 @@
+# scripts/results_db.py
+"""
+Backfill the results warehouse from earlier report files, and query it.
+
+Imports every book_id_sweep_*, book_metadata_*, genre_book_counts_*,
+discover_* and full_broken_links_* file in the report directories that is
+not in the database yet, then answers the questions given on the
+command line (see mylibri/warehouse.py).
+
+    python scripts/results_db.py --backfill test_reports tests/slow/test_reports --last-broken 1234 --history 1234
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mylibri.config import RESULTS_DB
+from mylibri.warehouse import ResultsWarehouse, backfill
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=RESULTS_DB, help=f"database file (default: {RESULTS_DB})")
+    parser.add_argument("--backfill", nargs="*", default=[], metavar="DIR", help="report directories to import")
+    parser.add_argument("--last-broken", type=int, nargs="*", default=[], metavar="ID",
+                        help="when each book ID was last found broken")
+    parser.add_argument("--history", type=int, nargs="*", default=[], metavar="ID", help="every check of a book ID")
+    parser.add_argument("--url", nargs="*", default=[], help="every check of a URL")
+    parser.add_argument("--runs", nargs="?", const="", metavar="KIND", help="latest runs, optionally of one kind")
+    args = parser.parse_args()
+
+    with ResultsWarehouse(args.db) as warehouse:
+        for report_dir in args.backfill:
+            start = time.perf_counter()
+            imported = backfill(warehouse, report_dir)
+            counts = ", ".join(f"{kind} {rows}" for kind, rows in imported.items()) or "nothing new"
+            print(f"📥 {report_dir}: {counts} ({time.perf_counter() - start:.2f}s)")
+
+        for book_id in args.last_broken:
+            start = time.perf_counter()
+            found = warehouse.last_broken(book_id)
+            took = (time.perf_counter() - start) * 1000
+            if found:
+                print(f"❌ Book {book_id} last broke at {found['checked_at']} "
+                      f"({found['status']}, {found['failure'] or found['error'] or 'no detail'}) [{took:.1f} ms]")
+            else:
+                print(f"✅ Book {book_id} was never found broken [{took:.1f} ms]")
+
+        for book_id in args.history:
+            print(f"📖 Book {book_id}:")
+            for check in warehouse.book_history(book_id):
+                print(f"   {check['checked_at']}  {check['status']:<7} {check['title'] or ''}")
+
+        for url in args.url:
+            print(f"🔗 {url}:")
+            for check in warehouse.url_history(url):
+                print(f"   {check['checked_at']}  {check['status']}")
+
+        if args.runs is not None:
+            for run in warehouse.runs(args.runs or None):
+                print(f"🗂️ #{run['id']} {run['started_at']} {run['kind']}/{run['name']}: {run['rows']} rows"
+                      + ("" if run["finished_at"] else " (incomplete)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,18 @@ from pathlib import Path
 from datetime import datetime
 import os
 import re
+import json
 import logging
+import sqlite3
+
+from mylibri.auth import (
+    STORAGE_STATE_PATH, MissingCredentials, is_signed_out, login, require_credentials, storage_state_is_fresh,
+)
+from mylibri.browser_pool import BrowserPool
+from mylibri.config import BROWSER_POOL_SIZE, URL
+from mylibri.ratelimit import LIMITER
+from mylibri.readiness import LEDGER, wait_for_network_quiet, wait_for_selector
+from mylibri.warehouse import ResultsWarehouse
 
 # Set up logging for the fixture file
 logging.basicConfig(level=logging.INFO, # Keep INFO for debugging fixtures
@@ -25,12 +36,16 @@ def mobile_login_setup(page: Page):
     Fixture to handle mobile emulation, direct navigation to sign-in page,
     login, and verification of successful login to 'My Library' page.
     """
+    try:
+        require_credentials(VALID_USERNAME, VALID_PASSWORD)
+    except MissingCredentials as e:
+        pytest.skip(str(e))
     logger.info(f"[Fixture] Navigating directly to sign-in page: {SIGNIN_URL}")
     page.goto(SIGNIN_URL)
     # Use 'domcontentloaded' again, as the form seems to render quickly based on the screenshot
     # We will let Playwright's auto-waiting handle most waits for actionability.
     page.wait_for_load_state("domcontentloaded") 
-    page.wait_for_timeout(2000) # Small pause after navigation, adjust if needed
+    wait_for_selector(page, "div.lib-login-wrapper", replaces_ms=2000)
 
     logger.info("[Fixture] On sign-in page. Proceeding with credentials.")
 
@@ -72,8 +87,7 @@ def mobile_login_setup(page: Page):
         logger.info("Login button clicked.")
 
         # Wait for post-login state
-        page.wait_for_load_state("networkidle") 
-        page.wait_for_timeout(5000) # Final buffer for page render
+        wait_for_network_quiet(page, replaces_ms=5000)
 
         # Assert successful login (e.g., check URL or presence of a post-login element)
         expect(page).to_have_url(re.compile(r".*/library"), timeout=20000) # Keep higher timeout for navigation
@@ -91,4 +105,170 @@ def mobile_login_setup(page: Page):
         logger.info(f"[Fixture] Page HTML saved: {html_path}")
         pytest.fail(f"Login setup failed: {e}")
 
-    yield page
\ No newline at end of file
+    yield page
+
+# --- Browser pool (see mylibri/browser_pool.py) ---
+@pytest.fixture(scope="session")
+def browser_pool(playwright, browser_type, browser_type_launch_args):
+    """Browsers shared by every test in this process (one pool per xdist worker)."""
+    pool = BrowserPool(
+        browser_type,
+        size=BROWSER_POOL_SIZE,
+        devices=playwright.devices,
+        **browser_type_launch_args,
+    )
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def browser(browser_pool):
+    """Overrides pytest-playwright's `browser` so its `context`/`page` fixtures use the pool too."""
+    return browser_pool.browser(slot=0)
+
+
+@pytest.fixture(scope="function")
+def context_factory(browser_pool):
+    """
+    Call with context options (and optionally `device="iPhone 13"`) to get a
+    new pooled context; every context made during the test is closed after it.
+    """
+    contexts = []
+
+    def new_context(**options):
+        context = browser_pool.new_context(**options)
+        contexts.append(context)
+        return context
+
+    yield new_context
+    for context in contexts:
+        try:
+            context.close()
+        except Exception as e:
+            logger.warning(f"[Fixture] Could not close context: {e}")
+
+
+# --- Shared login (see mylibri/auth.py) ---
+def _save_login_state(browser_pool, path):
+    context = browser_pool.new_context()
+    try:
+        page = context.new_page()
+        login(page)
+        # Write then rename, so parallel workers never read a half-written file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(context.storage_state()), encoding="utf-8")
+        tmp_path.replace(path)
+    finally:
+        context.close()
+
+
+def _saved_state_works(browser_pool, path):
+    context = browser_pool.new_context(storage_state=str(path))
+    try:
+        page = context.new_page()
+        page.goto(f"{URL}/home/profile")
+        page.wait_for_load_state("domcontentloaded")
+        return not is_signed_out(page)
+    finally:
+        context.close()
+
+
+@pytest.fixture(scope="session")
+def account_credentials():
+    """The test account's `(email, password)`, for tests that log in through the UI on their own."""
+    try:
+        return require_credentials()
+    except MissingCredentials as e:
+        pytest.skip(str(e))
+
+
+@pytest.fixture(scope="session")
+def auth_storage_state(browser_pool):
+    """
+    Path to a Playwright storage_state file for a signed-in session.
+
+    The UI login runs at most once per session: a state saved by an earlier
+    run is re-used while it is fresh and the site still accepts it.
+    """
+    path = STORAGE_STATE_PATH
+    if storage_state_is_fresh(path) and _saved_state_works(browser_pool, path):
+        logger.info(f"[Fixture] Re-using saved login state: {path}")
+    else:
+        try:
+            require_credentials()
+        except MissingCredentials as e:
+            pytest.skip(str(e))
+        logger.info("[Fixture] Logging in once for the session...")
+        _save_login_state(browser_pool, path)
+        logger.info(f"[Fixture] Login state saved: {path}")
+    return path
+
+
+@pytest.fixture(scope="function")
+def logged_in_context(request, context_factory, auth_storage_state):
+    """
+    A fresh pooled context that starts signed in. Tests marked
+    `@pytest.mark.lean` get it in the "lean" profile (see mylibri/profiles.py).
+    """
+    profile = "lean" if request.node.get_closest_marker("lean") else None
+    return context_factory(storage_state=str(auth_storage_state), profile=profile)
+
+
+@pytest.fixture(scope="function")
+def logged_in_page(logged_in_context):
+    """A page in `logged_in_context`, ready to navigate anywhere behind the login."""
+    return logged_in_context.new_page()
+
+
+# --- Readiness accounting (see mylibri/readiness.py) ---
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    LEDGER.current_test = item.nodeid
+
+
+# --- Test timings in the results warehouse (see mylibri/warehouse.py) ---
+SESSION_STARTED = datetime.now()
+TIMINGS = []
+
+
+def pytest_runtest_logreport(report):
+    # One timing per test: its call, or the setup that kept it from running
+    if report.when == "call" or (report.when == "setup" and not report.passed):
+        TIMINGS.append({"test": report.nodeid, "outcome": report.outcome, "duration_s": report.duration})
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        # Under xdist the controller sees every worker's reports, so only it writes the timings;
+        # the readiness and rate-limit counters live in this worker, so send them over
+        workeroutput["readiness"] = LEDGER.totals
+        workeroutput["ratelimit"] = LIMITER.counters()
+        return
+    if not TIMINGS:
+        return
+    try:
+        with ResultsWarehouse() as warehouse, warehouse.run("timings", "pytest", started_at=SESSION_STARTED) as run:
+            run.add_all(TIMINGS)
+    except sqlite3.Error as e:
+        logger.warning(f"[warehouse] Could not record test timings: {e}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # An xdist worker finished: fold its counters into the controller's for the summary
+    output = getattr(node, "workeroutput", {})
+    LEDGER.merge(output.get("readiness", {}))
+    LIMITER.merge(output.get("ratelimit", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    lines = LEDGER.summary_lines()
+    if lines:
+        terminalreporter.section("readiness waits vs fixed sleeps")
+        for line in lines:
+            terminalreporter.write_line(line)
+    if LIMITER.requests:
+        terminalreporter.section("rate limiting")
+        terminalreporter.write_line(LIMITER.summary())
@@ -0,0 +1,51 @@
+# tests/fast/test_auth_state.py
+
+import json
+import os
+
+import pytest
+
+from mylibri import auth
+from mylibri.auth import MissingCredentials, require_credentials, storage_state_is_fresh
+
+
+def write_state(path, cookies, age_min, now):
+    path.write_text(json.dumps({"cookies": cookies, "origins": []}), encoding="utf-8")
+    mtime = now - age_min * 60
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.fast
+def test_fresh_state_is_reused(tmp_path):
+    now = 1_700_000_000
+    path = tmp_path / "state.json"
+    write_state(path, [{"name": "sid", "expires": -1}, {"name": "token", "expires": now + 3600}], 5, now)
+    assert storage_state_is_fresh(path, max_age_min=60, now=now)
+
+
+@pytest.mark.fast
+def test_old_or_expired_or_missing_state_forces_login(tmp_path):
+    now = 1_700_000_000
+    path = tmp_path / "state.json"
+    assert not storage_state_is_fresh(path, now=now)
+
+    write_state(path, [], 90, now)
+    assert not storage_state_is_fresh(path, max_age_min=60, now=now)
+
+    write_state(path, [{"name": "token", "expires": now - 1}], 5, now)
+    assert not storage_state_is_fresh(path, max_age_min=60, now=now)
+
+    path.write_text('{"cookies": [', encoding="utf-8")
+    assert not storage_state_is_fresh(path, max_age_min=60, now=now)
+
+
+@pytest.mark.fast
+def test_login_needs_credentials_from_the_environment(monkeypatch):
+    monkeypatch.setattr(auth, "EMAIL", None)
+    monkeypatch.setattr(auth, "PASSWORD", None)
+    with pytest.raises(MissingCredentials, match="VALID_USERNAME and VALID_PASSWORD"):
+        require_credentials()
+    assert require_credentials("a@site.test", "pw") == ("a@site.test", "pw")
+    monkeypatch.setattr(auth, "EMAIL", "env@site.test")
+    monkeypatch.setattr(auth, "PASSWORD", "env-pw")
+    assert require_credentials() == ("env@site.test", "env-pw")
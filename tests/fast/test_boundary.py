@@ -0,0 +1,41 @@
+# tests/fast/test_boundary.py
+
+import asyncio
+import pytest
+
+from mylibri.boundary import discover_upper_bound
+
+
+def catalogue(live_ids):
+    async def probe(book_id):
+        return book_id in live_ids
+    return probe
+
+
+@pytest.mark.fast
+def test_finds_end_of_contiguous_catalogue():
+    estimate = asyncio.run(discover_upper_bound(catalogue(set(range(1, 2832)))))
+    assert (estimate.start_id, estimate.end_id) == (1, 2831)
+    # A linear walk would cost ~2,861 page loads
+    assert estimate.probes < 120
+
+
+@pytest.mark.fast
+def test_sees_books_beyond_a_long_gap():
+    live = set(range(1, 1001)) | set(range(1041, 1500))
+    estimate = asyncio.run(discover_upper_bound(catalogue(live), gap=60))
+    assert estimate.end_id == 1499
+
+
+@pytest.mark.fast
+def test_start_in_a_small_hole():
+    live = set(range(5, 300))
+    estimate = asyncio.run(discover_upper_bound(catalogue(live)))
+    assert estimate.end_id == 299
+
+
+@pytest.mark.fast
+def test_nothing_live():
+    estimate = asyncio.run(discover_upper_bound(catalogue(set())))
+    assert estimate.end_id == 0
+    assert list(estimate.ids()) == []
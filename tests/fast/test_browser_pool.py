@@ -0,0 +1,72 @@
+# tests/fast/test_browser_pool.py
+
+import pytest
+
+from mylibri.browser_pool import DEFAULT_MOBILE_DEVICE, BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **options):
+        self.contexts.append(options)
+        return options
+
+    def close(self):
+        self.connected = False
+
+
+class FakeBrowserType:
+    name = "chromium"
+
+    def __init__(self):
+        self.launched = []
+
+    def launch(self, **options):
+        browser = FakeBrowser(len(self.launched))
+        browser.options = options
+        self.launched.append(browser)
+        return browser
+
+
+@pytest.mark.fast
+def test_pool_launches_lazily_and_round_robins_contexts():
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, size=2, headless=True)
+    assert browser_type.launched == []
+
+    for _ in range(5):
+        pool.new_context()
+    assert len(browser_type.launched) == 2
+    assert [len(b.contexts) for b in browser_type.launched] == [3, 2]
+    assert browser_type.launched[0].options == {"headless": True}
+
+    pool.close()
+    assert not any(b.connected for b in browser_type.launched)
+
+
+@pytest.mark.fast
+def test_pool_relaunches_a_disconnected_browser():
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, size=1)
+    first = pool.browser()
+    first.connected = False
+    assert pool.browser() is not first
+    assert pool.launches == 2
+
+
+@pytest.mark.fast
+def test_pool_applies_device_emulation_before_overrides():
+    devices = {"iPhone 13": {"viewport": {"width": 390, "height": 844}, "is_mobile": True}}
+    pool = BrowserPool(FakeBrowserType(), devices=devices)
+
+    options = pool.new_context(device="iPhone 13", locale="en-GB")
+    assert options == {"viewport": {"width": 390, "height": 844}, "is_mobile": True, "locale": "en-GB"}
+
+    assert pool.new_context(device="Unknown Phone") == DEFAULT_MOBILE_DEVICE
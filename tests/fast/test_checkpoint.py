@@ -0,0 +1,50 @@
+# tests/fast/test_checkpoint.py
+
+import pytest
+
+from mylibri.checkpoint import SweepCheckpoint
+
+
+@pytest.mark.fast
+def test_checkpoint_round_trip_and_resume(tmp_path):
+    path = tmp_path / "sweep_1_10.jsonl"
+    with SweepCheckpoint(path) as checkpoint:
+        checkpoint.append({"id": 2, "status": "OK"})
+        checkpoint.append({"id": 1, "status": "Broken"})
+        checkpoint.append({"id": 3, "status": "Error"})
+
+    resumed = SweepCheckpoint(path)
+    # An ID whose check errored is checked again
+    assert resumed.completed_ids() == {1, 2}
+    with resumed:
+        resumed.append({"id": 1, "status": "OK"})
+    assert [(r["id"], r["status"]) for r in resumed.results()] == [(1, "OK"), (2, "OK"), (3, "Error")]
+    assert all("timestamp" in r for r in resumed.results())
+
+
+@pytest.mark.fast
+def test_checkpoint_ignores_torn_last_line(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.write_text('{"id": 1, "status": "OK"}\n{"id": 2, "sta', encoding="utf-8")
+    checkpoint = SweepCheckpoint(path)
+    assert checkpoint.completed_ids() == {1}
+    with checkpoint:
+        checkpoint.append({"id": 2, "status": "OK"})
+    assert checkpoint.completed_ids() == {1, 2}
+
+
+@pytest.mark.fast
+def test_checkpoint_archive_starts_fresh(tmp_path):
+    checkpoint = SweepCheckpoint.for_sweep("book_id_sweep", 1, 10, directory=tmp_path)
+    checkpoint.append({"id": 1, "status": "OK"})
+    archived = checkpoint.archive("20250101_000000")
+    assert archived.name == "book_id_sweep_1_10_20250101_000000.jsonl"
+    assert checkpoint.completed_ids() == set()
+
+
+@pytest.mark.fast
+def test_archiving_an_unwritten_checkpoint_is_a_no_op(tmp_path):
+    # Nothing to check this run (empty incremental selection or shard, or already complete)
+    checkpoint = SweepCheckpoint.for_sweep("book_id_sweep", 5, 4, directory=tmp_path)
+    assert checkpoint.archive("20250101_000000") is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+# tests/fast/test_columnar.py
+
+import pytest
+from datetime import datetime
+
+from mylibri.columnar import partition_path, result_type
+from mylibri.warehouse import ResultsWarehouse
+
+
+def sweep(warehouse, name, day, statuses, kind="book"):
+    with warehouse.run(kind, name, started_at=datetime(2025, 9, day, 2, 0, 0)) as run:
+        for book_id, status in enumerate(statuses, start=1):
+            if kind == "crawl":
+                run.add({"phase": "before_login", "tier": "render", "url": f"https://x/{book_id}", "status": status})
+            else:
+                run.add({"id": book_id, "url": f"u{book_id}", "status": status, "title": "T", "author": "A"})
+    return run
+
+
+@pytest.mark.fast
+def test_runs_map_to_result_type_partitions(tmp_path):
+    run = {"id": 4, "kind": "book", "name": "metadata", "started_at": "2025-09-03T02:00:00"}
+    assert result_type(run) == "metadata"
+    assert result_type({**run, "name": "broken"}) == "sweep"
+    assert result_type({**run, "kind": "crawl"}) == "crawl"
+    assert result_type({**run, "kind": "timings"}) is None
+    assert partition_path(tmp_path, "metadata", run) == (
+        tmp_path / "result_type=metadata" / "run_date=2025-09-03" / "run-4.parquet"
+    )
+
+
+@pytest.mark.fast
+def test_export_once_and_load_only_what_is_asked(tmp_path):
+    pytest.importorskip("pyarrow")
+    from mylibri.columnar import export_parquet, load_results, status_trend
+
+    root = tmp_path / "parquet"
+    with ResultsWarehouse(tmp_path / "results.sqlite") as warehouse:
+        sweep(warehouse, "broken", 1, ["OK", "Broken", "OK"])
+        sweep(warehouse, "broken", 2, ["OK", "OK", "OK"])
+        sweep(warehouse, "metadata", 2, ["OK"])
+        sweep(warehouse, "full_broken_links", 2, ["200", "404"], kind="crawl")
+        assert export_parquet(warehouse, root) == {"sweep": 6, "metadata": 1, "crawl": 2}
+        assert export_parquet(warehouse, root) == {}
+
+    table = load_results("sweep", columns=["book_id", "status"], since="2025-09-02", root=root)
+    assert table.column_names == ["book_id", "status"]
+    assert table.to_pylist() == [{"book_id": 1, "status": "OK"}, {"book_id": 2, "status": "OK"},
+                                 {"book_id": 3, "status": "OK"}]
+    assert load_results("metadata", columns=["author"], root=root).to_pylist() == [{"author": "A"}]
+    assert status_trend(root=root) == [
+        {"run_date": "2025-09-01", "status": "Broken", "count": 1},
+        {"run_date": "2025-09-01", "status": "OK", "count": 2},
+        {"run_date": "2025-09-02", "status": "OK", "count": 3},
+    ]
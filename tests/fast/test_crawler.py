@@ -0,0 +1,267 @@
+# tests/fast/test_crawler.py
+
+import asyncio
+import pytest
+
+from mylibri.crawl_store import CrawlStore
+from mylibri.crawler import Frontier, check_status, crawl
+from mylibri.links import split_link_tiers
+from mylibri.ratelimit import LIMITER, TokenBucket
+
+BASE = "https://site.test"
+
+# A small site: page -> hrefs on it. "/missing" answers 404, "/boom" fails to load.
+SITE = {
+    "/": ["/a", "/b?x=1#top", "https://elsewhere.test/c", "/cover.png", "", None],
+    "/a": ["/", "b", "/missing", "/guide.pdf"],
+    "/b": ["/a", "/boom", "mailto:someone@site.test", "/cover.png"],
+    "/missing": [],
+}
+# Main content text of a page; pages not listed get text of their own
+CONTENT = {}
+# Status of links checked over HTTP. The external site refuses HEAD.
+HTTP_STATUS = {"https://elsewhere.test/c": 200, f"{BASE}/cover.png": 200, f"{BASE}/guide.pdf": 404}
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    # The fake site answers instantly; don't pace it like the real one
+    monkeypatch.setattr(LIMITER, "default", TokenBucket(0, 1))
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.path = None
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.context.active += 1
+        self.context.peak_active = max(self.context.peak_active, self.context.active)
+        try:
+            await asyncio.sleep(0.001)
+            self.path = url[len(BASE):] or "/"
+            if self.path == "/boom":
+                raise RuntimeError("net::ERR_CONNECTION_RESET")
+            return FakeResponse(404 if self.path not in SITE or self.path == "/missing" else 200)
+        finally:
+            self.context.active -= 1
+
+    async def evaluate(self, script, args):
+        # What EXTRACT_LINK_TIERS_JS returns, with the content text standing in for its hash
+        base_url = args[0]
+        pages, resources = split_link_tiers(SITE.get(self.path, []), BASE + self.path, base_url)
+        text = CONTENT.get(self.path, f"Page {self.path} " * 30)
+        return {"pages": pages, "resources": resources, "contentHash": text, "contentLength": len(text)}
+
+    async def close(self):
+        pass
+
+
+class FakeAPIResponse(FakeResponse):
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    def __init__(self):
+        self.calls = []
+
+    async def head(self, url, timeout=None):
+        self.calls.append(("HEAD", url))
+        return FakeAPIResponse(405 if url.startswith("https://elsewhere.test") else HTTP_STATUS[url])
+
+    async def get(self, url, timeout=None):
+        self.calls.append(("GET", url))
+        return FakeAPIResponse(HTTP_STATUS[url])
+
+
+class FakeContext:
+    def __init__(self):
+        self.active = 0
+        self.peak_active = 0
+        self.request = FakeRequest()
+
+    async def new_page(self):
+        return FakePage(self)
+
+
+@pytest.mark.fast
+def test_crawl_visits_each_page_once_with_phase_records():
+    frontier = Frontier()
+    results = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "before_login", concurrency=3, frontier=frontier))
+    statuses = {r["url"][len(BASE):]: r["status"] for r in results if r["tier"] == "render"}
+    assert set(statuses) == {"/", "/a", "/b", "/missing", "/boom"}
+    assert statuses["/missing"] == 404
+    assert statuses["/boom"].startswith("Error:")
+    assert all(r["phase"] == "before_login" for r in results)
+    assert frontier.dedup_hits > 0
+
+
+@pytest.mark.fast
+def test_crawl_shares_visited_across_phases_and_caps_hosts():
+    visited = set()
+    context = FakeContext()
+    asyncio.run(crawl(context, [f"{BASE}/"], "before_login", visited=visited, concurrency=4, per_host=1))
+    assert context.peak_active == 1
+    again = asyncio.run(crawl(context, [f"{BASE}/"], "after_logout", visited=visited))
+    assert again == []
+
+
+@pytest.mark.fast
+def test_crawl_respects_max_pages():
+    results = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "p", max_pages=2))
+    assert len([r for r in results if r["tier"] == "render"]) == 2
+
+
+@pytest.mark.fast
+def test_crawl_checks_assets_and_external_links_over_http():
+    context = FakeContext()
+    results = asyncio.run(crawl(context, [f"{BASE}/"], "after_login", concurrency=2, http_concurrency=2))
+    checked = {r["url"]: r["status"] for r in results if r["tier"] == "http"}
+    assert checked == HTTP_STATUS
+    # Each link is checked once, however many pages link to it
+    assert context.request.calls.count(("HEAD", f"{BASE}/cover.png")) == 1
+    assert ("GET", "https://elsewhere.test/c") in context.request.calls
+
+
+@pytest.mark.fast
+def test_check_status_reports_request_errors():
+    class FailingRequest:
+        async def head(self, url, timeout=None):
+            raise TimeoutError("HEAD timed out")
+
+        async def get(self, url, timeout=None):
+            raise TimeoutError("GET timed out")
+
+    status = asyncio.run(check_status(FailingRequest(), f"{BASE}/cover.png"))
+    assert status == "Error: GET timed out"
+
+
+async def crawl_until(context, store, stop_after):
+    """Crawl with a store and cancel the crawl after `stop_after` records, like a killed run."""
+    records = []
+    task = asyncio.create_task(crawl(context, [f"{BASE}/"], "before_login", visited=store.visited_urls(),
+                                     concurrency=1, http_concurrency=1, store=store, on_result=records.append))
+    while len(records) < stop_after:
+        await asyncio.sleep(0.001)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return records
+
+
+@pytest.mark.fast
+def test_stored_crawl_resumes_pending_urls(tmp_path):
+    path = tmp_path / "frontier.sqlite"
+    with CrawlStore(path) as store:
+        store.begin()
+        first = asyncio.run(crawl_until(FakeContext(), store, stop_after=3))
+
+    with CrawlStore(path) as store:
+        store.begin()
+        assert store.resumed
+        second = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "before_login", visited=store.visited_urls(),
+                                   store=store))
+        urls = [r["url"] for r in store.run_results()]
+        store.finish()
+
+    assert len(urls) == len(set(urls)) == 5 + len(HTTP_STATUS)
+    assert {r["url"] for r in first}.isdisjoint(r["url"] for r in second)
+
+
+@pytest.mark.fast
+def test_stored_crawl_skips_fresh_urls_but_rechecks_broken_ones(tmp_path):
+    path = tmp_path / "frontier.sqlite"
+    for _ in range(2):
+        with CrawlStore(path) as store:
+            store.begin()
+            frontier = Frontier(store.visited_urls(), store=store, phase="before_login", max_age_hours=1)
+            results = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "before_login", frontier=frontier, store=store))
+            store.finish()
+
+    # Second run: only the broken URLs are checked again, found through the stored links of fresh pages
+    assert {r["url"][len(BASE):] for r in results} == {"/missing", "/boom", "/guide.pdf"}
+    assert frontier.fresh_skips == 5
+    counters = frontier.counters()
+    assert counters["rendered"] == 2 and counters["checked"] == 1 and counters["frontier_size"] == 0
+
+
+@pytest.mark.fast
+def test_crawl_renders_url_variants_once_and_skips_duplicate_content(monkeypatch):
+    # Two shell routes render the same text; only the first one's links are followed
+    monkeypatch.setitem(SITE, "/", ["/a/", "/a?utm_source=mail", "/a?page=2", "/shell-1", "/shell-2"])
+    monkeypatch.setitem(SITE, "/shell-1", ["/only-1"])
+    monkeypatch.setitem(SITE, "/shell-2", ["/only-2"])
+    monkeypatch.setitem(SITE, "/only-1", [])
+    monkeypatch.setitem(CONTENT, "/shell-1", "Loading your library " * 20)
+    monkeypatch.setitem(CONTENT, "/shell-2", "Loading your library " * 20)
+    # Short content (an empty shell that has not rendered yet) is never compared
+    monkeypatch.setitem(CONTENT, "/a", "")
+
+    rules = {"keep_params": ("page",), "drop_params": ("utm_*",), "trailing_slash": "strip", "lowercase_path": False}
+    frontier = Frontier()
+    results = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "p", frontier=frontier, rules=rules))
+    rendered = [r["url"][len(BASE):] for r in results if r["tier"] == "render"]
+
+    assert rendered.count("/a") == 1 and "/a?page=2" in rendered
+    assert "/only-1" in rendered and "/only-2" not in rendered
+    assert frontier.content_duplicates == 1
+    # "/a/" is rendered as "/a"; "/a?utm_source=mail" is the render saved
+    assert frontier.canonical_merges == 1
+
+
+@pytest.mark.fast
+def test_crawl_stops_rendering_beyond_max_depth():
+    frontier = Frontier(max_depth=1)
+    results = asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "p", frontier=frontier))
+    rendered = {r["url"][len(BASE):] for r in results if r["tier"] == "render"}
+    # "/missing" and "/boom" are two links away from the seed
+    assert rendered == {"/", "/a", "/b"}
+    assert frontier.depth_skips > 0
+    # Links on depth-1 pages are still checked over HTTP
+    assert f"{BASE}/guide.pdf" in {r["url"] for r in results if r["tier"] == "http"}
+
+
+@pytest.mark.fast
+def test_crawl_survives_failing_callbacks_and_stops_when_workers_die():
+    calls = []
+
+    def on_result(record):
+        calls.append(record["url"])
+        raise ValueError("report disk full")
+
+    # Every callback fails, yet every URL is still checked and the crawl finishes
+    results = asyncio.run(asyncio.wait_for(
+        crawl(FakeContext(), [f"{BASE}/"], "p", concurrency=2, on_result=on_result), timeout=5))
+    assert len(calls) == len(results) > 5
+
+    class NoPages(FakeContext):
+        async def new_page(self):
+            raise RuntimeError("browser closed")
+
+    # Without a page no render worker can run; the crawl fails instead of waiting forever
+    with pytest.raises(RuntimeError, match="browser closed"):
+        asyncio.run(asyncio.wait_for(crawl(NoPages(), [f"{BASE}/"], "p", concurrency=2), timeout=5))
+
+
+@pytest.mark.fast
+def test_revisits_are_reported_without_touching_the_frontier(tmp_path):
+    with CrawlStore(tmp_path / "frontier.sqlite") as store:
+        store.begin()
+        asyncio.run(crawl(FakeContext(), [f"{BASE}/"], "before_login", visited=store.visited_urls(), store=store))
+        visited = store.visited_urls()
+        # A signed-out phase after a logout checks "/" again on its own
+        store.record_revisit({"phase": "after_logout", "url": f"{BASE}/", "status": 200, "tier": "render"})
+        results = store.run_results()
+        assert store.visited_urls() == visited
+        store.finish()
+        assert results[-1] == {"phase": "after_logout", "url": f"{BASE}/", "status": 200, "tier": "render"}
+        assert [r["phase"] for r in results].count("before_login") == len(results) - 1
+
+        store.begin()
+        assert store.run_results() == []
@@ -0,0 +1,68 @@
+# tests/fast/test_dashboard.py
+
+import json
+import pytest
+
+from mylibri.dashboard import DashboardWriter
+
+
+def books(count, status="OK"):
+    return [{"id": n, "title": f"Book {n}", "status": status, "timestamp": f"2025-06-0{1 + n % 5}T12:00:00"}
+            for n in range(1, count + 1)]
+
+
+def read_index(out_dir):
+    return json.loads((out_dir / "index.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.fast
+def test_books_are_split_into_listed_shards(tmp_path):
+    with DashboardWriter(tmp_path, shard_rows=2) as writer:
+        for record in books(5) + [{"url": "https://x/blog", "status": 200}]:
+            writer.write(record)
+
+    index = read_index(tmp_path)
+    assert index["total"] == 5 and writer.skipped == 1
+    assert index["statuses"] == {"OK": 5}
+    assert index["latest_check"] == "2025-06-05T12:00:00"
+    assert [(shard["count"], shard["first_id"], shard["last_id"]) for shard in index["shards"]] == [
+        (2, 1, 2), (2, 3, 4), (1, 5, 5)]
+    first = json.loads((tmp_path / index["shards"][0]["file"]).read_text(encoding="utf-8"))
+    assert first[1][index["fields"].index("title")] == "Book 2"
+
+
+@pytest.mark.fast
+def test_rewrite_removes_the_previous_shards(tmp_path):
+    with DashboardWriter(tmp_path, shard_rows=2) as writer:
+        for record in books(5):
+            writer.write(record)
+    old_shards = {shard["file"] for shard in read_index(tmp_path)["shards"]}
+
+    with DashboardWriter(tmp_path, shard_rows=10) as writer:
+        writer.generation += "b"
+        for record in books(3):
+            writer.write(record)
+
+    index = read_index(tmp_path)
+    assert index["total"] == 3
+    assert sorted(path.name for path in tmp_path.glob("books-*.json")) == [index["shards"][0]["file"]]
+    assert not old_shards & {shard["file"] for shard in index["shards"]}
+
+
+@pytest.mark.fast
+def test_failed_write_keeps_the_previous_data(tmp_path):
+    with DashboardWriter(tmp_path, shard_rows=2) as writer:
+        for record in books(3):
+            writer.write(record)
+    before = read_index(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with DashboardWriter(tmp_path, shard_rows=1) as writer:
+            writer.generation += "b"
+            for record in books(4, status="Broken"):
+                writer.write(record)
+            raise RuntimeError("merge failed")
+
+    assert read_index(tmp_path) == before
+    for shard in before["shards"]:
+        assert (tmp_path / shard["file"]).exists()
@@ -1,85 +1,26 @@
 import pytest
-from playwright.sync_api import sync_playwright
-import csv, json
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
-from collections import deque
+
+from mylibri.crawl_store import CrawlStore
+from mylibri.crawler import run_crawl
+from mylibri.reports import ReportWriter, is_failed_status
+from mylibri.warehouse import ResultsWarehouse
+from mylibri.sweep import run_in_thread
 
 # --- Configuration ---
 URL = "https://mylibribooks.com"
-EMAIL = "cpot.tea@gmail.com"
-PASSWORD = "Moniwyse!400"
-TIMEOUT = 15000  # Default timeout in milliseconds
-
-def crawl(page, start_url, visited):
-    """
-    Crawls a website from a starting URL, staying within the same domain.
-    Returns a list of {"url": ..., "status": ...}.
-    """
-    to_visit = deque([start_url])  # Using a deque for efficient queue operations
-    results = []
-    base_url = f"{urlparse(start_url).scheme}://{urlparse(start_url).netloc}"
-
-    print(f"Starting crawl from: {start_url}")
-
-    while to_visit:
-        current_url = to_visit.popleft() # Use popleft() for a breadth-first search (queue behavior)
-
-        # Skip if already visited to prevent infinite loops and redundant checks.
-        if current_url in visited:
-            continue
-        visited.add(current_url)
-
-        try:
-            # Navigate to the page and wait for the DOM to be ready
-            print(f"🔎 Visiting {current_url}")
-            response = page.goto(current_url, wait_until="domcontentloaded", timeout=TIMEOUT)
-            status = response.status if response else "No response"
-
-            print(f"✅ {current_url} -> Status: {status}")
-            results.append({"url": current_url, "status": status})
-
-            # Find all links on the current page
-            anchors = page.locator("a")
-            count = anchors.count()
-            
-            for i in range(count):
-                try:
-                    href = anchors.nth(i).get_attribute("href")
-                    if not href:
-                        continue
-
-                    abs_url = urljoin(current_url, href)
-
-                    # Normalize the URL to remove fragments and query parameters for better comparison
-                    normalized_url = urljoin(base_url, urlparse(abs_url).path)
-
-                    # Add to the queue only if it's within the same domain and not yet visited.
-                    if normalized_url.startswith(base_url) and normalized_url not in visited:
-                        to_visit.append(normalized_url)
-                except Exception as e:
-                    print(f"⚠️ Error processing link {href}: {e}")
-                    continue
+# Pages, per-host limit and page cap come from CRAWL_CONCURRENCY,
+# CRAWL_PER_HOST and CRAWL_MAX_PAGES (see mylibri/config.py). The frontier
+# is kept in test_reports/checkpoints/crawl_frontier.sqlite: an interrupted
+# crawl resumes on the next run, and URLs that passed within
+# CRAWL_MAX_AGE_HOURS are not checked again.
 
-        except Exception as e:
-            print(f"❌ Error visiting {current_url}: {e}")
-            results.append({"url": current_url, "status": f"Error: {e}"})
-            continue
-
-    return results
 
 @pytest.mark.fast
-def test_full_crawl_broken_links():
+def test_full_crawl_broken_links(auth_storage_state, account_credentials):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    Path("test_reports").mkdir(exist_ok=True)
-
-    all_results = []
-    visited_urls = set()
 
-    # --- Phase 1: Before Login ---
-    print("\n=== PHASE 1: Crawling before login ===\n")
-    
     # Define a list of starting URLs for the pre-login crawl
     pre_login_seeds = [
         URL,
@@ -90,77 +31,52 @@ def test_full_crawl_broken_links():
         f"{URL}/blog"
     ]
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.set_default_timeout(TIMEOUT)
-
-        for seed_url in pre_login_seeds:
-            public_results = crawl(page, seed_url, visited_urls)
-            all_results.extend([{"phase": "before_login", **r} for r in public_results])
+    # Define a list of starting URLs for the post-login crawl
+    post_login_seeds = [
+        f"{URL}/home/dashboard",
+        f"{URL}/home/genre",
+        f"{URL}/home/discover",
+        f"{URL}/home/library",
+        f"{URL}/home/books",
+        f"{URL}/home/wallet",
+        f"{URL}/blog"
+    ]
 
-        # --- Phase 2: After Login ---
-        print("\n=== PHASE 2: Logging in and crawling ===\n")
-        page.goto(URL)
-        page.click("text=Sign In")
-        page.wait_for_url("**/signin")
-        page.fill("input[type='email']", EMAIL)
-        page.fill("input[type='password']", PASSWORD)
-        page.click("button:has-text('Login')")
-        page.wait_for_url("**/home/dashboard**", timeout=20000)
+    # Each phase gets its own context: signed out, signed in with the
+    # session's saved login, then signed out again after a real "Log Out"
+    # in a throwaway context (the saved login stays valid). The visited set
+    # is shared by the first two phases, so a URL is only checked in the
+    # first phase that reaches it; the last phase checks its pages again.
+    # Pages load in the "lean" profile: images are checked over HTTP instead.
+    # The seeds above are topped up from the sitemap, the SPA's route table
+    # and earlier crawls (see mylibri/seeds.py), and each phase has its own
+    # depth and page budget.
+    phases = [
+        ("before_login", pre_login_seeds, None,
+         {"seed_from": ("sitemap", "previous"), "max_depth": 4, "max_pages": 1000}),
+        ("after_login", post_login_seeds, str(auth_storage_state),
+         {"seed_from": ("sitemap", "routes", "previous"), "max_depth": 6, "max_pages": 5000}),
+        ("after_logout", [URL, f"{URL}/home/dashboard", f"{URL}/home/library"], None,
+         {"logout": True, "max_depth": 2, "max_pages": 200}),
+    ]
 
-        # Define a list of starting URLs for the post-login crawl
-        post_login_seeds = [
-            f"{URL}/home/dashboard",
-            f"{URL}/home/genre",
-            f"{URL}/home/discover",
-            f"{URL}/home/library",
-            f"{URL}/home/books",
-            f"{URL}/home/wallet",
-            f"{URL}/blog"
-        ]
+    def report(record):
+        print(f"✅ [{record['phase']}] {record['url']} -> Status: {record['status']} ({record['tier']})")
 
-        for seed_url in post_login_seeds:
-            private_results = crawl(page, seed_url, visited_urls)
-            all_results.extend([{"phase": "after_login", **r} for r in private_results])
-        
-        # --- Phase 3: After Logout ---
-        print("\n=== PHASE 3: Logging out and crawling ===\n")
-        # Use the working logout steps provided
-        page.click("img.profile_pic")
-        page.click("text=Log Out")
-        # Wait for the URL to change back to a public page.
-        page.wait_for_url(URL, timeout=8000)
-        
-        post_logout_results = crawl(page, URL, visited_urls)
-        all_results.extend([{"phase": "after_logout", **r} for r in post_logout_results])
+    print("\n=== Crawling before login, after login and after logout ===\n")
+    with CrawlStore() as store:
+        run_in_thread(run_crawl(phases, on_result=report, store=store, profile="lean"))
 
         # --- Export Results ---
+        # Streamed from the store, so a resumed run reports the URLs checked before the interruption too
         print("\n--- Exporting Results ---\n")
-        csv_path = f"test_reports/full_broken_links_{timestamp}.csv"
-        json_path = f"test_reports/full_broken_links_{timestamp}.json"
-        html_path = f"test_reports/full_broken_links_{timestamp}.html"
-
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["phase", "url", "status"])
-            writer.writeheader()
-            writer.writerows(all_results)
-
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(all_results, f, indent=2)
-
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write("<html><head><title>Full Broken Link Check</title></head><body>")
-            f.write("<h1>🔗 Full Broken Link Check</h1><ul>")
-            for item in all_results:
-                # Assuming status codes >= 400 are failures
-                color = "red" if isinstance(item['status'], int) and item['status'] >= 400 else "green"
-                f.write(f"<li style='color:{color}'>[{item['phase']}] {item['url']} → {item['status']}</li>")
-            f.write("</ul></body></html>")
-
-        print("✅ Export complete:")
-        print(f" - CSV: {csv_path}")
-        print(f" - JSON: {json_path}")
-        print(f" - HTML: {html_path}")
-        
-        browser.close()
+        export = ReportWriter(Path("test_reports") / f"full_broken_links_{timestamp}", ["phase", "tier", "url", "status"],
+                              title="🔗 Full Broken Link Check", failed=is_failed_status)
+        with export, ResultsWarehouse() as warehouse, warehouse.run("crawl", "full_broken_links",
+                                                                    source=export.paths["ndjson"]) as run:
+            for record in store.iter_run_results():
+                export.write(record)
+                run.add(record)
+
+    print(f"✅ Export complete: {export.count} URLs, {export.failures} broken")
+    export.print_paths()
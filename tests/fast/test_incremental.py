@@ -0,0 +1,76 @@
+# tests/fast/test_incremental.py
+
+import json
+import random
+import pytest
+from datetime import datetime, timedelta
+
+from mylibri.incremental import load_latest_snapshot, merge_snapshot, plan_revalidation
+
+NOW = datetime(2025, 9, 1, 12, 0, 0)
+
+
+def result(book_id, status="OK", age_days=1):
+    return {"id": book_id, "status": status, "timestamp": (NOW - timedelta(days=age_days)).isoformat()}
+
+
+@pytest.mark.fast
+def test_plan_rechecks_broken_new_and_stale():
+    previous = {1: result(1), 2: result(2, "Broken"), 3: result(3, age_days=30), 4: result(4)}
+    to_check, counts = plan_revalidation(previous, [1, 2, 3, 4, 5], sample_pct=0, now=NOW)
+    assert to_check == {2, 3, 5}
+    assert counts == {"broken": 1, "new": 1, "stale": 1, "sampled": 0, "reused": 2}
+
+
+@pytest.mark.fast
+def test_plan_samples_known_good():
+    previous = {i: result(i) for i in range(1, 101)}
+    to_check, counts = plan_revalidation(previous, range(1, 101), sample_pct=10, now=NOW, rng=random.Random(7))
+    assert len(to_check) == counts["sampled"] == 10
+    assert counts["reused"] == 90
+
+
+@pytest.mark.fast
+def test_merge_keeps_full_snapshot():
+    previous = {1: result(1), 2: result(2, "Broken"), 3: result(3)}
+    merged = merge_snapshot(previous, [{"id": 2, "status": "OK"}, {"id": 4, "status": "OK"}])
+    assert [(r["id"], r["status"]) for r in merged] == [(1, "OK"), (2, "OK"), (3, "OK"), (4, "OK")]
+
+
+@pytest.mark.fast
+def test_latest_snapshot_reads_old_report_format(tmp_path):
+    old = [{"id": 1, "url": "u1", "title": "A", "author": "X"}]
+    new = [{"id": 1, "url": "u1", "title": "N/A", "comment": "Book ID Broken, no valid book metadata found"}]
+    (tmp_path / "book_id_sweep_20250607_120000.json").write_text(json.dumps(old), encoding="utf-8")
+    (tmp_path / "book_metadata_20250608_120000.json").write_text(json.dumps(new), encoding="utf-8")
+
+    snapshot, path = load_latest_snapshot(tmp_path, checkpoint_dir=tmp_path / "checkpoints")
+    assert path.name == "book_metadata_20250608_120000.json"
+    assert snapshot[1]["status"] == "Broken"
+    assert snapshot[1]["timestamp"] == "2025-06-08T12:00:00"
+
+
+@pytest.mark.fast
+def test_latest_snapshot_for_a_shard_skips_sets_outside_its_range(tmp_path):
+    low = [{"id": 1, "url": "u1", "status": "OK"}, {"id": 2, "url": "u2", "status": "OK"}]
+    high = [{"id": 9, "url": "u9", "status": "OK"}]
+    (tmp_path / "book_id_sweep_20250607_120000_shard1of2.json").write_text(json.dumps(low), encoding="utf-8")
+    (tmp_path / "book_id_sweep_20250607_120500_shard2of2.json").write_text(json.dumps(high), encoding="utf-8")
+
+    snapshot, path = load_latest_snapshot(tmp_path, checkpoint_dir=tmp_path / "checkpoints", id_range=(2, 5))
+    assert path.name == "book_id_sweep_20250607_120000_shard1of2.json"
+    assert list(snapshot) == [2]
+
+
+@pytest.mark.fast
+def test_latest_snapshot_reads_ndjson_snapshots(tmp_path):
+    older = [{"id": 1, "url": "u1", "status": "Broken"}]
+    newer = [{"id": 1, "url": "u1", "status": "OK", "timestamp": "2025-06-09T08:00:00"}]
+    (tmp_path / "book_id_sweep_20250607_120000.json").write_text(json.dumps(older), encoding="utf-8")
+    (tmp_path / "book_id_sweep_20250609_120000.ndjson").write_text(
+        "".join(json.dumps(row) + "\n" for row in newer), encoding="utf-8"
+    )
+
+    snapshot, path = load_latest_snapshot(tmp_path, checkpoint_dir=tmp_path / "checkpoints")
+    assert path.name == "book_id_sweep_20250609_120000.ndjson"
+    assert snapshot[1]["status"] == "OK"
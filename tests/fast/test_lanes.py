@@ -0,0 +1,56 @@
+# tests/fast/test_lanes.py
+
+import json
+
+import pytest
+
+from mylibri.lanes import LANES, build_command, build_env, merge_lane_results, write_combined_report
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" errors="0" failures="{failures}" skipped="0" tests="{tests}" time="{time}">
+<testcase classname="tests.fast.test_x" name="test_ok" time="0.1"/>
+{failed_case}
+</testsuite></testsuites>
+"""
+
+FAILED_CASE = """<testcase classname="tests.fast.test_x" name="test_bad" time="0.2"><failure message="assert 1 == 2">trace</failure></testcase>"""
+
+
+@pytest.mark.fast
+def test_lane_command_and_env():
+    lane = {"marker": "slow", "workers": 3, "browsers": 2}
+    command = build_command("slow", lane, ["-x"], lane_dir="out")
+    assert command[:3] == ["pytest", "-m", "slow"]
+    assert "--junitxml=out/slow.xml" in command and "--html=out/slow.html" in command
+    assert command[-3:] == ["-n", "3", "-x"]
+
+    env = build_env("slow", lane, base_env={"PATH": "/bin"})
+    assert env["BROWSER_POOL_SIZE"] == "2"
+    assert env["SWEEP_SHARDS"] == "3"
+    assert "SWEEP_SHARDS" not in build_env("fast", LANES["fast"], base_env={})
+    assert "RATE_LIMIT_PROCESSES" not in env
+    assert build_env("slow", lane, base_env={}, processes=7)["RATE_LIMIT_PROCESSES"] == "7"
+    # A single-worker lane runs without xdist
+    assert "-n" not in build_command("mobile", {"marker": "mobile", "workers": 1, "browsers": 1})
+
+
+@pytest.mark.fast
+def test_merge_lane_results_and_write_report(tmp_path):
+    fast = tmp_path / "fast.xml"
+    fast.write_text(JUNIT.format(failures=1, tests=2, time=1.5, failed_case=FAILED_CASE), encoding="utf-8")
+    mobile = tmp_path / "mobile.xml"
+    mobile.write_text(JUNIT.format(failures=0, tests=1, time=0.5, failed_case=""), encoding="utf-8")
+
+    combined = merge_lane_results({
+        "fast": {"returncode": 1, "junit": fast, "html": tmp_path / "fast.html"},
+        "mobile": {"returncode": 0, "junit": mobile, "html": tmp_path / "mobile.html"},
+        "slow": {"returncode": 2, "junit": tmp_path / "slow.xml", "html": tmp_path / "slow.html"},
+    })
+    assert combined["totals"] == {"tests": 3, "passed": 2, "failures": 1, "errors": 1, "skipped": 0}
+    assert combined["lanes"]["fast"]["failed"][0]["test"] == "tests.fast.test_x::test_bad"
+
+    html_path, json_path = tmp_path / "full_report.html", tmp_path / "full_report.json"
+    write_combined_report(combined, html_path, json_path)
+    assert json.loads(json_path.read_text(encoding="utf-8"))["totals"]["tests"] == 3
+    page = html_path.read_text(encoding="utf-8")
+    assert "test_bad" in page and "href='fast.html'" in page
@@ -0,0 +1,80 @@
+# tests/fast/test_links.py
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from mylibri.links import (
+    ASSET_EXTENSIONS, CONTENT_SELECTORS, EXTRACT_LINK_TIERS_JS, canonical_pages, canonicalize,
+    link_tier, normalize_link, split_link_tiers,
+)
+
+BASE = "https://site.test"
+PAGE_URL = f"{BASE}/blog/post"
+HREFS = [
+    "/a", "/a?x=1#top", "b", "../c", "https://site.test/d", "https://elsewhere.test/e",
+    "mailto:someone@site.test", "", "/", "#section",
+]
+TARGETS = HREFS + ["/files/guide.PDF#page=2", "/img/cover.png?v=3", "https://elsewhere.test/f#x", "javascript:void(0)"]
+
+
+@pytest.mark.fast
+def test_normalize_link_keeps_same_site_paths_only():
+    assert normalize_link("/b?x=1#top", f"{BASE}/a", BASE) == f"{BASE}/b"
+    assert normalize_link("b", f"{BASE}/a/", BASE) == f"{BASE}/a/b"
+    assert normalize_link("https://elsewhere.test/c", f"{BASE}/", BASE) is None
+    assert normalize_link("", f"{BASE}/", BASE) is None
+    assert normalize_link(BASE, BASE, BASE) == f"{BASE}/"
+
+
+@pytest.mark.fast
+def test_link_tier_renders_only_same_site_documents():
+    assert link_tier(f"{BASE}/home/discover", BASE) == "render"
+    assert link_tier(f"{BASE}/files/guide.pdf", BASE) == "http"
+    assert link_tier("https://elsewhere.test/", BASE) == "http"
+    assert link_tier("mailto:someone@site.test", BASE) is None
+
+
+@pytest.mark.fast
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the in-page script")
+def test_in_page_tier_split_matches_python_rule():
+    def run(text):
+        script = f"""
+        const targets = {json.dumps(TARGETS)};
+        global.document = {{
+          baseURI: {json.dumps(PAGE_URL)},
+          querySelectorAll: selector => selector.startsWith("img") ? [] : targets.map(t => ({{ getAttribute: () => t }})),
+          querySelector: selector => selector === "main" ? {{ innerText: {json.dumps(text)} }} : null,
+        }};
+        const extract = {EXTRACT_LINK_TIERS_JS};
+        const args = [{json.dumps(BASE)}, {json.dumps(list(ASSET_EXTENSIONS))}, {json.dumps(list(CONTENT_SELECTORS))}];
+        console.log(JSON.stringify(extract(args)));
+        """
+        return json.loads(subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout)
+
+    found = run("  Book   of the\n week ")
+    pages, resources = split_link_tiers(TARGETS, PAGE_URL, BASE)
+    assert (found["pages"], found["resources"]) == (pages, resources)
+    assert found["contentLength"] == len("Book of the week")
+    # Whitespace does not change the content hash, words do
+    assert run("Book of the week")["contentHash"] == found["contentHash"]
+    assert run("Book of the month")["contentHash"] != found["contentHash"]
+
+
+@pytest.mark.fast
+def test_canonicalize_applies_query_slash_and_case_rules():
+    rules = {"keep_params": ("page", "q"), "drop_params": ("utm_*",), "trailing_slash": "strip", "lowercase_path": False}
+    assert canonicalize(f"{BASE}/Books/?utm_source=x&page=2&sort=new#top", rules) == f"{BASE}/Books?page=2"
+    assert canonicalize(f"{BASE}/a?q=x&page=1", rules) == f"{BASE}/a?page=1&q=x"
+    assert canonicalize("HTTPS://Site.Test", rules) == f"{BASE}/"
+
+    everything = dict(rules, keep_params=("*",), trailing_slash="add", lowercase_path=True)
+    assert canonicalize(f"{BASE}/Books?utm_medium=y&sort=new", everything) == f"{BASE}/books/?sort=new"
+
+    variants = [f"{BASE}/a/", f"{BASE}/a?ref=home", f"{BASE}/a?page=2", f"{BASE}/a"]
+    assert canonical_pages(variants, rules) == {
+        f"{BASE}/a": [f"{BASE}/a/", f"{BASE}/a?ref=home", f"{BASE}/a"],
+        f"{BASE}/a?page=2": [f"{BASE}/a?page=2"],
+    }
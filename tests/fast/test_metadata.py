@@ -0,0 +1,164 @@
+# tests/fast/test_metadata.py
+
+import asyncio
+import time
+import pytest
+
+from mylibri import metadata as metadata_module
+from mylibri.metadata import BookMetadataReader, find_value, metadata_check, metadata_from_payload
+from mylibri.ratelimit import LIMITER, TokenBucket
+
+API = "https://api.site.test/v1/books"
+BOOKS = "https://site.test/home/books"
+
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+
+class FakeResponse:
+    def __init__(self, url, status=200, payload=None, resource_type="fetch"):
+        self.url = url
+        self.status = status
+        self.payload = payload
+        self.headers = {}
+        self.request = FakeRequest(resource_type)
+
+    async def json(self):
+        if self.payload is None:
+            raise ValueError("not JSON")
+        return self.payload
+
+
+class FakePage:
+    """
+    A book page: `goto` delivers the `early` responses to listeners, and
+    `wait_for_event` the `late` ones, as they would arrive after the load.
+    """
+
+    def __init__(self, dom=None):
+        self.listeners = []
+        self.early, self.late = [], []
+        self.dom = dom
+        self.waits = 0
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    def load(self, early=(), late=()):
+        self.early, self.late = list(early), list(late)
+
+    def _deliver(self, response):
+        for listener in list(self.listeners):
+            listener(response)
+
+    async def goto(self, url, **options):
+        for response in self.early:
+            self._deliver(response)
+        return FakeResponse(url, resource_type="document")
+
+    async def wait_for_event(self, event, predicate, timeout=None):
+        self.waits += 1
+        while self.late:
+            response = self.late.pop(0)
+            self._deliver(response)
+            if predicate(response):
+                return response
+        raise TimeoutError(f"Timeout {timeout}ms exceeded while waiting for event \"{event}\"")
+
+    async def wait_for_selector(self, selector, timeout=None):
+        if self.dom is None:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded waiting for {selector}")
+
+    async def evaluate(self, script):
+        return self.dom
+
+
+def book_json(book_id, **fields):
+    return {"status": True, "data": {"id": book_id, "title": f"Book {book_id}", **fields}}
+
+
+def read(reader, page, book_id):
+    return asyncio.run(reader.read(page, book_id, f"{BOOKS}/{book_id}"))
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    monkeypatch.setattr(LIMITER, "default", TokenBucket(0, 1))
+
+
+@pytest.mark.fast
+def test_fields_come_from_nested_and_object_values():
+    payload = book_json(7, author={"id": 3, "name": "Ada Obi"}, average_rating=4.5, no_of_pages=212)
+    assert metadata_from_payload(payload) == {"title": "Book 7", "author": "Ada Obi", "rating": "4.5", "pages": "212"}
+    assert metadata_from_payload(book_json(8))["author"] == "N/A"
+    assert metadata_from_payload({"data": None}) is None
+    assert find_value({"data": {"authors": [{"full_name": "Tolu A."}]}}, ("authors",)) == "Tolu A."
+
+
+@pytest.mark.fast
+def test_reader_learns_the_endpoint_and_reads_one_response_per_book():
+    page = FakePage()
+    reader = BookMetadataReader()
+
+    page.load(early=[FakeResponse(f"{API}/1/reviews?page=1", payload={"data": []})],
+              late=[FakeResponse(f"{API}/1", payload=book_json(1, author="Ada Obi", pages=90))])
+    metadata = read(reader, page, 1)
+    assert metadata == {"title": "Book 1", "author": "Ada Obi", "rating": "N/A", "pages": "90", "source": "json"}
+    assert reader.api.template == f"{API}/{{id}}"
+
+    # Once the endpoint is known, a response that already arrived settles a book without waiting
+    waits = page.waits
+    page.load(early=[FakeResponse(f"{API}/2", status=404)])
+    assert read(reader, page, 2) == {"title": "N/A", "author": "N/A", "rating": "N/A", "pages": "N/A", "source": "json"}
+    assert page.waits == waits
+    assert (reader.from_json, reader.from_dom) == (2, 0)
+    assert page.listeners == []
+
+
+@pytest.mark.fast
+def test_reader_falls_back_to_one_dom_read():
+    page = FakePage(dom={"title": "Book 5", "author": "Ada Obi", "rating": "Rating: 4", "pages": None})
+    reader = BookMetadataReader()
+    # A 404 before the endpoint is known may be some other call; the page decides
+    page.load(early=[FakeResponse(f"{API}/5", status=404)])
+    metadata = read(reader, page, 5)
+    assert metadata == {"title": "Book 5", "author": "Ada Obi", "rating": "Rating: 4", "pages": "N/A", "source": "dom"}
+    assert (reader.from_json, reader.from_dom) == (0, 1)
+
+
+class SilentPage(FakePage):
+    """A book page that makes no book JSON call: waiting for one lasts the whole timeout."""
+
+    async def wait_for_event(self, event, predicate, timeout=None):
+        self.waits += 1
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded while waiting for event \"{event}\"")
+
+
+@pytest.mark.fast
+def test_shown_title_cuts_the_json_wait_short(monkeypatch):
+    monkeypatch.setattr(metadata_module, "JSON_GRACE_MS", 50)
+    page = SilentPage(dom={"title": "Book 6", "author": None, "rating": None, "pages": None})
+    started = time.monotonic()
+    metadata = asyncio.run(BookMetadataReader().read(page, 6, f"{BOOKS}/6", timeout=8000))
+    assert (metadata["title"], metadata["source"]) == ("Book 6", "dom")
+    assert time.monotonic() - started < 2
+
+
+@pytest.mark.fast
+def test_metadata_check_reports_books_without_a_title_as_broken():
+    check = metadata_check(book_url_base=BOOKS)
+    page = FakePage()
+    page.load(late=[FakeResponse(f"{API}/3", payload=book_json(3, rating=4))])
+    result = asyncio.run(check(page, 3))
+    assert (result["status"], result["title"], result["rating"], result["failure"]) == ("OK", "Book 3", "4", "")
+
+    page.load(early=[FakeResponse(f"{API}/4", payload={"data": None})])
+    result = asyncio.run(check(page, 4))
+    assert (result["status"], result["title"], result["failure"]) == ("Broken", "N/A", "missing_element")
+    assert check.reader.summary() == "2 books read from the book JSON, 0 from the page"
@@ -0,0 +1,36 @@
+# tests/fast/test_probe.py
+
+import pytest
+
+from mylibri.probe import BookApi, find_title, is_empty_payload, template_from_url
+
+
+@pytest.mark.fast
+def test_template_from_path_segment():
+    template = template_from_url("https://api.example.com/v1/books/123?include=author", 123)
+    assert template == "https://api.example.com/v1/books/{id}?include=author"
+    assert BookApi(template).url_for(7) == "https://api.example.com/v1/books/7?include=author"
+
+
+@pytest.mark.fast
+def test_template_from_query_value():
+    assert template_from_url("https://api.example.com/book?id=42", 42) == "https://api.example.com/book?id={id}"
+
+
+@pytest.mark.fast
+def test_template_ignores_partial_id_match():
+    assert template_from_url("https://api.example.com/v1/books/1234", 123) is None
+
+
+@pytest.mark.fast
+def test_find_title_in_nested_payload():
+    assert find_title({"status": True, "data": {"book": {"title": " Dark Carnival "}}}) == "Dark Carnival"
+    assert find_title({"data": [{"book_name": "The Camel of Destruction"}]}) == "The Camel of Destruction"
+    assert find_title({"data": {"id": 5}}) is None
+
+
+@pytest.mark.fast
+def test_empty_payload_means_broken():
+    assert is_empty_payload(None)
+    assert is_empty_payload({"status": False, "message": "Not found", "data": None})
+    assert not is_empty_payload({"data": {"id": 5}})
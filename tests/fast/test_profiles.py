@@ -0,0 +1,70 @@
+# tests/fast/test_profiles.py
+
+import pytest
+
+import mylibri.profiles as profiles
+from mylibri.profiles import apply_profile, profile_rules, should_block
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+
+@pytest.mark.fast
+def test_lean_profile_blocks_heavy_resources_and_trackers():
+    rules = profile_rules("lean")
+    assert should_block(rules, "image", "https://mylibribooks.com/cover.png")
+    assert should_block(rules, "font", "https://fonts.gstatic.com/roboto.woff2")
+    assert should_block(rules, "script", "https://www.googletagmanager.com/gtag/js")
+    assert not should_block(rules, "script", "https://mylibribooks.com/static/main.js")
+    assert not should_block(rules, "fetch", "https://api.mylibribooks.com/books/1")
+    # Only whole host labels match
+    assert not should_block(rules, "script", "https://notclarity.ms/x.js")
+
+
+@pytest.mark.fast
+def test_apply_profile_routes_and_counts():
+    context = FakeContext()
+    stats = apply_profile(context, "lean")
+    (pattern, handler), = context.routes
+    assert pattern == "**/*"
+
+    image, page = FakeRoute("image", "https://mylibribooks.com/a.jpg"), FakeRoute("document", "https://mylibribooks.com/")
+    handler(image)
+    handler(page)
+    assert (image.outcome, page.outcome) == ("aborted", "continued")
+    assert stats == {"blocked": 1, "allowed": 1}
+
+
+@pytest.mark.fast
+def test_default_profile_and_switch_leave_context_unrouted(monkeypatch):
+    context = FakeContext()
+    apply_profile(context, None)
+    apply_profile(context, "default")
+    monkeypatch.setattr(profiles, "LEAN_PROFILE", False)
+    apply_profile(context, "lean")
+    assert context.routes == []
+    with pytest.raises(ValueError):
+        profile_rules("tiny")
@@ -0,0 +1,100 @@
+# tests/fast/test_ratelimit.py
+
+import asyncio
+import pytest
+
+from mylibri.ratelimit import RateLimiter, TokenBucket, parse_overrides, rate_share, throttled_goto
+
+BASE = "https://site.test"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class FakePage:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.visits = 0
+
+    async def goto(self, url, **options):
+        self.visits += 1
+        return self.statuses.pop(0)
+
+
+@pytest.mark.fast
+def test_bucket_allows_a_burst_then_paces_requests():
+    bucket = TokenBucket(rate=2, burst=3, now=0.0)
+    assert [bucket.reserve(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each later caller gets its own slot, half a second apart
+    assert [bucket.reserve(0.0) for _ in range(2)] == [0.5, 1.0]
+    # Two seconds later the debt is paid and one token is back
+    assert bucket.reserve(2.5) == 0.0
+
+
+@pytest.mark.fast
+def test_overrides_pick_the_longest_matching_prefix():
+    assert parse_overrides("/api=20:40, /home/books=4,bad") == {"/api": (20.0, 40.0), "/home/books": (4.0, 4.0)}
+    limiter = RateLimiter(rate=1, burst=1, overrides={"/home": (5, 5), "/home/books": (2, 2)}, clock=FakeClock())
+    assert limiter.bucket_for(f"{BASE}/home/books/7").rate == 2
+    assert limiter.bucket_for(f"{BASE}/home/genre").rate == 5
+    assert limiter.bucket_for(f"{BASE}/blog") is limiter.default
+
+
+@pytest.mark.fast
+def test_throttled_answers_pause_the_bucket_with_growing_backoff():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=0, burst=1, backoff_s=1, backoff_max_s=3, clock=clock)
+    url = f"{BASE}/home/books/1"
+
+    assert limiter.observe(url, 429, {"retry-after": "5"})
+    assert limiter.reserve(url) == pytest.approx(3)  # Retry-After, capped
+    clock.now += 10
+    limiter.observe(url, 503)
+    limiter.observe(url, 503)
+    # Third answer in a row: about 1s * 2 ** 2, capped at 3s
+    assert limiter.reserve(url) == pytest.approx(3)
+    assert not limiter.observe(url, 200)
+    assert limiter.default.throttled_in_a_row == 0
+    assert limiter.throttled == 3
+
+
+@pytest.mark.fast
+def test_throttled_goto_retries_until_the_site_answers():
+    limiter = RateLimiter(rate=0, burst=1, backoff_s=0, backoff_max_s=0)
+    page = FakePage([FakeResponse(429), FakeResponse(503), FakeResponse(200)])
+    response = asyncio.run(throttled_goto(page, f"{BASE}/", limiter=limiter))
+    assert (response.status, page.visits) == (200, 3)
+
+    page = FakePage([FakeResponse(429)] * 3)
+    response = asyncio.run(throttled_goto(page, f"{BASE}/", limiter=limiter, retries=2))
+    assert (response.status, page.visits) == (429, 3)
+
+
+@pytest.mark.fast
+def test_parallel_processes_split_the_budget_and_merge_counters():
+    assert rate_share({"PYTEST_XDIST_WORKER_COUNT": "4"}) == 4
+    assert rate_share({"RATE_LIMIT_PROCESSES": "8", "PYTEST_XDIST_WORKER_COUNT": "4"}) == 8
+    assert rate_share({}) == 1
+
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, burst=10, overrides={"/api": (20, 20)}, clock=clock, share=4)
+    assert (limiter.default.rate, limiter.default.burst) == (2.5, 2.5)
+    assert limiter.bucket_for(f"{BASE}/api/x").rate == 5
+
+    worker = RateLimiter(rate=0, burst=1, clock=clock)
+    worker.reserve(f"{BASE}/a")
+    worker.observe(f"{BASE}/a", 429, {"retry-after": "1"})
+    limiter.merge(worker.counters())
+    limiter.merge(worker.counters())
+    assert (limiter.requests, limiter.throttled) == (2, 2)
@@ -0,0 +1,64 @@
+# tests/fast/test_readiness.py
+
+import time
+import pytest
+
+from mylibri import readiness
+from mylibri.readiness import ReadinessLedger, suite_for, wait_for_network_quiet
+
+
+class FakePage:
+    """Just enough of a Page for the network tracker: event hooks and a sleep."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def wait_for_timeout(self, ms):
+        time.sleep(ms / 1000)
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    fresh = ReadinessLedger()
+    fresh.current_test = "tests/mobile/test_x.py::test_y"
+    monkeypatch.setattr(readiness, "LEDGER", fresh)
+    return fresh
+
+
+@pytest.mark.fast
+def test_suite_for_node_ids():
+    assert suite_for("tests/fast/test_genres.py::test_quick_check") == "fast"
+    assert suite_for("test_profile_navigation.py::test_login") == "other"
+    assert suite_for(None) == "other"
+
+
+@pytest.mark.fast
+def test_quiet_network_returns_before_the_replaced_sleep(ledger):
+    assert wait_for_network_quiet(FakePage(), replaces_ms=2000, idle_ms=100)
+    entry = ledger.totals["mobile"]
+    assert entry["waits"] == 1
+    assert entry["actual_ms"] < 1000
+    assert "saved" in ledger.summary_lines()[0]
+
+
+@pytest.mark.fast
+def test_busy_network_is_capped_at_the_replaced_sleep(ledger):
+    page = FakePage()
+    readiness.track_network(page)
+    page.handlers["request"](object())
+    assert not wait_for_network_quiet(page, replaces_ms=300, idle_ms=100)
+    assert ledger.totals["mobile"]["actual_ms"] < 600
+
+
+@pytest.mark.fast
+def test_worker_totals_merge_into_the_controller_ledger():
+    worker = ReadinessLedger()
+    worker.current_test = "tests/fast/test_x.py::test_y"
+    worker.record("selector", 2000, 150)
+    controller = ReadinessLedger()
+    controller.merge(worker.totals)
+    controller.merge(worker.totals)
+    assert controller.totals == {"fast": {"waits": 2, "replaced_ms": 4000, "actual_ms": 300}}
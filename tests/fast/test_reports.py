@@ -0,0 +1,64 @@
+# tests/fast/test_reports.py
+
+import csv
+import json
+import pytest
+
+from mylibri.reports import ReportWriter, cell_text, is_failed_status
+
+
+def read_ndjson(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.mark.fast
+def test_rows_are_written_to_every_format(tmp_path):
+    with ReportWriter(tmp_path / "links", ["id", "url", "status"], title="Links", failed=is_failed_status) as report:
+        report.write({"id": 1, "url": "https://x/1", "status": "OK", "attempts": 1})
+        report.write({"id": 2, "url": "https://x/2", "status": "Broken"})
+
+    assert report.count == 2 and report.failures == 1
+    with open(report.paths["csv"], newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [
+            ["id", "url", "status"], ["1", "https://x/1", "OK"], ["2", "https://x/2", "Broken"],
+        ]
+    # NDJSON keeps every key, not just the report columns
+    assert read_ndjson(report.paths["ndjson"])[0] == {"id": 1, "url": "https://x/1", "status": "OK", "attempts": 1}
+    html = report.paths["html"].read_text(encoding="utf-8")
+    assert "<a href='https://x/2' target='_blank'>" in html
+    assert html.count("<tr class='failed'>") == 1
+    assert "2 rows, 1 failed." in html and html.endswith("</body></html>\n")
+
+
+@pytest.mark.fast
+def test_rows_reach_disk_before_the_report_closes(tmp_path):
+    report = ReportWriter(tmp_path / "genres", ["genre"], formats=("ndjson",), flush_every=2, flush_s=60)
+    report.write({"genre": "Drama"})
+    assert report.paths["ndjson"].read_text(encoding="utf-8") == ""
+    report.write({"genre": "Poetry"})
+    assert [row["genre"] for row in read_ndjson(report.paths["ndjson"])] == ["Drama", "Poetry"]
+    report.close()
+    assert set(report.paths) == {"ndjson"}
+
+
+@pytest.mark.fast
+def test_report_says_it_is_incomplete_when_the_run_fails(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ReportWriter(tmp_path / "crawl", ["url", "status"]) as report:
+            report.write({"url": "https://x/", "status": 200})
+            raise RuntimeError("browser crashed")
+
+    html = report.paths["html"].read_text(encoding="utf-8")
+    assert "Report incomplete" in html and "browser crashed" in html
+    assert len(read_ndjson(report.paths["ndjson"])) == 1
+
+
+@pytest.mark.fast
+def test_cells_and_statuses():
+    assert cell_text(["A", "B"]) == "A; B"
+    assert cell_text(None) == ""
+    assert [is_failed_status({"status": s}) for s in ("OK", 200, 404, "Error: timeout", "Broken")] == [
+        False, False, True, True, True,
+    ]
+    with pytest.raises(ValueError):
+        ReportWriter("unused", ["id"], formats=("xml",))
@@ -0,0 +1,147 @@
+# tests/fast/test_retry.py
+
+import asyncio
+import random
+import pytest
+
+from mylibri.retry import (
+    HTTPStatusError, RetryPolicy, call_with_retries_sync, classify_exception, raise_for_status, with_retries,
+)
+from mylibri.sweep import check_book_page
+
+
+class TimeoutError(Exception):
+    """Stands in for playwright's TimeoutError, which is matched by name."""
+
+
+class FakeResponse:
+    def __init__(self, status, url="https://site.test/home/books/1"):
+        self.status = status
+        self.url = url
+        self.headers = {}
+
+
+class FakeLocator:
+    def __init__(self, page):
+        self.page = page
+        self.first = self
+
+    async def text_content(self, timeout=None):
+        if self.page.title is None:
+            for handler in self.page.handlers:
+                if self.page.page_error:
+                    handler(self.page.page_error)
+            raise TimeoutError("Timeout 8000ms exceeded waiting for locator")
+        return self.page.title
+
+
+class FakePage:
+    """Answers each goto with the next of `outcomes`: a status code or an exception to raise."""
+
+    def __init__(self, outcomes, title=" Dark Carnival ", page_error=None):
+        self.outcomes = list(outcomes)
+        self.title = title
+        self.page_error = page_error
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers.remove(handler)
+
+    async def goto(self, url, **options):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome, url)
+
+    def locator(self, selector):
+        return FakeLocator(self)
+
+
+def fast_policy(attempts=3):
+    return RetryPolicy(attempts=attempts, backoff_s=0, backoff_max_s=0, rng=random.Random(1))
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    from mylibri.ratelimit import LIMITER, TokenBucket
+    monkeypatch.setattr(LIMITER, "default", TokenBucket(0, 1))
+
+
+@pytest.mark.fast
+def test_failures_are_classified():
+    assert classify_exception(TimeoutError("Timeout 10000ms exceeded")) == "timeout"
+    assert classify_exception(Exception("page.goto: net::ERR_CONNECTION_RESET at https://x")) == "network"
+    assert classify_exception(HTTPStatusError(502)) == "http_5xx"
+    assert classify_exception(HTTPStatusError(404)) == "http_4xx"
+    assert classify_exception(ValueError("something else")) == "error"
+    with pytest.raises(HTTPStatusError):
+        raise_for_status(FakeResponse(503))
+    assert raise_for_status(None) is None
+
+
+@pytest.mark.fast
+def test_backoff_grows_with_jitter_up_to_the_cap():
+    policy = RetryPolicy(backoff_s=1, backoff_max_s=5, rng=random.Random(7))
+    for attempt, ceiling in [(1, 1), (2, 2), (3, 4), (4, 5), (10, 5)]:
+        delays = [policy.delay(attempt) for _ in range(50)]
+        assert all(0 <= d <= ceiling for d in delays)
+        assert max(delays) > ceiling / 2
+
+
+@pytest.mark.fast
+def test_transient_failures_are_retried_until_the_page_loads():
+    policy = fast_policy()
+    check = with_retries(check_book_page, policy)
+    page = FakePage([TimeoutError("Timeout 8000ms exceeded"), 502, 200])
+    result = asyncio.run(check(page, 1))
+    assert (result["status"], result["title"], result["attempts"]) == ("OK", "Dark Carnival", 3)
+    assert (policy.retries, policy.recovered) == (2, 1)
+    assert page.handlers == []
+
+
+@pytest.mark.fast
+def test_permanent_failures_are_not_retried():
+    check = with_retries(check_book_page, fast_policy())
+    result = asyncio.run(check(FakePage([404, 200]), 1))
+    assert (result["status"], result["failure"], result["attempts"]) == ("Broken", "http_4xx", 1)
+
+    result = asyncio.run(check(FakePage([200, 200], title=None), 2))
+    assert (result["status"], result["failure"], result["attempts"]) == ("Broken", "missing_element", 1)
+
+    result = asyncio.run(check(FakePage([200], title=None, page_error=Exception("x is undefined")), 3))
+    assert result["failure"] == "js_error" and "x is undefined" in result["error"]
+
+
+@pytest.mark.fast
+def test_exhausted_transient_failures_are_errors_not_broken_books():
+    policy = fast_policy(attempts=2)
+    check = with_retries(check_book_page, policy)
+    result = asyncio.run(check(FakePage([Exception("net::ERR_CONNECTION_RESET")] * 2), 1))
+    assert (result["status"], result["failure"], result["attempts"]) == ("Error", "network", 2)
+    assert policy.failures == {"network": 1}
+    assert "1 retries" in policy.summary()
+
+
+@pytest.mark.fast
+def test_sync_calls_are_retried_on_transient_errors_only():
+    waits = []
+    outcomes = [TimeoutError("slow"), "loaded"]
+
+    def load():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert call_with_retries_sync(load, fast_policy(), wait=waits.append) == ("loaded", None, None, 2)
+    assert len(waits) == 1
+
+    def not_found():
+        raise HTTPStatusError(404)
+
+    value, error, failure, attempts = call_with_retries_sync(not_found, fast_policy(), wait=waits.append)
+    assert (value, failure, attempts) == (None, "http_4xx", 1)
+    assert isinstance(error, HTTPStatusError)
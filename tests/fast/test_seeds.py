@@ -0,0 +1,102 @@
+# tests/fast/test_seeds.py
+
+import asyncio
+import pytest
+
+from mylibri.ratelimit import LIMITER, TokenBucket
+from mylibri.seeds import discover_seeds, parse_sitemap, route_paths, sitemaps_in_robots
+
+BASE = "https://site.test"
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://site.test/sitemap-books.xml</loc></sitemap>
+</sitemapindex>"""
+SITEMAP_BOOKS = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://site.test/home/books/42</loc></url>
+  <url><loc> https://site.test/blog/deep/post/?utm_source=feed </loc></url>
+  <url><loc>https://elsewhere.test/partner</loc></url>
+  <url><loc>https://site.test/files/catalogue.pdf</loc></url>
+</urlset>"""
+BUNDLE = """const r=[{path:"/home/discover"},{path:"/home/books/:id"},{path:"/logout"}];
+fetch("/api/books");const x='/home/wallet';"""
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    # The fake site answers instantly; don't pace it like the real one
+    monkeypatch.setattr(LIMITER, "default", TokenBucket(0, 1))
+
+
+class FakeAPIResponse:
+    def __init__(self, body):
+        self.ok = body is not None
+        self.status = 200 if self.ok else 404
+        self.headers = {}
+        self.body = body
+
+    async def text(self):
+        return self.body
+
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    FILES = {
+        f"{BASE}/robots.txt": "User-agent: *\nSitemap: https://site.test/sitemap-index.xml\n",
+        f"{BASE}/sitemap-index.xml": SITEMAP_INDEX,
+        f"{BASE}/sitemap-books.xml": SITEMAP_BOOKS,
+        f"{BASE}/static/app.js": BUNDLE,
+    }
+
+    async def get(self, url, timeout=None):
+        return FakeAPIResponse(self.FILES.get(url))
+
+
+class FakePage:
+    async def goto(self, url, wait_until=None, timeout=None):
+        pass
+
+    async def evaluate(self, script):
+        # No runtime router, one same-site bundle and one third-party script
+        return {"paths": [], "scripts": [f"{BASE}/static/app.js", "https://cdn.test/lib.js"]}
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    request = FakeRequest()
+
+    async def new_page(self):
+        return FakePage()
+
+
+class FakeStore:
+    def known_pages(self, phase):
+        return [f"{BASE}/home/library", f"{BASE}/home/discover"] if phase == "after_login" else []
+
+
+@pytest.mark.fast
+def test_sitemap_robots_and_bundle_parsing():
+    assert parse_sitemap(SITEMAP_INDEX) == ([], [f"{BASE}/sitemap-books.xml"])
+    pages, nested = parse_sitemap(SITEMAP_BOOKS)
+    assert len(pages) == 4 and nested == []
+    assert parse_sitemap("<html>not a sitemap") == ([], [])
+    assert sitemaps_in_robots("Sitemap: https://site.test/a.xml\nDisallow: /x") == [f"{BASE}/a.xml"]
+    # Parameterized, API and sign-out paths are not seeds
+    assert route_paths(BUNDLE) == ["/home/discover", "/home/wallet"]
+
+
+@pytest.mark.fast
+def test_discover_seeds_merges_sources_without_repeating_seeds():
+    seeds = [f"{BASE}/home/dashboard", f"{BASE}/home/wallet/"]
+    extra = asyncio.run(discover_seeds(FakeContext(), seeds, "after_login", store=FakeStore()))
+    assert extra == [
+        f"{BASE}/home/books/42",
+        f"{BASE}/blog/deep/post",
+        f"{BASE}/home/discover",
+        f"{BASE}/home/library",
+    ]
@@ -0,0 +1,88 @@
+# tests/fast/test_summary.py
+
+import io
+import json
+import pytest
+
+from mylibri import summary
+from mylibri.summary import SummaryWriter, discover_sources, iter_json_array, merge_sources, read_manifest
+
+
+def write_ndjson(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+@pytest.mark.fast
+def test_json_arrays_are_decoded_item_by_item():
+    text = json.dumps([{"id": 1, "title": "A [b], {c}"}, {"id": 2, "nested": {"x": [1, 2]}}], indent=2)
+    # A read size far smaller than one item makes every item span several reads
+    assert list(iter_json_array(io.StringIO(text), read_size=5)) == json.loads(text)
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"id": 1},'), read_size=4))
+
+
+@pytest.fixture
+def sources(tmp_path):
+    old = tmp_path / "book_id_sweep_20250601_120000.json"
+    old.write_text(json.dumps([{"id": 1, "title": "A"}, {"id": 2, "title": "B"}, {"id": 3, "title": "C"}]),
+                   encoding="utf-8")
+    new = tmp_path / "book_metadata_20250602_120000.csv"
+    new.write_text("id,title,author\n2,B2,X\n", encoding="utf-8")
+    newest = tmp_path / "book_id_sweep_20250603_120000.ndjson"
+    write_ndjson(newest, [
+        # An explicit timestamp beats the file's run time
+        {"id": 1, "title": "A-stale", "timestamp": "2025-05-01T00:00:00"},
+        {"id": 3, "status": "Broken", "title": ""},
+        {"url": "https://x/blog", "status": 200},
+        {"title": "no key"},
+    ])
+    return [old, new, newest]
+
+
+@pytest.mark.fast
+def test_newest_record_per_id_wins(sources):
+    stats = {}
+    merged = list(merge_sources(sources, stats=stats))
+    assert [(r.get("id"), r.get("title")) for r in merged] == [
+        (1, "A"), ("2", "B2"), (3, ""), (None, None),
+    ]
+    assert merged[1]["timestamp"] == "2025-06-02T12:00:00"
+    assert merged[2]["source"].endswith("book_id_sweep_20250603_120000.ndjson")
+    assert merged[3]["url"] == "https://x/blog"
+    assert stats == {"sources": 3, "records": 8, "merged": 4, "skipped": 1, "chunks": 1}
+
+
+@pytest.mark.fast
+def test_spilled_merge_matches_the_in_memory_one(sources, tmp_path, monkeypatch):
+    in_memory = list(merge_sources(sources))
+    # Chunks of one record, merged two files at a time, exercise every spill path
+    monkeypatch.setattr(summary, "MAX_OPEN_RUNS", 2)
+    stats = {}
+    spilled = list(merge_sources(sources, chunk_rows=1, tmp_dir=tmp_path, stats=stats))
+    assert spilled == in_memory
+    assert stats["chunks"] > 1
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("summary_")] == []
+
+
+@pytest.mark.fast
+def test_sources_from_globs_and_manifest(sources, tmp_path):
+    manifest = tmp_path / "run_manifest.json"
+    manifest.write_text(json.dumps({"sources": [sources[2].name, "missing.json"]}), encoding="utf-8")
+    assert read_manifest(manifest) == [sources[2], tmp_path / "missing.json"]
+    found = discover_sources([tmp_path / "book_id_sweep_*.json", tmp_path / "*.csv"], manifest)
+    assert found == sources
+
+
+@pytest.mark.fast
+def test_summary_files_are_written_as_records_arrive(tmp_path):
+    with SummaryWriter(tmp_path / "s.csv", tmp_path / "s.json") as writer:
+        writer.write({"id": 1, "title": "A", "extra": [1]})
+        writer.write({"id": 2, "title": "B"})
+    assert json.loads((tmp_path / "s.json").read_text(encoding="utf-8")) == [
+        {"id": 1, "title": "A", "extra": [1]}, {"id": 2, "title": "B"},
+    ]
+    assert (tmp_path / "s.csv").read_text(encoding="utf-8").splitlines()[1].startswith("1,,,A,")
+    with SummaryWriter(tmp_path / "e.csv", tmp_path / "e.json"):
+        pass
+    assert json.loads((tmp_path / "e.json").read_text(encoding="utf-8")) == []
@@ -0,0 +1,105 @@
+# tests/fast/test_sweep_engine.py
+
+import asyncio
+import random
+import pytest
+
+from mylibri.sweep import (
+    METADATA_FIELDS, mode_rules, mode_session_options, report_rows, run_in_thread, shard_range, sweep,
+)
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages_opened = 0
+
+    async def new_page(self):
+        self.pages_opened += 1
+        return FakePage()
+
+
+def make_check(broken_ids=(), jitter=True, errored_ids=()):
+    async def check(page, book_id):
+        # Finish out of order so the engine has to re-sort results
+        await asyncio.sleep(random.random() / 1000 if jitter else 0)
+        status = "Error" if book_id in errored_ids else "Broken" if book_id in broken_ids else "OK"
+        return {"id": book_id, "status": status}
+    return check
+
+
+@pytest.mark.fast
+def test_sweep_returns_results_in_id_order():
+    context = FakeContext()
+    results = asyncio.run(sweep(context, range(1, 51), check=make_check(), concurrency=5))
+    assert [r["id"] for r in results] == list(range(1, 51))
+    assert context.pages_opened == 5
+
+
+@pytest.mark.fast
+def test_sweep_streams_each_result():
+    seen = []
+    asyncio.run(sweep(FakeContext(), [3, 1, 2], check=make_check(), concurrency=2, on_result=seen.append))
+    assert sorted(r["id"] for r in seen) == [1, 2, 3]
+
+
+@pytest.mark.fast
+def test_sweep_stops_after_consecutive_failures_in_id_order():
+    broken = set(range(21, 101))
+    results = asyncio.run(sweep(
+        FakeContext(), range(1, 101), check=make_check(broken, jitter=False), concurrency=4,
+        stop_after_consecutive_fails=5,
+    ))
+    ids = [r["id"] for r in results]
+    assert ids[:25] == list(range(1, 26))
+    # Only the few IDs already in flight when the stop fired may follow
+    assert len(ids) < 25 + 4
+
+
+@pytest.mark.fast
+def test_errored_ids_do_not_break_or_extend_a_run_of_failures():
+    # 11-13 broken, 14 errored, 15-16 broken: five broken in a row once 14 is skipped
+    results = asyncio.run(sweep(
+        FakeContext(), range(1, 41), check=make_check(range(11, 17), jitter=False, errored_ids={14}),
+        concurrency=1, stop_after_consecutive_fails=5,
+    ))
+    assert results[-1]["id"] == 16
+
+
+@pytest.mark.fast
+def test_shard_ranges_cover_the_range_without_overlap():
+    ranges = [shard_range(1, 2831, i, 4) for i in range(4)]
+    assert ranges[0][0] == 1 and ranges[-1][1] == 2831
+    assert all(a[1] + 1 == b[0] for a, b in zip(ranges, ranges[1:]))
+    sizes = [last - first + 1 for first, last in ranges]
+    assert max(sizes) - min(sizes) <= 1
+    # More shards than IDs leaves the extra shards empty
+    first, last = shard_range(1, 2, 3, 4)
+    assert first > last
+
+
+@pytest.mark.fast
+def test_run_in_thread_returns_the_coroutine_result():
+    results = run_in_thread(sweep(FakeContext(), [2, 1], check=make_check(), concurrency=2))
+    assert [r["id"] for r in results] == [1, 2]
+
+
+@pytest.mark.fast
+def test_modes_pick_the_check_and_the_report_rows():
+    results = [{"id": 1, "url": "u1", "status": "OK", "title": "A"}, {"id": 2, "url": "u2", "status": "Broken"}]
+    assert [r["id"] for r in report_rows("links", results)] == [1, 2]
+    assert report_rows("broken", results) == [
+        {"id": 2, "url": "u2", "status": "Broken", "title": "", "error": "", "failure": "", "attempts": ""}
+    ]
+    assert list(report_rows("metadata", results)[0]) == METADATA_FIELDS
+    assert mode_session_options("metadata")["probe"] == "page"
+    assert "probe" not in mode_session_options("links")
+    with pytest.raises(ValueError):
+        mode_rules("everything")
+    # Modes run side by side must not write the same files
+    for key in ("report", "snapshot", "checkpoint"):
+        assert len({mode_rules(mode)[key] for mode in ("links", "broken", "metadata")}) == 3
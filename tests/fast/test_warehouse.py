@@ -0,0 +1,88 @@
+# tests/fast/test_warehouse.py
+
+import json
+import pytest
+from datetime import datetime
+
+from mylibri.warehouse import ResultsWarehouse, backfill, find_report_files
+
+STARTED = datetime(2025, 9, 1, 12, 0, 0)
+
+
+def write_json(path, rows):
+    path.write_text(json.dumps(rows), encoding="utf-8")
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    with ResultsWarehouse(tmp_path / "results.sqlite") as warehouse:
+        yield warehouse
+
+
+@pytest.mark.fast
+def test_last_broken_is_the_latest_break_and_ignores_errors(warehouse):
+    with warehouse.run("book", "broken", started_at=STARTED) as run:
+        run.add_all([
+            {"id": 7, "url": "u7", "status": "Broken", "failure": "http_4xx", "timestamp": "2025-09-01T12:00:00"},
+            {"id": 8, "url": "u8", "status": "OK", "timestamp": "2025-09-01T12:00:00"},
+        ])
+    with warehouse.run("book", "broken") as run:
+        run.add({"id": 7, "url": "u7", "status": "Error", "failure": "timeout", "timestamp": "2025-09-02T12:00:00"})
+        run.add({"id": 7, "url": "u7", "status": "Broken", "failure": "missing_element",
+                 "timestamp": "2025-09-03T12:00:00"})
+
+    assert warehouse.last_broken(7)["checked_at"] == "2025-09-03T12:00:00"
+    assert warehouse.last_broken(7)["failure"] == "missing_element"
+    assert warehouse.last_broken(8) is None
+    assert [check["status"] for check in warehouse.book_history(7)] == ["Broken", "Error", "Broken"]
+    assert [run["rows"] for run in warehouse.runs("book")] == [2, 2]
+
+
+@pytest.mark.fast
+def test_backfill_reads_old_report_formats_once(warehouse, tmp_path):
+    reports = tmp_path / "test_reports"
+    reports.mkdir()
+    write_json(reports / "book_id_sweep_20250607_120000.json", [{"id": 1, "url": "u1", "title": "A"}])
+    (reports / "book_id_sweep_20250607_120000.csv").write_text("id,url,title\n1,u1,A\n", encoding="utf-8")
+    (reports / "book_id_sweep_20250607_130000.csv").write_text("id,url,title\n1,u1,\n", encoding="utf-8")
+    write_json(reports / "genre_book_counts_20250606_224118.json", [{"genre": "Drama", "url": "g1", "book_count": 3}])
+    write_json(reports / "discover_books_20250606_231040.json", [{"section": "New", "books": ["A", "B"]}])
+    (reports / "book_metadata_20250608_120000.json").write_text("[{broken", encoding="utf-8")
+    (reports / "genre_list_20250606_220000.csv").write_text("genre\nDrama\n", encoding="utf-8")
+
+    # One file per run, JSON over CSV; unknown reports are left alone
+    assert [path.name for path in find_report_files(reports)] == [
+        "genre_book_counts_20250606_224118.json", "discover_books_20250606_231040.json",
+        "book_id_sweep_20250607_120000.json", "book_id_sweep_20250607_130000.csv",
+        "book_metadata_20250608_120000.json",
+    ]
+    assert backfill(warehouse, reports) == {"genre": 1, "discover": 2, "book": 2}
+    assert backfill(warehouse, reports) == {}
+    assert warehouse.last_broken(1)["checked_at"] == "2025-06-07T13:00:00"
+    assert warehouse.db.execute("SELECT count FROM genre_counts WHERE genre = 'Drama'").fetchone()[0] == 3
+    # The unreadable file is not recorded, so it is tried again once fixed
+    assert not warehouse.imported(reports / "book_metadata_20250608_120000.json")
+
+
+@pytest.mark.fast
+def test_live_runs_are_not_imported_again_from_their_report(warehouse, tmp_path):
+    snapshot = tmp_path / "book_metadata_20250901_120000.ndjson"
+    snapshot.write_text(json.dumps({"id": 3, "url": "u3", "status": "OK"}) + "\n", encoding="utf-8")
+    with warehouse.run("book", "metadata", started_at=STARTED, source=snapshot) as run:
+        run.add({"id": 3, "url": "u3", "status": "OK"})
+
+    assert backfill(warehouse, tmp_path) == {}
+    assert warehouse.url_history("u3") == [{"run_id": run.run_id, "status": "OK", "checked_at": "2025-09-01T12:00:00"}]
+
+
+@pytest.mark.fast
+def test_a_failed_run_keeps_its_rows_but_reads_as_incomplete(warehouse):
+    with pytest.raises(RuntimeError):
+        with warehouse.run("crawl", "full_broken_links") as run:
+            run.add({"phase": "before_login", "url": "https://x/", "status": 200, "tier": "render"})
+            raise RuntimeError("browser crashed")
+
+    (latest,) = warehouse.runs("crawl")
+    assert latest["rows"] == 1 and latest["finished_at"] is None
+    with pytest.raises(ValueError):
+        warehouse.run("screenshots", "ui")
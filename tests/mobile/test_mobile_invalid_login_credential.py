@@ -4,7 +4,7 @@ import os
 import logging
 from datetime import datetime
 from pathlib import Path
-from playwright.sync_api import Page, expect, sync_playwright
+from playwright.sync_api import Page, expect
 
 # Set up logging
 logging.basicConfig(
@@ -25,37 +25,12 @@ INVALID_PASSWORD = "wrongpassword12345" # Ensure this is unique and wrong
 # TARGET_DEVICE_NAME is typically configured in pytest.ini's [pytest-playwright] section.
 TARGET_DEVICE_NAME = 'iPhone 13'
 
-# Define a fixture for mobile context to ensure emulation and headful mode for observation
+# Device-emulated page on a pooled browser (see tests/conftest.py); run with
+# --headed to watch it. The pool closes the context after the test.
 @pytest.fixture(scope="function")
-def mobile_page(playwright, browser_type): # 'browser_type' comes from pytest-playwright
-    # Get the Playwright device descriptor for iPhone 13
-    try:
-        # Access devices from the 'playwright' object directly
-        iphone_13 = playwright.devices[TARGET_DEVICE_NAME]
-    except KeyError:
-        logger.warning(f"Device '{TARGET_DEVICE_NAME}' not found in Playwright's built-in devices. Using default mobile settings.")
-        # Fallback to generic mobile settings if specific device is not found
-        iphone_13 = {
-            # CORRECTED SYNTAX: Changed "13.1.1" to '13.1.1' to fix previous SyntaxError
-            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version='13.1.1' Mobile/15E148 Safari/604.1",
-            "viewport": {"width": 375, "height": 667},
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": 2
-        }
-
-    # Launch a new browser instance explicitly with headless=False for observation
-    # This ensures the browser window is visible for debugging.
-    browser_instance = browser_type.launch(headless=False)
-    context = browser_instance.new_context(**iphone_13)
-    # The original script had a high TIMEOUT. Set default timeout for the context if needed.
-    # context.set_default_timeout(45000) # Re-add if 45s timeout is consistently required
-    # page.set_default_navigation_timeout(45000) # Re-add if 45s nav timeout is consistently required
-    page = context.new_page()
-    yield page
-    page.close()
-    context.close()
-    browser_instance.close()
+def mobile_page(context_factory):
+    context = context_factory(device=TARGET_DEVICE_NAME)
+    return context.new_page()
 
 
 @pytest.mark.mobile
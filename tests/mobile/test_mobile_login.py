@@ -8,6 +8,8 @@ from datetime import datetime
 from pathlib import Path
 from playwright.sync_api import Page, expect, TimeoutError as PlaywrightTimeoutError
 
+from mylibri.readiness import wait_for_network_quiet, wait_for_selector
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,28 +29,12 @@ VALID_PASSWORD = "Moniwyse!400"
 # Keeping it here for test report directory naming consistency if it's not dynamically set
 TARGET_DEVICE_NAME = 'iPhone 13'
 
-# Define a fixture for mobile context to ensure emulation and headful mode for observation
+# Device-emulated page on a pooled browser (see tests/conftest.py); run with
+# --headed to watch it. The pool closes the context after the test.
 @pytest.fixture(scope="function")
-def mobile_page(playwright, browser_type):
-    try:
-        iphone_13 = playwright.devices[TARGET_DEVICE_NAME]
-    except KeyError:
-        logger.warning(f"Device '{TARGET_DEVICE_NAME}' not found in Playwright's built-in devices. Using default mobile settings.")
-        iphone_13 = {
-            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version='13.1.1' Mobile/15E148 Safari/604.1",
-            "viewport": {"width": 375, "height": 667},
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": 2
-        }
-
-    browser_instance = browser_type.launch(headless=False)
-    context = browser_instance.new_context(**iphone_13)
-    page = context.new_page()
-    yield page
-    page.close()
-    context.close()
-    browser_instance.close()
+def mobile_page(context_factory):
+    context = context_factory(device=TARGET_DEVICE_NAME)
+    return context.new_page()
 
 
 @pytest.mark.mobile
@@ -102,7 +88,7 @@ def test_mobile_login_only(mobile_page: Page):
         # Perform the scroll
         logger.info(f"Scrolling to target position: {target_scroll_position} pixels.")
         page.evaluate(f"window.scrollTo(0, {target_scroll_position})")
-        page.wait_for_timeout(4000) # Give content time to load after scroll
+        wait_for_network_quiet(page, replaces_ms=4000)
 
         # Check if a book is visible after the initial scroll
         try:
@@ -126,7 +112,7 @@ def test_mobile_login_only(mobile_page: Page):
                 logger.info(f"Incremental scroll attempt {i + 1}/{max_additional_scroll_attempts}. New target scroll: {current_scroll_position}")
                 
                 page.evaluate(f"window.scrollTo(0, {current_scroll_position})")
-                page.wait_for_timeout(3000) # Pause after each incremental scroll
+                wait_for_network_quiet(page, replaces_ms=3000)
 
                 try:
                     if book_locator.is_visible(timeout=5000): # Short timeout for checking visibility
@@ -218,7 +204,7 @@ def test_mobile_login_only(mobile_page: Page):
             expect(hamburger_menu_locator).to_be_enabled(timeout=10000)
             hamburger_menu_locator.click()
             logger.info("Clicked hamburger menu to open main menu.")
-            page.wait_for_timeout(1000) # Allow menu animation to complete after click
+            wait_for_selector(page, "div.profile", replaces_ms=1000) # Menu is open once the profile block shows
             page.screenshot(path=test_report_dir / "07_main_menu_opened.png")
 
             # --- Adopted the robust profile_arrow_locator from your proven working script ---
@@ -231,7 +217,7 @@ def test_mobile_login_only(mobile_page: Page):
             expect(profile_arrow_locator).to_be_enabled(timeout=10000)
             profile_arrow_locator.click()
             logger.info("Clicked profile dropdown arrow.")
-            page.wait_for_timeout(1000) # Small pause for dropdown animation
+            wait_for_selector(page, page.get_by_text("Log out", exact=True), replaces_ms=1000) # Dropdown is open
             page.screenshot(path=test_report_dir / "08_profile_dropdown_expanded.png")
 
             # Click "Log out" link
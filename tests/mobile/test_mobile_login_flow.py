@@ -3,7 +3,9 @@ import re
 import logging
 from datetime import datetime
 from pathlib import Path
-from playwright.sync_api import sync_playwright, Page, expect
+from playwright.sync_api import Page, expect
+
+from mylibri.readiness import wait_for_network_quiet, wait_for_selector
 
 # Set up logging
 logging.basicConfig(
@@ -24,33 +26,12 @@ TARGET_DEVICE_NAME = 'iPhone 13' # This is for logging and report naming
 # --- END HARDCODED VALUES ---
 
 # Define a fixture for mobile context to ensure emulation
-# This will also ensure the browser UI is visible for observation.
+# Device-emulated page on a pooled browser (see tests/conftest.py); run with
+# --headed to watch it. The pool closes the context after the test.
 @pytest.fixture(scope="function")
-def mobile_page(playwright, browser_type):
-    # Get the Playwright device descriptor for iPhone 13
-    try:
-        # Access devices from the 'playwright' object directly
-        iphone_13 = playwright.devices[TARGET_DEVICE_NAME]
-    except KeyError:
-        logger.warning(f"Device '{TARGET_DEVICE_NAME}' not found in Playwright's built-in devices. Using default mobile settings.")
-        # Fallback to generic mobile settings if specific device is not found
-        iphone_13 = {
-            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.1.1 Mobile/15E148 Safari/604.1",
-            "viewport": {"width": 375, "height": 667},
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": 2
-        }
-
-    # Launch a new browser instance explicitly with headless=False for observation
-    # This ensures the browser window is visible for debugging.
-    browser_instance = browser_type.launch(headless=False)
-    context = browser_instance.new_context(**iphone_13)
-    page = context.new_page()
-    yield page
-    page.close()
-    context.close()
-    browser_instance.close()
+def mobile_page(context_factory):
+    context = context_factory(device=TARGET_DEVICE_NAME)
+    return context.new_page()
 
 
 @pytest.mark.mobile
@@ -73,7 +54,7 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         # --- Step 1: Navigate to Login Page and Log In ---
         logger.info(f"Navigating to login page: {LOGIN_URL}")
         page.goto(LOGIN_URL, wait_until="domcontentloaded")
-        page.wait_for_timeout(2000) # Small buffer for initial rendering
+        wait_for_selector(page, "input[type='email']", replaces_ms=2000) # Sign-in form rendered
 
         page.screenshot(path=test_report_dir / f"01_login_page_{sanitized_device_name}.png")
         expect(page).to_have_url(re.compile("signin|login", re.IGNORECASE))
@@ -99,8 +80,7 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         logger.info("Clicked login button.")
         
         expect(page).to_have_url(re.compile("home|dashboard|account|profile|library", re.IGNORECASE), timeout=30000)
-        page.wait_for_load_state("networkidle") # Wait for network to be idle after URL change
-        page.wait_for_timeout(2000) # Small buffer for visual stability
+        wait_for_network_quiet(page, replaces_ms=2000)
         page.screenshot(path=test_report_dir / f"02_dashboard_after_login_{sanitized_device_name}.png")
         logger.info("Login successful. Navigated to dashboard/home page.")
 
@@ -109,13 +89,13 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         # --- Scroll to bottom of the page (Optional) ---
         logger.info("Scrolling to the bottom of the page (optional).")
         page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(1000)
+        wait_for_network_quiet(page, replaces_ms=1000)
         page.screenshot(path=test_report_dir / f"02a_dashboard_scrolled_{sanitized_device_name}.png")
 
         # --- IMPORTANT: Scroll back to top before interacting with top elements ---
         logger.info("Scrolling back to the top of the page.")
         page.evaluate("window.scrollTo(0, 0)")
-        page.wait_for_timeout(500) # Small wait for scroll to complete
+        wait_for_network_quiet(page, replaces_ms=500)
         page.screenshot(path=test_report_dir / f"02b_scrolled_to_top_{sanitized_device_name}.png")
 
         # --- Step 2: Navigate to Profile Page ---
@@ -141,7 +121,7 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         expect(profile_arrow_locator).to_be_enabled(timeout=10000)
         profile_arrow_locator.click()
         logger.info("Clicked profile dropdown arrow.")
-        page.wait_for_timeout(1000)
+        wait_for_selector(page, page.get_by_text("Tea Pot", exact=True), replaces_ms=1000)
 
         # Click "Tea Pot" (Profile Name) to go to profile page
         profile_name_locator = page.get_by_text("Tea Pot", exact=True)
@@ -153,8 +133,7 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
 
         # Verify navigation to the profile page
         expect(page).to_have_url(re.compile("home|profile", re.IGNORECASE), timeout=20000)
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        wait_for_network_quiet(page, replaces_ms=2000)
 
         # Verify 'Bio Data' section is active (optional)
         bio_data_locator = page.locator("div.profile-page-container div.sidebar-content ul li:has-text('Bio Data')")
@@ -181,7 +160,7 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         expect(profile_arrow_locator).to_be_enabled(timeout=10000)
         profile_arrow_locator.click()
         logger.info("Re-clicked profile dropdown arrow.")
-        page.wait_for_timeout(1000)
+        wait_for_selector(page, page.get_by_text("Log out", exact=True), replaces_ms=1000)
 
         # Click "Log out" link
         log_out_link_locator = page.get_by_text("Log out", exact=True)
@@ -192,8 +171,8 @@ def test_iphone_login_logout_flow(mobile_page: Page): # Use the custom mobile_pa
         logger.info("Clicked 'Log out' link.")
 
         # --- Post-Logout Actions ---
-        logger.info("Waiting 5 seconds after logout and capturing screenshot.")
-        page.wait_for_timeout(5000) # Wait for 5 seconds
+        logger.info("Waiting for the logout to settle (up to 5 seconds) and capturing screenshot.")
+        wait_for_network_quiet(page, replaces_ms=5000)
         page.screenshot(path=test_report_dir / f"05_after_logout_{sanitized_device_name}.png", full_page=True)
         logger.info("Screenshot captured after logout.")
 
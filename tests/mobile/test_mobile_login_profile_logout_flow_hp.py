@@ -6,6 +6,8 @@ from datetime import datetime
 from pathlib import Path
 from playwright.sync_api import Page, expect # Ensure 'Page' and 'expect' are imported
 
+from mylibri.readiness import wait_for_network_quiet, wait_for_selector
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,32 +28,12 @@ PASSWORD = ("Moniwyse!400")
 # TARGET_DEVICE_NAME is typically configured in pytest.ini's [pytest-playwright] section.
 TARGET_DEVICE_NAME = 'iPhone 13'
 
+# Device-emulated page on a pooled browser (see tests/conftest.py); run with
+# --headed to watch it. The pool closes the context after the test.
 @pytest.fixture(scope="function")
-def mobile_page(playwright, browser_type): # 'browser_type' comes from pytest-playwright
-    # Get the Playwright device descriptor for iPhone 13
-    try:
-        # Access devices from the 'playwright' object directly
-        iphone_13 = playwright.devices[TARGET_DEVICE_NAME]
-    except KeyError:
-        logger.warning(f"Device '{TARGET_DEVICE_NAME}' not found in Playwright's built-in devices. Using default mobile settings.")
-        # Fallback to generic mobile settings if specific device is not found
-        iphone_13 = {
-            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.1.1 Mobile/15E148 Safari/604.1",
-            "viewport": {"width": 375, "height": 667},
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": 2
-        }
-
-    # Launch a new browser instance explicitly with headless=False for observation
-    # This ensures the browser window is visible for debugging.
-    browser_instance = browser_type.launch(headless=False)
-    context = browser_instance.new_context(**iphone_13)
-    page = context.new_page()
-    yield page
-    page.close()
-    context.close()
-    browser_instance.close()
+def mobile_page(context_factory):
+    context = context_factory(device=TARGET_DEVICE_NAME)
+    return context.new_page()
 
 @pytest.mark.mobile
 def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custom mobile_page fixture
@@ -94,7 +76,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
         # Scroll to the middle of the page to reveal books.
         logger.info("Scrolling to the middle of the page to reveal books if necessary.")
         page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)") # Scroll to half the page height
-        page.wait_for_timeout(2000) # Give time for content to load after scroll
+        wait_for_network_quiet(page, replaces_ms=2000)
 
         # Now, expect the book to be visible and clickable
         expect(book_locator).to_be_visible(timeout=10000) # Auto-waits for visibility up to 10s
@@ -131,8 +113,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
             raise AssertionError(f"Login failed: {error_text}")
 
         expect(page).to_have_url(re.compile("home|dashboard|account|profile", re.IGNORECASE))
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000) # Small buffer for page rendering
+        wait_for_network_quiet(page, replaces_ms=2000)
         page.screenshot(path=test_report_dir / "04_dashboard_after_login.png")
         logger.info("Login successful. On dashboard/home page.")
 
@@ -147,7 +128,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
         hamburger_menu_locator.wait_for(state="visible", timeout=10000) 
         hamburger_menu_locator.click()
         logger.info("Clicked hamburger menu icon.")
-        page.wait_for_timeout(1000) # Small buffer for menu animation to complete
+        wait_for_selector(page, "div.profile > svg", replaces_ms=1000) # Menu is open once the profile arrow shows
 
         # Click Profile Dropdown Arrow - USING THE CORRECTED LOCATOR (SVG inside div.profile)
         profile_arrow_locator = page.locator("div.profile > svg") 
@@ -166,8 +147,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
 
         # Verify navigation to the profile page URL
         expect(page).to_have_url(re.compile("home|profile", re.IGNORECASE))
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        wait_for_network_quiet(page, replaces_ms=2000)
 
         # Verify 'Bio Data' section is active by default
         bio_data_locator = page.locator("div.profile-page-container div.sidebar-content ul li:has-text('Bio Data')")
@@ -192,20 +172,19 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
             section_locator.click()
             logger.info(f"Clicked '{section_name}'.")
             
-            # Use networkidle for content changes, then a short timeout
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(1500)
+            # Wait for the section content to finish loading
+            wait_for_network_quiet(page, replaces_ms=1500)
 
             # Scroll to the bottom and take a full page screenshot
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(3000)
+            wait_for_network_quiet(page, replaces_ms=3000)
             screenshot_filename = f"0{6+i:02d}_profile_{section_name.lower().replace(' ', '_')}.png"
             page.screenshot(path=test_report_dir / screenshot_filename, full_page=True)
             logger.info(f"Full page screenshot of '{section_name}' section captured.")
 
             # Scroll back to the top to prepare for the next section click (if any)
             page.evaluate("window.scrollTo(0, 0)")
-            page.wait_for_timeout(1000) # Reduced timeout for simple scroll back
+            wait_for_network_quiet(page, replaces_ms=1000)
         logger.info("Successfully navigated through all profile sections.")
 
         # --- Step 4: Log Out ---
@@ -216,7 +195,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
         hamburger_menu_locator.wait_for(state="visible", timeout=10000) 
         hamburger_menu_locator.click()
         logger.info("Re-clicked hamburger menu to ensure it's open for logout.")
-        page.wait_for_timeout(1000) # Allow menu animation
+        wait_for_selector(page, "div.profile > svg", replaces_ms=1000) # Menu is open once the profile arrow shows
 
         # Re-click Profile Dropdown Arrow to reveal "Log out" link if it has closed
         profile_arrow_locator = page.locator("div.profile > svg") 
@@ -233,8 +212,7 @@ def test_mobile_login_profile_logout_flow_hp(mobile_page: Page): # Use the custo
         logger.info("Clicked 'Log out' link.")
 
         # --- Verify Logout by checking URL and a prominent element on the logged-out homepage ---
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        wait_for_network_quiet(page, replaces_ms=2000)
 
         # Assert that the URL is the base homepage URL after logout
         expect(page).to_have_url(re.compile(f"^{re.escape(URL)}/?$"))
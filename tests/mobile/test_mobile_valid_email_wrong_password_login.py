@@ -25,33 +25,12 @@ INCORRECT_PASSWORD_FOR_VALID_EMAIL = "ThisIsDefinitelyTheWrongPassword123" # A u
 # TARGET_DEVICE_NAME is typically configured in pytest.ini's [pytest-playwright] section.
 TARGET_DEVICE_NAME = 'iPhone 13'
 
-# Define a fixture for mobile context to ensure emulation and headful mode for observation
+# Device-emulated page on a pooled browser (see tests/conftest.py); run with
+# --headed to watch it. The pool closes the context after the test.
 @pytest.fixture(scope="function")
-def mobile_page(playwright, browser_type): # 'browser_type' comes from pytest-playwright
-    # Get the Playwright device descriptor for iPhone 13
-    try:
-        # Access devices from the 'playwright' object directly
-        iphone_13 = playwright.devices[TARGET_DEVICE_NAME]
-    except KeyError:
-        logger.warning(f"Device '{TARGET_DEVICE_NAME}' not found in Playwright's built-in devices. Using default mobile settings.")
-        # Fallback to generic mobile settings if specific device is not found
-        iphone_13 = {
-            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version='13.1.1' Mobile/15E148 Safari/604.1",
-            "viewport": {"width": 375, "height": 667},
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": 2
-        }
-
-    # Launch a new browser instance explicitly with headless=False for observation
-    # This ensures the browser window is visible for debugging.
-    browser_instance = browser_type.launch(headless=False)
-    context = browser_instance.new_context(**iphone_13)
-    page = context.new_page()
-    yield page
-    page.close()
-    context.close()
-    browser_instance.close()
+def mobile_page(context_factory):
+    context = context_factory(device=TARGET_DEVICE_NAME)
+    return context.new_page()
 
 
 @pytest.mark.mobile
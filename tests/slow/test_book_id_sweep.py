@@ -0,0 +1,166 @@
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from mylibri.checkpoint import SweepCheckpoint
+from mylibri.config import (
+    SWEEP_START_ID, SWEEP_MAX_ID, SWEEP_CONCURRENCY, SWEEP_PROBE, SWEEP_SHARDS, SWEEP_MODES,
+    SWEEP_INCREMENTAL, SWEEP_MAX_AGE_DAYS, SWEEP_SAMPLE_PCT,
+)
+from mylibri.incremental import load_latest_snapshot, merge_snapshot, plan_revalidation
+from mylibri.reports import ReportWriter, is_failed_status
+from mylibri.warehouse import ResultsWarehouse
+from mylibri.retry import RetryPolicy
+from mylibri.sweep import (
+    mode_rules, mode_session_options, report_rows, run_bounded_sweep, run_in_thread, run_sweep, shard_range,
+)
+
+# --- Configuration ---
+# The ID range, number of browser pages and probe mode come from
+# SWEEP_START_ID, SWEEP_MAX_ID, SWEEP_CONCURRENCY and SWEEP_PROBE
+# (see mylibri/config.py). Without SWEEP_MAX_ID the end of the live
+# range is discovered before the sweep starts. SWEEP_INCREMENTAL=1 only
+# re-checks what the previous result set says is worth checking.
+# SWEEP_SHARDS splits the range into that many tests, which pytest-xdist
+# spreads across workers (run_suite.py sets it for the slow lane).
+# SWEEP_MODES picks what is checked and reported: "links", "broken" and/or
+# "metadata" (see mylibri/sweep.py:MODES); each mode is its own test.
+
+def shard_label(index):
+    return f"shard{index + 1}of{SWEEP_SHARDS}"
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("shard", range(SWEEP_SHARDS), ids=shard_label)
+@pytest.mark.parametrize("mode", SWEEP_MODES)
+def test_book_sweep(auth_storage_state, mode, shard):
+    """
+    Sweeps the book ID range in one mode and outputs that mode's report:
+    every ID with its title ("links"), only the broken IDs ("broken"), or
+    every ID with its title, author, rating and page count ("metadata").
+    """
+    rules = mode_rules(mode)
+    session_options = mode_session_options(mode)
+    print(f"--- Starting {mode} sweep ---")
+    started_at = datetime.now()
+    timestamp = started_at.strftime("%Y%m%d_%H%M%S")
+    report_dir = Path("test_reports")
+    report_dir.mkdir(exist_ok=True)
+    print(f"✅ Created report directory: {report_dir}")
+    suffix = f"_{shard_label(shard)}" if SWEEP_SHARDS > 1 else ""
+
+    # Results are appended to a checkpoint as they arrive; a re-run after a
+    # crash picks up where the last one stopped.
+    checkpoint = SweepCheckpoint.for_sweep(f"{rules['checkpoint']}{suffix}", SWEEP_START_ID, SWEEP_MAX_ID or "auto")
+    done_ids = checkpoint.completed_ids()
+    if done_ids:
+        print(f"♻️ Resuming from {checkpoint.path}: {len(done_ids)} IDs already classified.")
+
+    previous = {}
+
+    def select(candidate_ids):
+        if not SWEEP_INCREMENTAL or not candidate_ids:
+            return candidate_ids
+        snapshot, previous_path = load_latest_snapshot(
+            id_range=(min(candidate_ids), max(candidate_ids)),
+            patterns=(f"{rules['snapshot']}_*.json", f"{rules['snapshot']}_*.ndjson"),
+            checkpoint_pattern=f"{rules['checkpoint']}_*.jsonl",
+        )
+        if not snapshot:
+            return candidate_ids
+        previous.update(snapshot)
+        to_check, counts = plan_revalidation(
+            previous, candidate_ids,
+            max_age=timedelta(days=SWEEP_MAX_AGE_DAYS),
+            sample_pct=SWEEP_SAMPLE_PCT,
+        )
+        print(f"🔁 Incremental run against {previous_path}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+        return to_check
+
+    def record(result):
+        checkpoint.append(result)
+        if result["status"] == "Error":
+            print(f"⚠️ ID {result['id']} still failing after {result['attempts']} attempts ({result['failure']})")
+        elif result["status"] != "OK":
+            print(f"❌ Broken: ID {result['id']} at {result['url']} ({result.get('failure', '')})")
+
+    # Timeouts, dropped connections and 5xx answers are retried (see mylibri/retry.py)
+    retries = RetryPolicy()
+
+    # --- Check Each Book ID ---
+    with checkpoint:
+        if SWEEP_MAX_ID:
+            first_id, last_id = shard_range(SWEEP_START_ID, SWEEP_MAX_ID, shard, SWEEP_SHARDS)
+            candidates = [i for i in range(first_id, last_id + 1) if i not in done_ids]
+            remaining = sorted(select(candidates))
+            print(f"➡️ Scanning {len(remaining)} IDs in {first_id}-{last_id} with {SWEEP_CONCURRENCY} pages...")
+            swept = run_in_thread(run_sweep(
+                remaining,
+                concurrency=SWEEP_CONCURRENCY,
+                on_result=record,
+                storage_state=auth_storage_state,
+                profile="lean",
+                retry_policy=retries,
+                **session_options,
+            ))
+            range_note = f"Fixed range {first_id}-{last_id}"
+        else:
+            print(f"➡️ Discovering live ID range from {SWEEP_START_ID}, then scanning with {SWEEP_CONCURRENCY} pages...")
+            swept, estimate = run_in_thread(run_bounded_sweep(
+                SWEEP_START_ID,
+                concurrency=SWEEP_CONCURRENCY,
+                skip_ids=done_ids,
+                select=select,
+                on_result=record,
+                shard=(shard, SWEEP_SHARDS),
+                storage_state=auth_storage_state,
+                profile="lean",
+                retry_policy=retries,
+                **session_options,
+            ))
+            first_id, last_id = shard_range(estimate.start_id, estimate.end_id, shard, SWEEP_SHARDS)
+            range_note = f"Discovered range {estimate.start_id}-{estimate.end_id} ({estimate.probes} probes)"
+            if SWEEP_SHARDS > 1:
+                range_note += f", {shard_label(shard)} swept {first_id}-{last_id}"
+        print(f"📏 {range_note}")
+
+    # Carried-over results from the previous run fill in every ID not re-checked
+    carried = {k: v for k, v in previous.items() if first_id <= k <= last_id}
+    checked = checkpoint.results()
+    results = merge_snapshot(carried, checked)
+    rendered = sum(1 for r in swept if r.get("probe", "render") == "render")
+    probe = session_options.get("probe", SWEEP_PROBE)
+    print(f"✅ {len(results)} IDs classified ({len(swept)} this run, {probe} probe, {rendered} full page renders).")
+    print(f"🔁 {retries.summary()}")
+    reader = getattr(session_options["check"], "reader", None)
+    if reader:
+        print(f"📘 {reader.summary()}")
+
+    # --- Full snapshot (read back by the next incremental run) and mode report ---
+    print(f"\n--- Generating {mode} reports ---")
+    title = "Broken Link Report" if rules["broken_only"] else f"Book {mode.capitalize()} Report"
+    snapshot = ReportWriter(report_dir / f"{rules['snapshot']}_{timestamp}{suffix}", rules["fields"],
+                            formats=("ndjson",))
+    report = ReportWriter(report_dir / f"{rules['report']}_{timestamp}{suffix}", rules["fields"],
+                          title=f"📊 {title}", failed=is_failed_status)
+    report.note = f"{range_note}."
+    with snapshot, report:
+        snapshot.write_all(results)
+        report.write_all(report_rows(mode, results))
+
+    # --- Results warehouse (see mylibri/warehouse.py) ---
+    # Only this run's checks: carried-over rows are already there from the run that made them
+    with ResultsWarehouse() as warehouse, warehouse.run(
+        "book", mode, started_at=started_at, source=snapshot.paths["ndjson"]
+    ) as run:
+        run.add_all(checked)
+    print(f"🗄️ {run.count} results added to {warehouse.path}")
+    print(f"📸 Snapshot of {snapshot.count} IDs: {snapshot.paths['ndjson']}")
+    print(f"📄 {report.count} IDs reported, {report.failures} failed:")
+    report.print_paths()
+
+    archived = checkpoint.archive(timestamp)
+    if archived:
+        print(f"📦 Checkpoint archived: {archived}")
+    print(f"✅ Report complete. View at: {report.paths['html']}")
+    print("--- Test run finished ---")